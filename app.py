@@ -1,1523 +1,5894 @@
-from flask import Flask, request, jsonify, send_file, render_template_string, session, redirect, url_for
+from flask import Flask, Blueprint, current_app, g, request, jsonify, send_file, session, redirect, url_for
+from flask.sessions import SessionInterface, SessionMixin
 from flask_cors import CORS
-import pandas as pd
-from docx import Document
 from datetime import datetime, timedelta
+from collections import OrderedDict, Counter, deque
 import os
+import sys
+import io
+import shutil
+import re
+import csv
 import json
+from werkzeug.datastructures import CallbackDict
 from werkzeug.utils import secure_filename
+from werkzeug.http import parse_content_range_header
 import tempfile
 import zipfile
 import hashlib
+import secrets
+import sqlite3
+import logging
+import logging.handlers
+import queue
+import contextvars
+import copy
+import atexit
+import smtplib
+import gzip
+import zlib
+import threading
+import time
+import bisect
+import functools
+import unicodedata
+from difflib import SequenceMatcher
+from contextlib import contextmanager
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from xml.sax.saxutils import escape as escapar_xml
+import importlib
+import importlib.util
+import inspect
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-class AutomatizacaoEscritorio:
-    def __init__(self, arquivo_excel):
+
+class ModuloPreguicoso:
+    """
+    Adia a importação de módulos pesados (pandas, python-docx) até o primeiro
+    uso, mantendo o import da aplicação e o boot dos workers rápidos
+    """
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return getattr(self._modulo, atributo)
+
+
+pd = ModuloPreguicoso('pandas')
+np = ModuloPreguicoso('numpy')
+docx = ModuloPreguicoso('docx')
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele servimos apenas gzip
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock (e sem gunicorn: processo único)
+    fcntl = None
+
+class Metricas:
+    """
+    Registro de métricas (contadores e histogramas de latência) exportado
+    no formato texto do Prometheus
+    """
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._contadores = {}
+        self._histogramas = {}
+        self._ajuda = {}
+        self._lock = threading.Lock()
+
+    def descrever(self, nome, tipo, ajuda):
+        self._ajuda[nome] = (tipo, ajuda)
+
+    def contar(self, nome, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, **rotulos):
         """
-        Inicializa a classe com o arquivo Excel base
+        Registra uma observação no histograma (apenas o bucket correspondente
+        é incrementado; os valores acumulados são calculados na exportação)
         """
-        self.arquivo_excel = arquivo_excel
-        self.df = self.carregar_dados()
-    
-    def carregar_dados(self):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histograma[0][indice] += 1
+            histograma[1] += valor
+            histograma[2] += 1
+
+    @contextmanager
+    def medir(self, operacao):
         """
-        Carrega os dados do arquivo Excel
+        Mede a duração de um trecho como span de operação interna
         """
+        inicio = time.perf_counter()
         try:
-            if os.path.exists(self.arquivo_excel):
-                return pd.read_excel(self.arquivo_excel)
-            else:
-                return self.criar_estrutura_inicial()
-        except Exception as e:
-            print(f"Erro ao carregar dados: {e}")
-            return self.criar_estrutura_inicial()
-    
-    def criar_estrutura_inicial(self):
+            yield
+        finally:
+            self.observar('escritorio_operacao_segundos', time.perf_counter() - inicio, operacao=operacao)
+
+    def cronometrar(self, operacao):
         """
-        Cria uma planilha inicial se não existir
+        Decorador equivalente a `medir` para métodos inteiros
         """
-        # Garantir que o diretório existe
-        os.makedirs(os.path.dirname(self.arquivo_excel), exist_ok=True)
-        
-        dados_iniciais = {
-            'Numero_Processo': ['001/2025', '002/2025'],
-            'Cliente': ['Cliente Exemplo 1', 'Cliente Exemplo 2'],
-            'Advogado_Responsavel': ['Dr. Silva', 'Dra. Santos'],
-            'Tipo_Acao': ['Cível', 'Trabalhista'],
-            'Data_Cadastro': [datetime.now().strftime('%Y-%m-%d'), datetime.now().strftime('%Y-%m-%d')],
-            'Data_Intimacao': [datetime.now().strftime('%Y-%m-%d'), datetime.now().strftime('%Y-%m-%d')],
-            'Dias_Prazo': [15, 10],
-            'Status': ['Ativo', 'Ativo']
-        }
-        
-        df = pd.DataFrame(dados_iniciais)
-        try:
-            df.to_excel(self.arquivo_excel, index=False)
-            print(f"Arquivo {self.arquivo_excel} criado com dados iniciais.")
-        except Exception as e:
-            print(f"Erro ao criar arquivo Excel: {e}")
-        return df
-    
-    def adicionar_processo(self, dados):
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def envolvida(*args, **kwargs):
+                with self.medir(operacao):
+                    return funcao(*args, **kwargs)
+            return envolvida
+        return decorador
+
+    @staticmethod
+    def _formatar_rotulos(rotulos, extra=None):
+        itens = list(rotulos) + ([extra] if extra else [])
+        if not itens:
+            return ''
+        partes = []
+        for chave, valor in itens:
+            valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            partes.append(f'{chave}="{valor}"')
+        return '{' + ','.join(partes) + '}'
+
+    def exportar(self):
         """
-        Adiciona um novo processo à planilha
+        Gera o texto no formato de exposição do Prometheus
         """
-        # Verificar se processo já existe
-        if dados['numero'] in self.df['Numero_Processo'].values:
-            return False, f"Processo {dados['numero']} já existe na base de dados."
-        
-        novo_processo = {
-            'Numero_Processo': dados['numero'],
-            'Cliente': dados['cliente'],
-            'Advogado_Responsavel': dados['advogado'],
-            'Tipo_Acao': dados['tipo'],
-            'Data_Cadastro': datetime.now().strftime('%Y-%m-%d'),
-            'Data_Intimacao': dados.get('dataIntimacao', datetime.now().strftime('%Y-%m-%d')),
-            'Dias_Prazo': dados.get('diasPrazo', 15),
-            'Status': 'Ativo'
+        with self._lock:
+            contadores = dict(self._contadores)
+            histogramas = {chave: (list(h[0]), h[1], h[2]) for chave, h in self._histogramas.items()}
+
+        linhas = []
+        descritos = set()
+
+        def cabecalho(nome, tipo_padrao):
+            if nome not in descritos:
+                descritos.add(nome)
+                tipo, ajuda = self._ajuda.get(nome, (tipo_padrao, ''))
+                if ajuda:
+                    linhas.append(f'# HELP {nome} {ajuda}')
+                linhas.append(f'# TYPE {nome} {tipo}')
+
+        for (nome, rotulos), valor in sorted(contadores.items()):
+            cabecalho(nome, 'counter')
+            linhas.append(f'{nome}{self._formatar_rotulos(rotulos)} {valor}')
+
+        for (nome, rotulos), (contagens, soma, total) in sorted(histogramas.items()):
+            cabecalho(nome, 'histogram')
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                linhas.append(f'{nome}_bucket{self._formatar_rotulos(rotulos, ("le", limite))} {acumulado}')
+            linhas.append(f'{nome}_bucket{self._formatar_rotulos(rotulos, ("le", "+Inf"))} {total}')
+            linhas.append(f'{nome}_sum{self._formatar_rotulos(rotulos)} {soma}')
+            linhas.append(f'{nome}_count{self._formatar_rotulos(rotulos)} {total}')
+
+        return '\n'.join(linhas) + '\n'
+
+
+# Registro global de métricas da aplicação
+metricas = Metricas()
+metricas.descrever('escritorio_operacao_segundos', 'histogram', 'Duração das operações internas')
+metricas.descrever('escritorio_linhas_lidas_total', 'counter', 'Linhas da base percorridas por operação')
+metricas.descrever('escritorio_bytes_gravados_total', 'counter', 'Bytes gravados em disco por arquivo')
+metricas.descrever('http_requisicao_segundos', 'histogram', 'Latência das requisições HTTP por rota')
+metricas.descrever('escritorio_tendencias_cache_total', 'counter', 'Meses de tendência servidos do cache (acerto) ou recalculados (falta)')
+metricas.descrever('escritorio_linhas_invalidas_total', 'counter', 'Linhas ignoradas por dados inválidos, por operação')
+metricas.descrever('escritorio_eventos_recusados_total', 'counter', 'Conexões ao feed de eventos recusadas por limite')
+
+
+# Identificador da requisição em curso, anexado aos eventos de log
+id_requisicao_atual = contextvars.ContextVar('id_requisicao', default=None)
+
+# Eventos estruturados da aplicação (ver SaidaLogs)
+log = logging.getLogger('escritorio')
+
+
+class FormatadorJSON(logging.Formatter):
+    """
+    Um objeto JSON por linha: horário, nível, evento, id da requisição e os
+    campos passados em extra={'campos': {...}}
+    """
+    def format(self, registro):
+        evento = {
+            'ts': datetime.fromtimestamp(registro.created).isoformat(timespec='milliseconds'),
+            'nivel': registro.levelname,
+            'evento': registro.getMessage()
         }
-        
-        novo_df = pd.DataFrame([novo_processo])
-        self.df = pd.concat([self.df, novo_df], ignore_index=True)
-        self.salvar_dados()
-        return True, f"Processo {dados['numero']} adicionado com sucesso."
-    
-    def atualizar_processo(self, numero, dados):
+        if getattr(registro, 'id_requisicao', None):
+            evento['requisicao'] = registro.id_requisicao
+        evento.update(getattr(registro, 'campos', None) or {})
+        if registro.exc_info and not registro.exc_text:
+            registro.exc_text = self.formatException(registro.exc_info)
+        if registro.exc_text:
+            evento['excecao'] = registro.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+class ManipuladorFila(logging.handlers.QueueHandler):
+    """
+    Apenas enfileira o evento: formatação e escrita ficam com a thread do
+    QueueListener. O id da requisição é anotado aqui, pois só existe no
+    contexto da thread que registrou o evento
+    """
+    def prepare(self, registro):
+        registro = copy.copy(registro)
+        registro.id_requisicao = id_requisicao_atual.get()
+        registro.msg = registro.getMessage()
+        registro.args = None
+        if registro.exc_info:
+            registro.exc_text = logging.Formatter().formatException(registro.exc_info)
+            registro.exc_info = None
+        return registro
+
+
+class SaidaLogs:
+    """
+    Liga o logger 'escritorio' a uma fila consumida por uma thread de segundo
+    plano, que grava os eventos em JSON (stderr ou arquivo): registrar um
+    evento nunca espera por E/S na thread da requisição
+    """
+    def __init__(self):
+        self._manipulador = None
+        self._destinos = ()
+        self._ouvinte = None
+        self._lock = threading.Lock()
+
+    def configurar(self, nivel='INFO', arquivo=None):
         """
-        Atualiza dados de um processo específico
+        Idempotente: chamadas seguintes apenas ajustam o nível
         """
-        if numero not in self.df['Numero_Processo'].values:
-            return False, f"Processo {numero} não encontrado."
-        
-        # Mapeamento dos campos
-        campos_mapeados = {
-            'cliente': 'Cliente',
-            'advogado': 'Advogado_Responsavel',
-            'tipo': 'Tipo_Acao',
-            'dataIntimacao': 'Data_Intimacao',
-            'diasPrazo': 'Dias_Prazo',
-            'status': 'Status'
-        }
-        
-        for campo_front, campo_db in campos_mapeados.items():
-            if campo_front in dados:
-                self.df.loc[self.df['Numero_Processo'] == numero, campo_db] = dados[campo_front]
-        
-        self.salvar_dados()
-        return True, f"Processo {numero} atualizado com sucesso."
-    
-    def remover_processo(self, numero):
+        log.setLevel(nivel)
+        with self._lock:
+            if self._manipulador is not None:
+                return
+            destino = logging.FileHandler(arquivo, encoding='utf-8') if arquivo else logging.StreamHandler()
+            destino.setFormatter(FormatadorJSON())
+            self._destinos = (destino,)
+            self._manipulador = ManipuladorFila(queue.SimpleQueue())
+            log.addHandler(self._manipulador)
+            log.propagate = False
+            self._iniciar()
+        atexit.register(self.encerrar)
+        # A thread do ouvinte não sobrevive ao fork (workers do gunicorn, pools de processos)
+        os.register_at_fork(after_in_child=self._apos_fork)
+
+    def _iniciar(self):
+        self._ouvinte = logging.handlers.QueueListener(self._manipulador.queue, *self._destinos)
+        self._ouvinte.start()
+
+    def _apos_fork(self):
+        # Eventos herdados na fila já serão gravados pelo processo pai. Com
+        # gevent o ouvinte é uma greenlet, que sobrevive ao fork: a fila
+        # herdada é esvaziada para que ele não os grave de novo (e fica
+        # parado nela, sem novos eventos)
+        herdada = self._manipulador.queue
+        while not herdada.empty():
+            herdada.get_nowait()
+        self._lock = threading.Lock()
+        self._manipulador.queue = queue.SimpleQueue()
+        self._iniciar()
+
+    def encerrar(self):
         """
-        Remove um processo da base de dados
+        Grava os eventos pendentes e para a thread
         """
-        if numero not in self.df['Numero_Processo'].values:
-            return False, f"Processo {numero} não encontrado."
-        
-        self.df = self.df[self.df['Numero_Processo'] != numero]
-        self.salvar_dados()
-        return True, f"Processo {numero} removido com sucesso."
-    
-    def salvar_dados(self):
+        with self._lock:
+            if self._ouvinte is not None:
+                self._ouvinte.stop()
+                self._ouvinte = None
+
+
+saida_logs = SaidaLogs()
+
+
+class ResumoErros:
+    """
+    Agrega erros repetidos por linha num único evento (total, contagem por
+    tipo e alguns exemplos) em vez de um evento por linha
+    """
+    def __init__(self, max_exemplos=5):
+        self.max_exemplos = max_exemplos
+        self.total = 0
+        self.por_tipo = Counter()
+        self.exemplos = []
+
+    def registrar(self, numero, erro):
+        self.total += 1
+        self.por_tipo[erro.__class__.__name__] += 1
+        if len(self.exemplos) < self.max_exemplos:
+            self.exemplos.append({'numero': str(numero), 'erro': str(erro)})
+
+    def emitir(self, evento, operacao):
+        if not self.total:
+            return
+        metricas.contar('escritorio_linhas_invalidas_total', self.total, operacao=operacao)
+        log.warning(evento, extra={'campos': {
+            'operacao': operacao,
+            'total': self.total,
+            'porTipo': dict(self.por_tipo),
+            'exemplos': self.exemplos
+        }})
+
+
+class ArmazemDocumentos:
+    """
+    Cache de documentos gerados endereçado por conteúdo (hash da versão do
+    template + dados de entrada), com escrita atômica e descarte LRU por
+    tamanho total e idade
+    """
+    def __init__(self, diretorio, tamanho_maximo=512 * 1024 * 1024, idade_maxima=30 * 86400,
+                 intervalo_limpeza=300):
+        self.diretorio = os.path.abspath(diretorio)
+        self.tamanho_maximo = tamanho_maximo
+        self.idade_maxima = idade_maxima
+        self.intervalo_limpeza = intervalo_limpeza
+        self._tamanho_total = None
+        self._ultima_limpeza = 0
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def __getstate__(self):
+        # O lock não atravessa processos (tarefas em ProcessPoolExecutor)
+        estado = self.__dict__.copy()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(*partes):
         """
-        Salva os dados no arquivo Excel
+        Hash estável das partes (dicionários são serializados com chaves ordenadas)
         """
-        try:
-            self.df.to_excel(self.arquivo_excel, index=False)
-            return True
-        except Exception as e:
-            print(f"Erro ao salvar dados: {e}")
-            return False
-    
-    def obter_todos_processos(self):
+        serializado = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+    def caminho(self, chave, extensao):
+        return os.path.join(self.diretorio, f"{chave}{extensao}")
+
+    def obter(self, chave, extensao):
         """
-        Retorna todos os processos em formato JSON
+        Retorna o caminho do documento em cache ou None; um acerto renova
+        o mtime, que serve de referência para o descarte LRU
         """
-        if self.df.empty:
-            return []
-        
-        processos = []
-        for _, row in self.df.iterrows():
-            processo = {
-                'numero': row['Numero_Processo'],
-                'cliente': row['Cliente'],
-                'advogado': row['Advogado_Responsavel'],
-                'tipo': row['Tipo_Acao'],
-                'dataCadastro': row['Data_Cadastro'],
-                'dataIntimacao': row['Data_Intimacao'],
-                'diasPrazo': int(row['Dias_Prazo']),
-                'status': row['Status']
-            }
-            processos.append(processo)
-        
-        return processos
-    
-    def calcular_prazos(self):
+        caminho = self.caminho(chave, extensao)
+        try:
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        return caminho
+
+    def guardar(self, chave, extensao, conteudo):
         """
-        Calcula prazos processuais e retorna informações de prazo
+        Grava o documento de forma atômica (arquivo temporário + rename)
         """
-        if self.df.empty:
-            return []
-        
-        processos_com_prazo = []
-        hoje = datetime.now().date()
-        
-        for _, row in self.df.iterrows():
+        if isinstance(conteudo, str):
+            conteudo = conteudo.encode('utf-8')
+        caminho = self.caminho(chave, extensao)
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        except BaseException:
             try:
-                data_intimacao = pd.to_datetime(row['Data_Intimacao']).date()
-                prazo_final = data_intimacao + timedelta(days=int(row['Dias_Prazo']))
-                dias_restantes = (prazo_final - hoje).days
-                
-                if dias_restantes < 0:
-                    status_prazo = 'vencido'
-                elif dias_restantes <= 2:
-                    status_prazo = 'critico'
-                elif dias_restantes <= 5:
-                    status_prazo = 'atencao'
-                else:
-                    status_prazo = 'normal'
-                
-                processo = {
-                    'numero': row['Numero_Processo'],
-                    'cliente': row['Cliente'],
-                    'advogado': row['Advogado_Responsavel'],
-                    'dataIntimacao': row['Data_Intimacao'],
-                    'prazoFinal': prazo_final.strftime('%Y-%m-%d'),
-                    'diasRestantes': dias_restantes,
-                    'statusPrazo': status_prazo
-                }
-                processos_com_prazo.append(processo)
-                
-            except Exception as e:
-                print(f"Erro ao calcular prazo para processo {row['Numero_Processo']}: {e}")
-        
-        return processos_com_prazo
-    
-    def gerar_contrato(self, dados_cliente, template_tipo='contrato_servicos'):
+                os.remove(temporario)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            if self._tamanho_total is not None:
+                self._tamanho_total += len(conteudo)
+            precisa_limpar = (
+                self._tamanho_total is None
+                or self._tamanho_total > self.tamanho_maximo
+                or time.time() - self._ultima_limpeza > self.intervalo_limpeza
+            )
+        if precisa_limpar:
+            self.limpar()
+        return caminho
+
+    def limpar(self):
         """
-        Gera um contrato personalizado
+        Remove documentos mais antigos que `idade_maxima` e, se o total ainda
+        exceder `tamanho_maximo`, os usados há mais tempo
         """
-        try:
-            # Template básico em memória (em produção, usar arquivos .docx reais)
-            templates = {
-                'contrato_servicos': {
-                    'titulo': 'CONTRATO DE PRESTAÇÃO DE SERVIÇOS JURÍDICOS',
-                    'conteudo': f"""
-CONTRATO DE PRESTAÇÃO DE SERVIÇOS JURÍDICOS
+        with self._lock:
+            agora = time.time()
+            entradas = []
+            for entrada in os.scandir(self.diretorio):
+                if not entrada.is_file() or entrada.name.endswith('.tmp'):
+                    continue
+                info = entrada.stat()
+                if agora - info.st_mtime > self.idade_maxima:
+                    self._remover(entrada.path)
+                else:
+                    entradas.append((info.st_mtime, info.st_size, entrada.path))
 
-CONTRATANTE: {dados_cliente.get('nome', '[NOME_CLIENTE]')}
-CPF: {dados_cliente.get('cpf', '[CPF_CLIENTE]')}
-Endereço: {dados_cliente.get('endereco', '[ENDERECO_CLIENTE]')}
-Telefone: {dados_cliente.get('telefone', '[TELEFONE_CLIENTE]')}
-E-mail: {dados_cliente.get('email', '[EMAIL_CLIENTE]')}
+            total = sum(tamanho for _, tamanho, _ in entradas)
+            entradas.sort()
+            for _, tamanho, caminho in entradas:
+                if total <= self.tamanho_maximo:
+                    break
+                self._remover(caminho)
+                total -= tamanho
 
-CONTRATADO: {dados_cliente.get('advogado', '[ADVOGADO]')}
+            self._tamanho_total = total
+            self._ultima_limpeza = agora
 
-Data: {datetime.now().strftime('%d/%m/%Y')}
+    @staticmethod
+    def _remover(caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
 
-Pelo presente instrumento, as partes acima qualificadas acordam
-as seguintes cláusulas e condições:
 
-CLÁUSULA 1ª - DO OBJETO
-O presente contrato tem por objeto a prestação de serviços jurídicos
-pelo CONTRATADO ao CONTRATANTE.
+def compactar_sqlite(conexao):
+    """
+    Incorpora o WAL ao banco e reescreve o arquivo sem páginas livres.
+    Retorna o tamanho liberado em bytes
+    """
+    tamanho = lambda: conexao.execute('PRAGMA page_count').fetchone()[0] * conexao.execute('PRAGMA page_size').fetchone()[0]
+    antes = tamanho()
+    conexao.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conexao.execute('VACUUM')
+    conexao.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return antes - tamanho()
 
-CLÁUSULA 2ª - DAS RESPONSABILIDADES
-O CONTRATADO compromete-se a prestar os serviços com diligência
-e em conformidade com a legislação vigente.
 
-CLÁUSULA 3ª - DO FORO
-Fica eleito o foro da comarca para dirimir quaisquer questões
-decorrentes do presente contrato.
+class ArmazemAnexos:
+    """
+    Anexos dos processos (intimações, petições): conteúdo endereçado por
+    SHA-256, de modo que arquivos idênticos são guardados uma única vez,
+    e índice em SQLite por número de processo
+    """
+    TAMANHO_BLOCO = 64 * 1024
+    # Tipos exibidos no navegador; os demais (HTML, SVG...) só como download,
+    # para que um anexo não execute scripts na origem da aplicação
+    TIPOS_EXIBIVEIS = frozenset({'application/pdf', 'image/png', 'image/jpeg', 'image/gif', 'image/webp'})
 
-____________________                    ____________________
-    CONTRATANTE                             CONTRATADO
-                    """
-                },
-                'procuracao': {
-                    'titulo': 'PROCURAÇÃO',
-                    'conteudo': f"""
-PROCURAÇÃO
+    def __init__(self, diretorio, tamanho_maximo=1024 * 1024 * 1024, validade_upload=24 * 3600):
+        self.diretorio = os.path.abspath(diretorio)
+        self.dir_objetos = os.path.join(self.diretorio, 'objetos')
+        self.dir_parciais = os.path.join(self.diretorio, 'parciais')
+        self.tamanho_maximo = tamanho_maximo
+        self.validade_upload = validade_upload
+        self._local = threading.local()
+        # Hash incremental dos uploads em partes: id -> (sha256, bytes já considerados)
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self._locks_upload = {}
+        # Notificados a cada anexo registrado (ex.: extração de texto)
+        self._ouvintes = []
+        os.makedirs(self.dir_objetos, exist_ok=True)
+        os.makedirs(self.dir_parciais, exist_ok=True)
+        self._conexao().execute("""
+            CREATE TABLE IF NOT EXISTS anexos (
+                id TEXT PRIMARY KEY,
+                numero TEXT NOT NULL,
+                nome TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                tipo TEXT,
+                usuario TEXT,
+                criado_em REAL NOT NULL
+            )
+        """)
+        self._conexao().execute('CREATE INDEX IF NOT EXISTS idx_anexos_numero ON anexos (numero)')
+        self._conexao().execute('CREATE INDEX IF NOT EXISTS idx_anexos_hash ON anexos (hash)')
+        # Texto extraído por conteúdo (um registro por hash) e índice de busca
+        self._conexao().execute("""
+            CREATE TABLE IF NOT EXISTS extracoes (
+                hash TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                erro TEXT,
+                atualizado_em REAL NOT NULL
+            )
+        """)
+        self._conexao().execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS textos USING fts5(
+                hash UNINDEXED,
+                conteudo,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
 
-OUTORGANTE: {dados_cliente.get('nome', '[NOME_CLIENTE]')}
-CPF: {dados_cliente.get('cpf', '[CPF_CLIENTE]')}
+    def _conexao(self):
+        """
+        Retorna a conexão SQLite da thread atual (criada sob demanda)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(os.path.join(self.diretorio, 'anexos.db'), timeout=10, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.row_factory = sqlite3.Row
+            self._local.conexao = conexao
+        return conexao
 
-OUTORGADO: {dados_cliente.get('advogado', '[ADVOGADO]')}
+    def fechar(self):
+        """
+        Fecha a conexão da thread atual (ex.: no processo mestre antes do fork)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
 
-Pelo presente instrumento, o OUTORGANTE nomeia e constitui
-seu bastante procurador o OUTORGADO, para representá-lo
-perante órgãos públicos e tribunais.
+    def caminho_objeto(self, hash_conteudo):
+        return os.path.join(self.dir_objetos, hash_conteudo[:2], hash_conteudo)
 
-Data: {datetime.now().strftime('%d/%m/%Y')}
+    def registrar_ouvinte(self, callback):
+        """
+        Registra uma função callback(anexo) chamada a cada anexo registrado
+        """
+        self._ouvintes.append(callback)
 
-____________________
-    OUTORGANTE
-                    """
-                }
-            }
-            
-            template = templates.get(template_tipo, templates['contrato_servicos'])
-            
-            # Criar arquivo temporário
-            temp_dir = tempfile.mkdtemp()
-            filename = f"{template['titulo']}_{dados_cliente.get('nome', 'Cliente')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-            filepath = os.path.join(temp_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(template['conteudo'])
-            
-            return True, filepath, filename
-            
-        except Exception as e:
-            return False, str(e), None
-    
-    def gerar_relatorio(self, mes=None, ano=None):
+    @staticmethod
+    def _para_dict(linha):
+        return {
+            'id': linha['id'],
+            'numero': linha['numero'],
+            'nome': linha['nome'],
+            'hash': linha['hash'],
+            'tamanho': linha['tamanho'],
+            'tipo': linha['tipo'],
+            'usuario': linha['usuario'],
+            'criadoEm': datetime.fromtimestamp(linha['criado_em']).strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def _copiar_fluxo(self, origem, destino, hasher, limite):
         """
-        Gera um relatório com estatísticas dos processos
+        Copia em blocos atualizando o hash; falha se passar de `limite` bytes
         """
-        if mes is None:
-            mes = datetime.now().month
-        if ano is None:
-            ano = datetime.now().year
-        
-        if self.df.empty:
-            return {
-                'periodo': f"{mes:02d}/{ano}",
-                'totalProcessos': 0,
-                'mensagem': 'Não há processos cadastrados'
+        copiados = 0
+        while True:
+            bloco = origem.read(self.TAMANHO_BLOCO)
+            if not bloco:
+                return copiados
+            copiados += len(bloco)
+            if copiados > limite:
+                raise ValueError('Arquivo maior que o tamanho permitido')
+            if hasher is not None:
+                hasher.update(bloco)
+            destino.write(bloco)
+
+    def _registrar(self, temporario, hash_conteudo, tamanho, numero, nome, tipo, usuario):
+        """
+        Move o conteúdo para o armazenamento (ou descarta, se já existir) e indexa o anexo
+        """
+        destino = self.caminho_objeto(hash_conteudo)
+        with self._lock:
+            if os.path.exists(destino):
+                os.remove(temporario)
+            else:
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                os.replace(temporario, destino)
+            linha = {
+                'id': secrets.token_urlsafe(12),
+                'numero': numero,
+                'nome': secure_filename(nome) or 'arquivo',
+                'hash': hash_conteudo,
+                'tamanho': tamanho,
+                'tipo': tipo,
+                'usuario': usuario,
+                'criado_em': time.time()
             }
-        
-        # Filtrar por mês/ano
-        df = self.df.copy()
+            self._conexao().execute(
+                'INSERT INTO anexos (id, numero, nome, hash, tamanho, tipo, usuario, criado_em) '
+                'VALUES (:id, :numero, :nome, :hash, :tamanho, :tipo, :usuario, :criado_em)',
+                linha
+            )
+        anexo = self._para_dict(linha)
+        for callback in self._ouvintes:
+            try:
+                callback(anexo)
+            except Exception:
+                log.exception('notificar_anexo_falhou', extra={'campos': {'anexo': anexo['id']}})
+        return anexo
+
+    def guardar(self, numero, nome, fluxo, tipo=None, usuario=None):
+        """
+        Upload em uma única requisição: grava em disco calculando o hash
+        """
+        hasher = hashlib.sha256()
+        fd, temporario = tempfile.mkstemp(dir=self.dir_parciais, suffix='.tmp')
         try:
-            df['Data_Cadastro'] = pd.to_datetime(df['Data_Cadastro'])
-            df_filtrado = df[
-                (df['Data_Cadastro'].dt.month == mes) & 
-                (df['Data_Cadastro'].dt.year == ano)
-            ]
-        except Exception as e:
-            print(f"Erro ao filtrar dados por período: {e}")
-            df_filtrado = df
-        
-        # Calcular estatísticas
-        total_processos = len(df_filtrado)
-        
-        if total_processos == 0:
-            return {
-                'periodo': f"{mes:02d}/{ano}",
-                'totalProcessos': 0,
-                'mensagem': f'Não há processos cadastrados para {mes:02d}/{ano}'
-            }
-        
-        processos_por_advogado = df_filtrado['Advogado_Responsavel'].value_counts().to_dict()
-        processos_por_tipo = df_filtrado['Tipo_Acao'].value_counts().to_dict()
-        processos_por_status = df_filtrado['Status'].value_counts().to_dict()
-        
-        # Calcular status dos prazos
-        processos_com_prazo = self.calcular_prazos()
-        status_prazos = {}
-        for processo in processos_com_prazo:
-            status = processo['statusPrazo']
-            status_prazos[status] = status_prazos.get(status, 0) + 1
-        
-        return {
-            'periodo': f"{mes:02d}/{ano}",
-            'totalProcessos': total_processos,
-            'processosPorAdvogado': processos_por_advogado,
-            'processosPorTipo': processos_por_tipo,
-            'processosPorStatus': processos_por_status,
-            'statusPrazos': status_prazos,
-            'dataGeracao': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-        }
-    
-    def buscar_processos(self, termo):
+            with os.fdopen(fd, 'wb') as f:
+                tamanho = self._copiar_fluxo(fluxo, f, hasher, self.tamanho_maximo)
+        except BaseException:
+            os.remove(temporario)
+            raise
+        return self._registrar(temporario, hasher.hexdigest(), tamanho, numero, nome, tipo, usuario)
+
+    def _caminhos_upload(self, id_upload):
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', id_upload or ''):
+            return None, None
+        base = os.path.join(self.dir_parciais, id_upload)
+        return base + '.json', base + '.parte'
+
+    def iniciar_upload(self, numero, nome, tamanho, tipo=None, usuario=None):
         """
-        Busca processos com base em termo
+        Abre um upload em partes e retorna seu identificador
         """
-        if self.df.empty or not termo:
-            return self.obter_todos_processos()
-        
-        # Buscar em múltiplas colunas
-        df_resultado = self.df[
-            self.df['Numero_Processo'].str.contains(termo, case=False, na=False) |
-            self.df['Cliente'].str.contains(termo, case=False, na=False) |
-            self.df['Advogado_Responsavel'].str.contains(termo, case=False, na=False) |
-            self.df['Tipo_Acao'].str.contains(termo, case=False, na=False)
-        ]
-        
-        processos = []
-        for _, row in df_resultado.iterrows():
-            processo = {
-                'numero': row['Numero_Processo'],
-                'cliente': row['Cliente'],
-                'advogado': row['Advogado_Responsavel'],
-                'tipo': row['Tipo_Acao'],
-                'dataCadastro': row['Data_Cadastro'],
-                'dataIntimacao': row['Data_Intimacao'],
-                'diasPrazo': int(row['Dias_Prazo']),
-                'status': row['Status']
-            }
-            processos.append(processo)
-        
-        return processos
+        if tamanho <= 0 or tamanho > self.tamanho_maximo:
+            raise ValueError('Tamanho do arquivo inválido ou acima do permitido')
+        self.limpar_uploads_expirados()
+        id_upload = secrets.token_urlsafe(16)
+        caminho_meta, caminho_parte = self._caminhos_upload(id_upload)
+        open(caminho_parte, 'wb').close()
+        with open(caminho_meta, 'w', encoding='utf-8') as f:
+            json.dump({'numero': numero, 'nome': nome, 'tamanho': tamanho, 'tipo': tipo, 'usuario': usuario}, f)
+        self._hashes[id_upload] = (hashlib.sha256(), 0)
+        return id_upload
 
+    def estado_upload(self, id_upload, usuario=None):
+        """
+        Bytes já recebidos de um upload (para retomada) ou None se não existir
+        """
+        caminho_meta, caminho_parte = self._caminhos_upload(id_upload)
+        try:
+            with open(caminho_meta, encoding='utf-8') as f:
+                meta = json.load(f)
+            recebido = os.path.getsize(caminho_parte)
+        except (TypeError, OSError, ValueError):
+            return None
+        if usuario is not None and meta['usuario'] != usuario:
+            return None
+        return {'upload': id_upload, 'recebido': recebido, 'tamanho': meta['tamanho'], 'meta': meta}
 
-class SistemaAutenticacao:
-    """
-    Sistema simples de autenticação para demonstração
-    """
-    def __init__(self):
-        # Usuários de demonstração (em produção, usar banco de dados)
-        self.usuarios = {
-            'admin@sistema.com': {
-                'senha': self.hash_senha('admin123'),
-                'nome': 'Administrador do Sistema',
-                'tipo': 'admin',
-                'ativo': True
-            },
-            'escritorio@juridico.com': {
-                'senha': self.hash_senha('juridico2025'),
-                'nome': 'Escritório Jurídico',
-                'tipo': 'escritorio',
-                'ativo': True
-            },
-            '123.456.789-00': {
-                'senha': self.hash_senha('advogado123'),
-                'nome': 'Dr. Silva Santos',
-                'tipo': 'advogado',
-                'ativo': True
-            }
-        }
-    
-    def hash_senha(self, senha):
+    def receber_parte(self, id_upload, inicio, fluxo, usuario=None, fim=None):
         """
-        Hash simples da senha (em produção, usar bcrypt ou similar)
+        Acrescenta uma parte a partir do byte `inicio` (até `fim`, exclusivo,
+        ou o fim do arquivo). Retorna (aceita, estado); ao receber o último
+        byte o anexo é registrado e incluído no estado
         """
-        return hashlib.sha256(senha.encode()).hexdigest()
-    
-    def validar_email(self, email):
+        with self._lock:
+            lock = self._locks_upload.setdefault(id_upload, threading.Lock())
+        with lock:
+            estado = self.estado_upload(id_upload, usuario)
+            if estado is None:
+                raise KeyError(id_upload)
+            meta = estado.pop('meta')
+            if inicio != estado['recebido']:
+                return False, estado
+
+            caminho_meta, caminho_parte = self._caminhos_upload(id_upload)
+            hasher, hasheados = self._hashes.get(id_upload, (None, 0))
+            if hasheados != estado['recebido']:
+                # Upload retomado em outro processo/reinício: o hash é refeito ao final
+                hasher = None
+            limite = meta['tamanho'] if fim is None else min(fim, meta['tamanho'])
+            with open(caminho_parte, 'ab') as f:
+                try:
+                    estado['recebido'] += self._copiar_fluxo(fluxo, f, hasher, limite - inicio)
+                except ValueError:
+                    # Parte maior que o intervalo: descartada inteira
+                    f.truncate(inicio)
+                    self._hashes.pop(id_upload, None)
+                    raise
+            if hasher is not None:
+                self._hashes[id_upload] = (hasher, estado['recebido'])
+
+            if estado['recebido'] == meta['tamanho']:
+                if hasher is None:
+                    hasher = hashlib.sha256()
+                    with open(caminho_parte, 'rb') as f:
+                        for bloco in iter(lambda: f.read(self.TAMANHO_BLOCO), b''):
+                            hasher.update(bloco)
+                estado['anexo'] = self._registrar(
+                    caminho_parte, hasher.hexdigest(), meta['tamanho'],
+                    meta['numero'], meta['nome'], meta['tipo'], meta['usuario']
+                )
+                os.remove(caminho_meta)
+                self._hashes.pop(id_upload, None)
+        if 'anexo' in estado:
+            with self._lock:
+                self._locks_upload.pop(id_upload, None)
+        return True, estado
+
+    def limpar_uploads_expirados(self):
         """
-        Valida formato de email
+        Remove uploads em partes abandonados
         """
-        import re
-        pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        return re.match(pattern, email) is not None
-    
-    def validar_cpf(self, cpf):
+        limite = time.time() - self.validade_upload
+        for entrada in os.scandir(self.dir_parciais):
+            if entrada.is_file() and entrada.stat().st_mtime < limite:
+                try:
+                    os.remove(entrada.path)
+                except FileNotFoundError:
+                    pass
+                self._hashes.pop(os.path.splitext(entrada.name)[0], None)
+
+    def compactar(self):
         """
-        Valida CPF brasileiro
+        Otimiza o índice de busca (funde os segmentos do FTS5) e compacta o banco
         """
-        cpf = ''.join(filter(str.isdigit, cpf))
-        
-        if len(cpf) != 11:
-            return False
-        
-        if cpf == cpf[0] * 11:
-            return False
-        
-        # Validação dos dígitos verificadores
-        soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
-        resto = 11 - (soma % 11)
-        if resto < 2:
-            resto = 0
-        if resto != int(cpf[9]):
-            return False
-        
-        soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
-        resto = 11 - (soma % 11)
-        if resto < 2:
-            resto = 0
-        if resto != int(cpf[10]):
-            return False
-        
-        return True
-    
-    def autenticar_usuario(self, usuario, senha):
+        self._conexao().execute("INSERT INTO textos (textos) VALUES ('optimize')")
+        return compactar_sqlite(self._conexao())
+
+    def listar(self, numero):
+        linhas = self._conexao().execute(
+            'SELECT * FROM anexos WHERE numero = ? ORDER BY criado_em', (numero,)
+        ).fetchall()
+        return [self._para_dict(linha) for linha in linhas]
+
+    def obter(self, id_anexo):
+        linha = self._conexao().execute('SELECT * FROM anexos WHERE id = ?', (id_anexo,)).fetchone()
+        return self._para_dict(linha) if linha else None
+
+    def remover(self, id_anexo):
         """
-        Autentica o usuário
+        Remove o anexo do índice; o conteúdo só é apagado quando nenhum
+        outro anexo o referencia
         """
-        # Verificar se o usuário existe
-        if usuario not in self.usuarios:
-            return False, "Usuário não encontrado"
-        
-        # Verificar senha
-        if self.usuarios[usuario]['senha'] != self.hash_senha(senha):
-            return False, "Senha incorreta"
-        
-        # Verificar se usuário está ativo
-        if not self.usuarios[usuario]['ativo']:
-            return False, "Usuário inativo"
-        
-        return True, self.usuarios[usuario]
-    
-    def validar_formato_usuario(self, usuario):
+        with self._lock:
+            anexo = self.obter(id_anexo)
+            if anexo is None:
+                return False
+            conexao = self._conexao()
+            conexao.execute('DELETE FROM anexos WHERE id = ?', (id_anexo,))
+            restantes = conexao.execute('SELECT COUNT(*) FROM anexos WHERE hash = ?', (anexo['hash'],)).fetchone()[0]
+            if not restantes:
+                conexao.execute('DELETE FROM textos WHERE hash = ?', (anexo['hash'],))
+                conexao.execute('DELETE FROM extracoes WHERE hash = ?', (anexo['hash'],))
+                try:
+                    os.remove(self.caminho_objeto(anexo['hash']))
+                except FileNotFoundError:
+                    pass
+            return True
+
+    def marcar_extracao(self, hash_conteudo):
         """
-        Valida se o formato do usuário é email ou CPF válido
+        Reserva a extração de um conteúdo; False se já foi feita ou está em andamento
         """
-        if self.validar_email(usuario):
-            return True, "email"
-        elif self.validar_cpf(usuario):
-            return True, "cpf"
-        else:
-            return False, "inválido"
+        cursor = self._conexao().execute(
+            'INSERT OR IGNORE INTO extracoes (hash, status, atualizado_em) VALUES (?, ?, ?)',
+            (hash_conteudo, 'pendente', time.time())
+        )
+        return cursor.rowcount == 1
 
+    def extracoes_pendentes(self):
+        """
+        Anexos cujo conteúdo ainda não teve o texto extraído (ex.: após reinício)
+        """
+        return [self._para_dict(linha) for linha in self._conexao().execute("""
+            SELECT a.* FROM anexos a
+            LEFT JOIN extracoes e ON e.hash = a.hash
+            WHERE e.hash IS NULL OR e.status = 'pendente'
+            GROUP BY a.hash
+        """).fetchall()]
 
-# Inicializar Flask
-app = Flask(__name__)
-app.secret_key = 'sua_chave_secreta_super_segura_aqui'  # Em produção, usar variável de ambiente
-CORS(app, supports_credentials=True)  # Permitir cookies para sessão
+    def gravar_texto(self, hash_conteudo, texto=None, erro=None):
+        """
+        Grava o texto extraído no índice de busca (ou o erro da extração)
+        """
+        conexao = self._conexao()
+        with self._lock:
+            conexao.execute('BEGIN')
+            try:
+                conexao.execute('DELETE FROM textos WHERE hash = ?', (hash_conteudo,))
+                if texto:
+                    conexao.execute('INSERT INTO textos (hash, conteudo) VALUES (?, ?)', (hash_conteudo, texto))
+                conexao.execute(
+                    'INSERT OR REPLACE INTO extracoes (hash, status, erro, atualizado_em) VALUES (?, ?, ?, ?)',
+                    (hash_conteudo, 'erro' if erro else 'concluida', erro, time.time())
+                )
+                conexao.execute('COMMIT')
+            except BaseException:
+                conexao.execute('ROLLBACK')
+                raise
 
-# Configurações
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs('dados', exist_ok=True)
-os.makedirs('documentos_gerados', exist_ok=True)
+    @staticmethod
+    def _consulta_fts(termos):
+        """
+        Converte o texto digitado numa consulta FTS5 segura (termos entre
+        aspas, todos obrigatórios, o último como prefixo)
+        """
+        palavras = [p.replace('"', '""') for p in termos.split()]
+        if not palavras:
+            return None
+        consulta = ' '.join(f'"{p}"' for p in palavras)
+        return consulta + '*'
 
-# Inicializar sistemas
-automacao = AutomatizacaoEscritorio('dados/processos.xlsx')
-auth_sistema = SistemaAutenticacao()
+    def buscar_texto(self, termos, limite=50):
+        """
+        Processos ordenados pelo número de documentos que casam com os termos
+        (desempate pela relevância BM25), com os anexos e trechos encontrados
+        """
+        consulta = self._consulta_fts(termos)
+        if consulta is None:
+            return []
+        linhas = self._conexao().execute("""
+            WITH encontrados AS MATERIALIZED (
+                SELECT hash, bm25(textos) AS pontuacao,
+                       snippet(textos, 1, '[', ']', '…', 12) AS trecho
+                FROM textos WHERE textos MATCH ?
+            )
+            SELECT a.numero, COUNT(*) AS documentos, MIN(e.pontuacao) AS pontuacao,
+                   json_group_array(json_object('id', a.id, 'nome', a.nome, 'trecho', e.trecho)) AS anexos
+            FROM encontrados e JOIN anexos a ON a.hash = e.hash
+            GROUP BY a.numero
+            ORDER BY documentos DESC, pontuacao ASC
+            LIMIT ?
+        """, (consulta, limite)).fetchall()
+        return [{
+            'numero': linha['numero'],
+            'documentos': linha['documentos'],
+            'pontuacao': round(-linha['pontuacao'], 4),
+            'anexos': json.loads(linha['anexos'])
+        } for linha in linhas]
 
-# HTML da página de login
-LOGIN_HTML = """
-<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sistema Jurídico - Login</title>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
 
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #2E8B87 0%, #008080 50%, #20B2AA 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            padding: 20px;
-            position: relative;
-            overflow-x: hidden;
-        }
+# Tamanho máximo de texto indexado por documento (caracteres)
+LIMITE_TEXTO_EXTRAIDO = 5 * 1024 * 1024
 
-        body::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: url("data:image/svg+xml,%3Csvg width='60' height='60' viewBox='0 0 60 60' xmlns='http://www.w3.org/2000/svg'%3E%3Cg fill='none' fill-rule='evenodd'%3E%3Cg fill='%23ffffff' fill-opacity='0.05'%3E%3Ccircle cx='9' cy='9' r='1'/%3E%3Ccircle cx='49' cy='49' r='1'/%3E%3Ccircle cx='19' cy='29' r='1'/%3E%3Ccircle cx='39' cy='39' r='1'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E");
-            animation: float 20s infinite linear;
-        }
 
-        @keyframes float {
-            0% { transform: translateY(0px); }
-            100% { transform: translateY(-100px); }
-        }
+def extrair_texto(caminho, extensao):
+    """
+    Extrai o texto de um anexo .docx ou .txt (executada em processo separado)
+    """
+    if extensao == '.docx':
+        documento = docx.Document(caminho)
+        partes = [paragrafo.text for paragrafo in documento.paragraphs]
+        for tabela in documento.tables:
+            for linha in tabela.rows:
+                partes.append(' '.join(celula.text for celula in linha.cells))
+        texto = '\n'.join(partes)
+    else:
+        with open(caminho, 'rb') as f:
+            bruto = f.read(LIMITE_TEXTO_EXTRAIDO * 4)
+        try:
+            texto = bruto.decode('utf-8')
+        except UnicodeDecodeError:
+            texto = bruto.decode('latin-1')
+    return texto[:LIMITE_TEXTO_EXTRAIDO]
 
-        .login-container {
-            background: rgba(255, 255, 255, 0.95);
-            border-radius: 24px;
-            padding: 48px 40px;
-            box-shadow: 0 32px 64px rgba(0, 0, 0, 0.2);
-            width: 100%;
-            max-width: 450px;
-            backdrop-filter: blur(20px);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            position: relative;
-            z-index: 10;
-            animation: slideUp 0.8s ease-out;
-        }
 
-        @keyframes slideUp {
-            from { opacity: 0; transform: translateY(40px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
+class ExtratorTextos:
+    """
+    Pipeline em segundo plano: extrai o texto dos anexos num pool de
+    processos e alimenta o índice de busca do ArmazemAnexos
+    """
+    EXTENSOES = ('.docx', '.txt')
 
-        .logo {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            width: 90px;
-            height: 90px;
-            background: linear-gradient(135deg, #008080, #20B2AA);
-            border-radius: 22px;
-            margin: 0 auto 24px;
-            box-shadow: 0 12px 28px rgba(0, 128, 128, 0.35);
-        }
+    def __init__(self, armazem, max_trabalhadores=2):
+        self.armazem = armazem
+        self.max_trabalhadores = max_trabalhadores
+        self._executor = None
+        self._lock = threading.Lock()
 
-        .logo i {
-            font-size: 36px;
-            color: white;
-        }
+    def _obter_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_trabalhadores)
+            return self._executor
 
-        h1 {
-            text-align: center;
-            color: #1a202c;
-            font-size: 32px;
-            font-weight: 800;
-            margin-bottom: 8px;
-        }
+    def agendar(self, anexo, reservar=True):
+        """
+        Ouvinte do ArmazemAnexos: agenda a extração de um conteúdo novo
+        """
+        extensao = os.path.splitext(anexo['nome'])[1].lower()
+        if extensao not in self.EXTENSOES:
+            return False
+        # Na retomada a extração já consta como pendente
+        if not self.armazem.marcar_extracao(anexo['hash']) and reservar:
+            return False
+        futuro = self._obter_executor().submit(
+            extrair_texto, self.armazem.caminho_objeto(anexo['hash']), extensao
+        )
+        futuro.add_done_callback(functools.partial(self._concluir, anexo['hash']))
+        return True
 
-        .subtitle {
-            text-align: center;
-            color: #64748b;
-            font-size: 16px;
-            margin-bottom: 40px;
-        }
+    def _concluir(self, hash_conteudo, futuro):
+        try:
+            with metricas.medir('indexar_texto_anexo'):
+                erro = futuro.exception()
+                if erro is not None:
+                    self.armazem.gravar_texto(hash_conteudo, erro=str(erro) or erro.__class__.__name__)
+                else:
+                    self.armazem.gravar_texto(hash_conteudo, futuro.result())
+        except Exception:
+            log.exception('indexar_anexo_falhou', extra={'campos': {'hash': hash_conteudo}})
 
-        .form-group {
-            margin-bottom: 28px;
-        }
+    def retomar(self):
+        """
+        Reagenda extrações que não terminaram (ex.: servidor reiniciado)
+        """
+        agendados = 0
+        for anexo in self.armazem.extracoes_pendentes():
+            agendados += self.agendar(anexo, reservar=False)
+        return agendados
 
-        label {
-            display: block;
-            color: #374151;
-            font-weight: 700;
-            font-size: 14px;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
+    def encerrar(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
 
-        .input-container {
-            position: relative;
-        }
 
-        .input-icon {
-            position: absolute;
-            left: 20px;
-            top: 50%;
-            transform: translateY(-50%);
-            color: #9ca3af;
-            font-size: 18px;
-            z-index: 2;
-        }
+class _BufferSaida:
+    """
+    Destino de escrita não posicionável: o zipfile grava aqui e o gerador
+    de exportação repassa os bytes acumulados ao cliente
+    """
+    def __init__(self):
+        self._dados = bytearray()
 
-        .form-control {
-            width: 100%;
-            height: 58px;
-            padding: 0 58px 0 58px;
-            border: 2px solid #e5e7eb;
-            border-radius: 16px;
-            font-size: 16px;
-            background: #ffffff;
-            transition: all 0.3s ease;
-            color: #374151;
-            font-weight: 500;
-        }
+    def write(self, dados):
+        self._dados += dados
+        return len(dados)
 
-        .form-control:focus {
-            outline: none;
-            border-color: #008080;
-            box-shadow: 0 0 0 6px rgba(0, 128, 128, 0.12);
-        }
+    def flush(self):
+        pass
 
-        .password-toggle {
-            position: absolute;
-            right: 20px;
-            top: 50%;
-            transform: translateY(-50%);
-            color: #9ca3af;
-            cursor: pointer;
-            font-size: 18px;
-            z-index: 2;
-        }
+    def __len__(self):
+        return len(self._dados)
 
-        .password-toggle:hover {
-            color: #008080;
-        }
+    def esvaziar(self):
+        dados = bytes(self._dados)
+        self._dados.clear()
+        return dados
 
-        .btn-login {
-            width: 100%;
-            height: 58px;
-            background: linear-gradient(135deg, #008080, #20B2AA);
-            color: white;
-            border: none;
-            border-radius: 16px;
-            font-size: 17px;
-            font-weight: 700;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 12px;
-            margin-top: 36px;
-            box-shadow: 0 8px 20px rgba(0, 128, 128, 0.35);
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
 
-        .btn-login:hover:not(:disabled) {
-            transform: translateY(-3px);
-            box-shadow: 0 12px 28px rgba(0, 128, 128, 0.45);
-        }
+class ExportadorPlanilha:
+    """
+    Gera CSV e XLSX linha a linha (memória constante); os bytes são
+    entregues em blocos para que o download comece imediatamente
+    """
+    TIPOS = {
+        'csv': 'text/csv',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    }
+    # Caracteres de controle não permitidos em XML
+    _INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
 
-        .btn-login:disabled {
-            opacity: 0.7;
-            cursor: not-allowed;
-        }
+    def __init__(self, tamanho_bloco=64 * 1024):
+        self.tamanho_bloco = tamanho_bloco
 
-        .alert {
-            padding: 18px 20px;
-            border-radius: 14px;
-            margin-bottom: 28px;
-            display: flex;
-            align-items: center;
-            gap: 14px;
-            font-size: 15px;
-            font-weight: 600;
-        }
+    def gerar(self, formato, cabecalho, linhas, titulo='Dados'):
+        if formato == 'xlsx':
+            return self.xlsx(cabecalho, linhas, titulo)
+        return self.csv(cabecalho, linhas)
 
-        .alert-error {
-            background: linear-gradient(135deg, #fef2f2, #fee2e2);
-            border: 1px solid #fecaca;
-            color: #dc2626;
-        }
+    @staticmethod
+    def _valor(valor):
+        """
+        Normaliza valores do pandas/numpy para escrita
+        """
+        if valor is None:
+            return ''
+        if isinstance(valor, datetime):
+            return valor.strftime('%Y-%m-%d')
+        if hasattr(valor, 'item'):
+            valor = valor.item()
+        if isinstance(valor, float) and valor != valor:
+            return ''
+        return valor
 
-        .alert-success {
-            background: linear-gradient(135deg, #f0fdf4, #dcfce7);
-            border: 1px solid #bbf7d0;
-            color: #16a34a;
-        }
+    def csv(self, cabecalho, linhas):
+        # BOM e ';' para abrir direto no Excel em português
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, delimiter=';')
+        buffer.write('\ufeff')
+        escritor.writerow(cabecalho)
+        for linha in linhas:
+            escritor.writerow([self._valor(v) for v in linha])
+            if buffer.tell() >= self.tamanho_bloco:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
 
-        .demo-section {
-            margin-top: 40px;
-            padding-top: 32px;
-            border-top: 1px solid #e5e7eb;
-        }
+    @staticmethod
+    def _coluna(indice):
+        letras = ''
+        indice += 1
+        while indice:
+            indice, resto = divmod(indice - 1, 26)
+            letras = chr(65 + resto) + letras
+        return letras
 
-        .demo-title {
-            text-align: center;
-            color: #6b7280;
-            font-size: 13px;
-            font-weight: 700;
-            margin-bottom: 20px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
+    def _linha_xml(self, numero, valores, colunas):
+        celulas = []
+        for coluna, valor in zip(colunas, valores):
+            valor = self._valor(valor)
+            referencia = f'{coluna}{numero}'
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                texto = escapar_xml(self._INVALIDOS_XML.sub('', str(valor)))
+                celulas.append(f'<c r="{referencia}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>')
+            else:
+                celulas.append(f'<c r="{referencia}"><v>{valor}</v></c>')
+        return f'<row r="{numero}">{"".join(celulas)}</row>'
 
-        .demo-user {
-            background: linear-gradient(135deg, #f8fafc, #f1f5f9);
-            border: 1px solid #e2e8f0;
-            border-radius: 12px;
-            padding: 16px 20px;
-            margin-bottom: 12px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
+    def xlsx(self, cabecalho, linhas, titulo='Dados'):
+        """
+        Planilha mínima (SpreadsheetML) escrita direto num zip em fluxo;
+        o openpyxl em modo write-only só monta o arquivo no save()
+        """
+        titulo = escapar_xml(re.sub(r'[\[\]:*?/\\]', '', titulo)[:31] or 'Dados', {'"': '&quot;'})
+        estaticos = {
+            '[Content_Types].xml': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/worksheets/sheet1.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                '</Types>'
+            ),
+            '_rels/.rels': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                'Target="xl/workbook.xml"/>'
+                '</Relationships>'
+            ),
+            'xl/workbook.xml': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{titulo}" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            ),
+            'xl/_rels/workbook.xml.rels': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                'Target="worksheets/sheet1.xml"/>'
+                '</Relationships>'
+            )
         }
 
-        .demo-user:hover {
-            background: linear-gradient(135deg, #f1f5f9, #e2e8f0);
-            transform: translateX(4px);
-        }
+        colunas = [self._coluna(i) for i in range(len(cabecalho))]
+        saida = _BufferSaida()
+        with zipfile.ZipFile(saida, 'w', zipfile.ZIP_DEFLATED) as pacote:
+            for nome, conteudo in estaticos.items():
+                pacote.writestr(nome, conteudo)
+            yield saida.esvaziar()
 
-        .demo-user-email {
-            font-size: 14px;
-            font-weight: 700;
-            color: #374151;
-        }
+            with pacote.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+                planilha.write((
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                    + self._linha_xml(1, cabecalho, colunas)
+                ).encode('utf-8'))
+                for numero, linha in enumerate(linhas, 2):
+                    planilha.write(self._linha_xml(numero, linha, colunas).encode('utf-8'))
+                    if len(saida) >= self.tamanho_bloco:
+                        yield saida.esvaziar()
+                planilha.write(b'</sheetData></worksheet>')
+        yield saida.esvaziar()
 
-        .demo-user-role {
-            font-size: 12px;
-            color: #6b7280;
-            text-transform: uppercase;
-        }
 
-        .loading-spinner {
-            width: 22px;
-            height: 22px;
-            border: 3px solid rgba(255, 255, 255, 0.3);
-            border-top: 3px solid white;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
+class IndicePrazos:
+    """
+    Prazos ordenados por data final (geral e por advogado) para consultas
+    de intervalo e "próximos N" com busca binária
+    """
+    def __init__(self):
+        # Listas ordenadas de (ordinal do prazo final, número) e dados de cada processo
+        self._geral = []
+        self._por_advogado = {}
+        self._entradas = {}
+        self._lock = threading.Lock()
 
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
+    @staticmethod
+    def _chave(prazo_final, numero):
+        return (prazo_final.toordinal(), str(numero))
 
-        .format-hint {
-            margin-top: 8px;
-            font-size: 12px;
-            color: #6b7280;
-            font-style: italic;
-        }
-    </style>
-</head>
-<body>
-    <div class="login-container">
-        <div class="logo">
-            <i class="fas fa-balance-scale"></i>
-        </div>
-        <h1>Sistema Jurídico</h1>
-        <p class="subtitle">Faça login para acessar o sistema</p>
+    @classmethod
+    def construir(cls, df):
+        """
+        Monta o índice a partir do DataFrame com uma única ordenação
+        """
+        indice = cls()
+        if df.empty:
+            return indice
+        prazos = (
+            pd.to_datetime(df['Data_Intimacao'], errors='coerce')
+            + pd.to_timedelta(pd.to_numeric(df['Dias_Prazo'], errors='coerce'), unit='D')
+        )
+        validos = prazos.notna()
+        colunas = zip(
+            df['Numero_Processo'][validos], df['Cliente'][validos], df['Advogado_Responsavel'][validos],
+            df['Data_Intimacao'][validos], prazos[validos]
+        )
+        for numero, cliente, advogado, data_intimacao, prazo_final in colunas:
+            prazo_final = prazo_final.date()
+            chave = cls._chave(prazo_final, numero)
+            indice._entradas[chave[1]] = (chave, advogado, {
+                'numero': numero,
+                'cliente': cliente,
+                'advogado': advogado,
+                'dataIntimacao': data_intimacao,
+                'prazoFinal': prazo_final.strftime('%Y-%m-%d')
+            })
+            indice._geral.append(chave)
+            indice._por_advogado.setdefault(advogado, []).append(chave)
+        indice._geral.sort()
+        for chaves in indice._por_advogado.values():
+            chaves.sort()
+        return indice
 
-        <div id="alertContainer"></div>
+    def __len__(self):
+        return len(self._entradas)
 
-        <form id="loginForm">
-            <div class="form-group">
-                <label for="usuario">E-mail ou CPF</label>
-                <div class="input-container">
-                    <i class="fas fa-user input-icon"></i>
-                    <input 
-                        type="text" 
-                        id="usuario" 
-                        name="usuario" 
-                        class="form-control" 
-                        placeholder="seu@email.com ou 000.000.000-00"
-                        required
-                    >
-                </div>
-                <div class="format-hint">
-                    Formato aceito: e-mail válido ou CPF (000.000.000-00)
-                </div>
-            </div>
+    def definir(self, numero, prazo_final, dados):
+        """
+        Insere ou reposiciona o prazo de um processo
+        """
+        with self._lock:
+            self._remover(numero)
+            chave = self._chave(prazo_final, numero)
+            advogado = dados['advogado']
+            self._entradas[chave[1]] = (chave, advogado, dados)
+            bisect.insort(self._geral, chave)
+            bisect.insort(self._por_advogado.setdefault(advogado, []), chave)
 
-            <div class="form-group">
-                <label for="senha">Senha</label>
-                <div class="input-container">
-                    <i class="fas fa-lock input-icon"></i>
-                    <input 
-                        type="password" 
-                        id="senha" 
-                        name="senha" 
-                        class="form-control" 
-                        placeholder="Digite sua senha"
-                        required
-                    >
-                    <i class="fas fa-eye password-toggle" id="togglePassword"></i>
-                </div>
-            </div>
+    def remover(self, numero):
+        with self._lock:
+            self._remover(numero)
 
-            <button type="submit" class="btn-login" id="btnLogin">
-                <span id="loginText">
-                    <i class="fas fa-sign-in-alt"></i>
-                    Entrar no Sistema
-                </span>
-                <div class="loading-spinner" id="loginSpinner" style="display: none;"></div>
-            </button>
-        </form>
+    def _remover(self, numero):
+        entrada = self._entradas.pop(str(numero), None)
+        if entrada is None:
+            return
+        chave, advogado, _ = entrada
+        for lista in (self._geral, self._por_advogado.get(advogado, [])):
+            posicao = bisect.bisect_left(lista, chave)
+            if posicao < len(lista) and lista[posicao] == chave:
+                del lista[posicao]
+        if not self._por_advogado.get(advogado, True):
+            del self._por_advogado[advogado]
 
-        <div class="demo-section">
-            <div class="demo-title">Contas de Demonstração</div>
-            <div class="demo-user" onclick="preencherCredenciais('admin@sistema.com', 'admin123')">
-                <div>
-                    <div class="demo-user-email">admin@sistema.com</div>
-                    <div class="demo-user-role">Administrador</div>
-                </div>
-                <i class="fas fa-crown" style="color: #9ca3af;"></i>
-            </div>
-            <div class="demo-user" onclick="preencherCredenciais('escritorio@juridico.com', 'juridico2025')">
-                <div>
-                    <div class="demo-user-email">escritorio@juridico.com</div>
-                    <div class="demo-user-role">Escritório</div>
-                </div>
-                <i class="fas fa-building" style="color: #9ca3af;"></i>
-            </div>
-            <div class="demo-user" onclick="preencherCredenciais('123.456.789-00', 'advogado123')">
-                <div>
-                    <div class="demo-user-email">123.456.789-00</div>
-                    <div class="demo-user-role">Advogado</div>
-                </div>
-                <i class="fas fa-gavel" style="color: #9ca3af;"></i>
-            </div>
-        </div>
-    </div>
+    def consultar(self, inicio, fim, advogado=None, limite=None):
+        """
+        Prazos com data final entre `inicio` e `fim` (inclusive), em ordem;
+        `limite` interrompe após os N primeiros
+        """
+        with self._lock:
+            lista = self._geral if advogado is None else self._por_advogado.get(advogado, [])
+            ordinal_inicio, ordinal_fim = inicio.toordinal(), fim.toordinal()
+            posicao = bisect.bisect_left(lista, (ordinal_inicio,))
+            final = bisect.bisect_left(lista, (ordinal_fim + 1,))
+            if limite is not None:
+                final = min(final, posicao + limite)
+            return [self._entradas[numero][2] for _, numero in lista[posicao:final]]
 
-    <script>
-        // Toggle senha
-        document.getElementById('togglePassword').addEventListener('click', function() {
-            const senha = document.getElementById('senha');
-            if (senha.type === 'password') {
-                senha.type = 'text';
-                this.classList.remove('fa-eye');
-                this.classList.add('fa-eye-slash');
-            } else {
-                senha.type = 'password';
-                this.classList.remove('fa-eye-slash');
-                this.classList.add('fa-eye');
-            }
-        });
+    def contar_por_dias(self, hoje, limites):
+        """
+        Quantidade de prazos em cada faixa de dias restantes: `limites`
+        crescentes [a, b, ...] geram as faixas (< a), [a, b), ..., (>= último)
+        """
+        with self._lock:
+            posicoes = [bisect.bisect_left(self._geral, (hoje.toordinal() + limite,)) for limite in limites]
+            total = len(self._geral)
+        bordas = [0] + posicoes + [total]
+        return [bordas[i + 1] - bordas[i] for i in range(len(bordas) - 1)]
 
-        // Preencher credenciais
-        function preencherCredenciais(usuario, senha) {
-            document.getElementById('usuario').value = usuario;
-            document.getElementById('senha').value = senha;
-        }
 
-        // Mostrar alerta
-        function mostrarAlerta(tipo, mensagem) {
-            const container = document.getElementById('alertContainer');
-            container.innerHTML = `
-                <div class="alert alert-${tipo}">
-                    <i class="fas fa-${tipo === 'error' ? 'exclamation-triangle' : 'check-circle'}"></i>
-                    ${mensagem}
-                </div>
-            `;
-            setTimeout(() => container.innerHTML = '', 5000);
-        }
+class DetectorClientesDuplicados:
+    """
+    Agrupa grafias diferentes do mesmo cliente ("João Silva", "Joao da Silva").
+    Nomes normalizados são indexados por trigramas (blocking), de modo que
+    só pares que compartilham trigramas pouco frequentes são comparados;
+    nomes com números só são comparados com os que têm os mesmos números
+    """
+    PALAVRAS_IGNORADAS = {'da', 'de', 'do', 'das', 'dos', 'e', 'dr', 'dra', 'sr', 'sra'}
 
-        // Form submit
-        document.getElementById('loginForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const btn = document.getElementById('btnLogin');
-            const texto = document.getElementById('loginText');
-            const spinner = document.getElementById('loginSpinner');
-            
-            const usuario = document.getElementById('usuario').value.trim();
-            const senha = document.getElementById('senha').value;
-            
-            if (!usuario || !senha) {
-                mostrarAlerta('error', 'Preencha todos os campos');
-                return;
-            }
-            
-            btn.disabled = true;
-            texto.style.display = 'none';
-            spinner.style.display = 'block';
-            
-            try {
-                const response = await fetch('/api/login', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ usuario, senha })
-                });
-                
-                const data = await response.json();
-                
-                if (data.success) {
-                    mostrarAlerta('success', 'Login realizado! Redirecionando...');
-                    setTimeout(() => window.location.href = '/dashboard', 1500);
-                } else {
-                    mostrarAlerta('error', data.error || 'Erro no login');
-                }
-            } catch (error) {
-                mostrarAlerta('error', 'Erro de conexão');
-            } finally {
-                btn.disabled = false;
-                texto.style.display = 'flex';
-                spinner.style.display = 'none';
-            }
-        });
+    def __init__(self, limiar=0.85, max_bloco=500, limiar_candidato=0.6):
+        self.limiar = limiar
+        self.max_bloco = max_bloco
+        self.limiar_candidato = limiar_candidato
+        # nome original -> quantidade de processos
+        self._contagem = Counter()
+        # nome normalizado -> (trigramas, nomes originais)
+        self._normalizados = {}
+        # trigrama -> nomes normalizados (sem números) que o contêm
+        self._postings = {}
+        # números do nome -> nomes normalizados com exatamente esses números
+        self._por_numeros = {}
+        # arestas de similaridade entre nomes normalizados
+        self._semelhantes = {}
+        self._lock = threading.Lock()
 
-        document.getElementById('usuario').focus();
-    </script>
-</body>
-</html>
-"""
+    @classmethod
+    def normalizar(cls, nome):
+        """
+        Minúsculas, sem acentos, pontuação nem partículas ("da", "dos"...)
+        """
+        texto = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii').lower()
+        palavras = re.findall(r'[a-z0-9]+', texto)
+        return ' '.join(p for p in palavras if p not in cls.PALAVRAS_IGNORADAS)
 
-# Interface principal do dashboard
-DASHBOARD_HTML = """
-<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sistema de Automação - Escritório de Advocacia</title>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background-color: #008080;
-            min-height: 100vh;
-            color: #333;
-        }
-        
-        .container { max-width: 1200px; margin: 0 auto; padding: 20px; }
-        
-        .header {
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            border-radius: 15px;
-            padding: 20px;
-            margin-bottom: 20px;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        
-        .header h1 { color: #2c3e50; font-size: 2.2em; }
-        .header p { color: #7f8c8d; font-size: 1.1em; }
-        
-        .user-info {
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }
-        
-        .user-avatar {
-            width: 45px;
-            height: 45px;
-            background: linear-gradient(135deg, #008080, #20B2AA);
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: bold;
-        }
-        
-        .nav-tabs {
-            display: flex;
-            gap: 5px;
-            margin-bottom: 20px;
-            background: rgba(255, 255, 255, 0.1);
-            padding: 5px;
-            border-radius: 12px;
-            backdrop-filter: blur(10px);
-        }
-        
-        .nav-tab {
-            flex: 1;
-            padding: 12px 20px;
-            background: transparent;
-            border: none;
-            border-radius: 8px;
-            color: white;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-weight: 500;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 8px;
-        }
-        
-        .nav-tab:hover {
-            background: rgba(255, 255, 255, 0.1);
-            transform: translateY(-2px);
-        }
-        
-        .nav-tab.active {
-            background: rgba(255, 255, 255, 0.95);
-            color: #2c3e50;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        }
-        
-        .content-panel {
-            display: none;
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-            animation: fadeIn 0.5s ease-in;
-        }
-        
-        .content-panel.active { display: block; }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        .btn {
-            padding: 12px 25px;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-weight: 600;
-            font-size: 14px;
-            transition: all 0.3s ease;
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            text-decoration: none;
-            margin-right: 10px;
-            margin-bottom: 10px;
-        }
-        
-        .btn-primary { background: linear-gradient(45deg, #008080, #20B2AA); color: white; }
-        .btn-success { background: linear-gradient(45deg, #56ab2f, #a8e6cf); color: white; }
-        .btn-danger { background: linear-gradient(45deg, #ff6b6b, #ee5a24); color: white; }
-        .btn:hover { transform: translateY(-2px); box-shadow: 0 5px 15px rgba(0, 0, 0, 0.2); }
-        
-        .table-container {
-            overflow-x: auto;
-            margin-top: 20px;
-            border-radius: 8px;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        }
-        
-        table { width: 100%; border-collapse: collapse; background: white; }
-        th, td { padding: 12px 15px; text-align: left; border-bottom: 1px solid #e9ecef; }
-        th { background: #f8f9fa; font-weight: 600; color: #2c3e50; }
-        tr:hover { background: #f8f9fa; }
-        
-        .form-group { margin-bottom: 20px; }
-        .form-row { display: grid; grid-template-columns: 1fr 1fr; gap: 15px; }
-        label { display: block; margin-bottom: 8px; font-weight: 600; color: #2c3e50; }
-        input, select, textarea {
-            width: 100%;
-            padding: 12px 15px;
-            border: 2px solid #e9ecef;
-            border-radius: 8px;
-            font-size: 14px;
-            transition: all 0.3s ease;
-            background: #fff;
-        }
-        input:focus, select:focus, textarea:focus {
-            outline: none;
-            border-color: #667eea;
-            box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-        }
-        
-        .search-box {
-            position: relative;
-            margin-bottom: 20px;
-        }
-        .search-box input { padding-left: 45px; }
-        .search-box i {
-            position: absolute;
-            left: 15px;
-            top: 50%;
-            transform: translateY(-50%);
-            color: #7f8c8d;
-        }
-        
-        .modal {
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0, 0, 0, 0.5);
-            z-index: 1000;
-            backdrop-filter: blur(5px);
-        }
-        
-        .modal-content {
-            background: white;
-            margin: 5% auto;
-            padding: 30px;
-            border-radius: 15px;
-            width: 90%;
-            max-width: 600px;
-            max-height: 80vh;
-            overflow-y: auto;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-        }
-        
-        .modal-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 20px;
-        }
-        
-        .close {
-            background: none;
-            border: none;
-            font-size: 1.5em;
-            cursor: pointer;
-            color: #7f8c8d;
-            padding: 5px;
-            border-radius: 50%;
-            width: 35px;
-            height: 35px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
-        .close:hover { background: #f8f9fa; color: #dc3545; }
-        
-        .alert {
-            padding: 15px 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        .alert-success { background: #d4edda; border-left: 4px solid #28a745; color: #155724; }
-        .alert-danger { background: #f8d7da; border-left: 4px solid #dc3545; color: #721c24; }
-        
-        .logout-btn {
-            background: linear-gradient(45deg, #dc3545, #c82333);
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            cursor: pointer;
-            font-weight: 600;
-            transition: all 0.3s ease;
-        }
-        .logout-btn:hover { transform: translateY(-2px); }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <div>
-                <h1><i class="fas fa-balance-scale"></i> Sistema Jurídico</h1>
-                <p>Gestão de processos e prazos</p>
-            </div>
-            <div class="user-info">
-                <div class="user-avatar" id="userAvatar"></div>
-                <div>
-                    <div id="userName" style="font-weight: bold;"></div>
-                    <div id="userType" style="font-size: 0.9em; color: #666;"></div>
-                </div>
-                <button class="logout-btn" onclick="logout()">
-                    <i class="fas fa-sign-out-alt"></i> Sair
-                </button>
-            </div>
-        </div>
+    @staticmethod
+    def trigramas(normalizado):
+        trigramas = set()
+        for palavra in normalizado.split():
+            palavra = f' {palavra} '
+            trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+        return trigramas
 
-        <div class="nav-tabs">
-            <button class="nav-tab active" data-tab="processos">
-                <i class="fas fa-folder-open"></i> Processos
-            </button>
-            <button class="nav-tab" data-tab="prazos">
-                <i class="fas fa-clock"></i> Prazos
-            </button>
-            <button class="nav-tab" data-tab="documentos">
-                <i class="fas fa-file-contract"></i> Documentos
-            </button>
-            <button class="nav-tab" data-tab="relatorios">
-                <i class="fas fa-chart-bar"></i> Relatórios
-            </button>
-        </div>
+    @staticmethod
+    def numeros(normalizado):
+        return frozenset(p for p in normalizado.split() if p.isdigit())
 
-        <!-- Painel de Processos -->
-        <div class="content-panel active" id="processos">
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
-                <h2><i class="fas fa-folder-open"></i> Gestão de Processos</h2>
-                <button class="btn btn-primary" onclick="openModal('modalNovoProcesso')">
-                    <i class="fas fa-plus"></i> Novo Processo
-                </button>
-            </div>
+    @classmethod
+    def similaridade(cls, a, b, minimo=0.0):
+        """
+        Similaridade entre nomes normalizados (palavras em ordem alfabética);
+        números diferentes (ex.: sufixos, documentos) nunca são o mesmo cliente.
+        Retorna 0 quando a estimativa rápida já fica abaixo de `minimo`
+        """
+        if cls.numeros(a) != cls.numeros(b):
+            return 0.0
+        comparador = SequenceMatcher(None, ' '.join(sorted(a.split())), ' '.join(sorted(b.split())))
+        if comparador.real_quick_ratio() < minimo or comparador.quick_ratio() < minimo:
+            return 0.0
+        return comparador.ratio()
 
-            <div class="search-box">
-                <i class="fas fa-search"></i>
-                <input type="text" id="searchProcessos" placeholder="Buscar por número, cliente ou advogado...">
-            </div>
+    @classmethod
+    def construir(cls, nomes, **opcoes):
+        detector = cls(**opcoes)
+        for nome, quantidade in Counter(nomes).items():
+            detector.adicionar(nome, quantidade)
+        return detector
 
-            <div class="table-container">
-                <table id="tabelaProcessos">
-                    <thead>
-                        <tr>
-                            <th>Número</th>
-                            <th>Cliente</th>
-                            <th>Advogado</th>
-                            <th>Tipo</th>
-                            <th>Data Cadastro</th>
-                            <th>Status</th>
-                            <th>Ações</th>
-                        </tr>
-                    </thead>
-                    <tbody id="bodyProcessos"></tbody>
-                </table>
-            </div>
-        </div>
+    def _candidatos(self, normalizado, trigramas):
+        """
+        Nomes que podem ser o mesmo cliente que o informado
+        """
+        numeros = self.numeros(normalizado)
+        if numeros:
+            candidatos = self._por_numeros.get(numeros, set())
+        else:
+            # Filtro de prefixo: um par com Dice >= limiar_candidato compartilha
+            # ao menos um dos trigramas mais raros; dos demais, blocos muito
+            # grandes são ignorados (exceto os 3 mais raros)
+            ordenados = sorted(trigramas, key=lambda t: len(self._postings.get(t, ())))
+            minimo = int(self.limiar_candidato * len(trigramas) / (2 - self.limiar_candidato))
+            candidatos = set()
+            for posicao, trigrama in enumerate(ordenados[:len(ordenados) - minimo + 1]):
+                postings = self._postings.get(trigrama, ())
+                if posicao >= 3 and len(postings) > self.max_bloco:
+                    break
+                candidatos.update(postings)
+        for outro in candidatos:
+            if outro == normalizado:
+                continue
+            # Coeficiente de Dice dos trigramas como pré-filtro barato
+            trigramas_outro = self._normalizados[outro][0]
+            dice = 2 * len(trigramas & trigramas_outro) / (len(trigramas) + len(trigramas_outro))
+            if dice >= self.limiar_candidato:
+                yield outro
 
-        <!-- Outros painéis (prazos, documentos, relatórios) seguem o mesmo padrão... -->
-    </div>
+    def adicionar(self, nome, quantidade=1):
+        """
+        Registra um nome (incremental); retorna os nomes semelhantes já conhecidos
+        """
+        with self._lock:
+            self._contagem[nome] += quantidade
+            normalizado = self.normalizar(nome)
+            if not normalizado:
+                return []
+            if normalizado in self._normalizados:
+                self._normalizados[normalizado][1].add(nome)
+                return self._semelhantes_de(normalizado, excluir=nome)
 
-    <!-- Modal Novo Processo -->
-    <div class="modal" id="modalNovoProcesso">
-        <div class="modal-content">
-            <div class="modal-header">
-                <h3><i class="fas fa-plus"></i> Novo Processo</h3>
-                <button class="close" onclick="closeModal('modalNovoProcesso')">&times;</button>
-            </div>
-            
-            <form id="formNovoProcesso">
-                <div class="form-row">
-                    <div class="form-group">
-                        <label for="numeroProcesso">Número do Processo *</label>
-                        <input type="text" id="numeroProcesso" required placeholder="001/2025">
-                    </div>
-                    <div class="form-group">
-                        <label for="clienteProcesso">Cliente *</label>
-                        <input type="text" id="clienteProcesso" required placeholder="Nome do cliente">
-                    </div>
-                </div>
+            trigramas = self.trigramas(normalizado)
+            arestas = {}
+            for outro in self._candidatos(normalizado, trigramas):
+                pontuacao = self.similaridade(normalizado, outro, self.limiar)
+                if pontuacao >= self.limiar:
+                    arestas[outro] = pontuacao
+                    self._semelhantes.setdefault(outro, {})[normalizado] = pontuacao
+            self._semelhantes[normalizado] = arestas
+            self._normalizados[normalizado] = (trigramas, {nome})
+            numeros = self.numeros(normalizado)
+            if numeros:
+                self._por_numeros.setdefault(numeros, set()).add(normalizado)
+            else:
+                for trigrama in trigramas:
+                    self._postings.setdefault(trigrama, set()).add(normalizado)
+            return self._semelhantes_de(normalizado, excluir=nome)
 
-                <div class="form-row">
-                    <div class="form-group">
-                        <label for="advogadoProcesso">Advogado Responsável *</label>
-                        <input type="text" id="advogadoProcesso" required placeholder="Nome do advogado">
-                    </div>
-                    <div class="form-group">
-                        <label for="tipoAcao">Tipo de Ação *</label>
-                        <select id="tipoAcao" required>
-                            <option value="">Selecione</option>
-                            <option value="Cível">Cível</option>
-                            <option value="Trabalhista">Trabalhista</option>
-                            <option value="Penal">Penal</option>
-                            <option value="Família">Família</option>
-                            <option value="Tributário">Tributário</option>
-                            <option value="Administrativo">Administrativo</option>
-                        </select>
-                    </div>
-                </div>
+    def ajustar(self, nomes):
+        """
+        Passa a refletir exatamente `nomes` (dados trocados em bloco): só os
+        nomes cuja quantidade mudou entram ou saem do índice. Retorna quantos mudaram
+        """
+        contagem = Counter(nomes)
+        with self._lock:
+            atuais = dict(self._contagem)
+        alterados = 0
+        for nome in atuais.keys() | contagem.keys():
+            diferenca = contagem.get(nome, 0) - atuais.get(nome, 0)
+            if diferenca > 0:
+                self.adicionar(nome, diferenca)
+            elif diferenca < 0:
+                self.remover(nome, -diferenca)
+            else:
+                continue
+            alterados += 1
+        return alterados
 
-                <div class="form-row">
-                    <div class="form-group">
-                        <label for="dataIntimacao">Data da Intimação</label>
-                        <input type="date" id="dataIntimacao">
-                    </div>
-                    <div class="form-group">
-                        <label for="diasPrazo">Dias de Prazo</label>
-                        <input type="number" id="diasPrazo" value="15" min="1" max="365">
-                    </div>
-                </div>
+    def remover(self, nome, quantidade=1):
+        """
+        Desconta processos de um nome; sem processos, o nome sai do índice
+        """
+        with self._lock:
+            if self._contagem[nome] > quantidade:
+                self._contagem[nome] -= quantidade
+                return
+            self._contagem.pop(nome, None)
+            normalizado = self.normalizar(nome)
+            entrada = self._normalizados.get(normalizado)
+            if entrada is None:
+                return
+            entrada[1].discard(nome)
+            if entrada[1]:
+                return
+            del self._normalizados[normalizado]
+            numeros = self.numeros(normalizado)
+            indices = [(self._por_numeros, numeros)] if numeros else [(self._postings, t) for t in entrada[0]]
+            for indice, chave in indices:
+                nomes = indice.get(chave)
+                if nomes is not None:
+                    nomes.discard(normalizado)
+                    if not nomes:
+                        del indice[chave]
+            for outro in self._semelhantes.pop(normalizado, {}):
+                self._semelhantes.get(outro, {}).pop(normalizado, None)
 
-                <div style="display: flex; gap: 10px; justify-content: flex-end; margin-top: 20px;">
-                    <button type="button" class="btn" style="background: #6c757d; color: white;" onclick="closeModal('modalNovoProcesso')">
-                        Cancelar
-                    </button>
-                    <button type="submit" class="btn btn-primary">
-                        <i class="fas fa-save"></i> Salvar Processo
-                    </button>
-                </div>
-            </form>
-        </div>
-    </div>
+    def _semelhantes_de(self, normalizado, excluir=None):
+        nomes = set(self._normalizados[normalizado][1])
+        for outro in self._semelhantes.get(normalizado, {}):
+            nomes.update(self._normalizados[outro][1])
+        nomes.discard(excluir)
+        return sorted(nomes, key=lambda n: -self._contagem[n])
+
+    def semelhantes(self, nome):
+        """
+        Nomes cadastrados que provavelmente são o mesmo cliente
+        """
+        with self._lock:
+            normalizado = self.normalizar(nome)
+            if normalizado in self._normalizados:
+                return self._semelhantes_de(normalizado, excluir=nome)
+            candidatos = [
+                outro for outro in self._candidatos(normalizado, self.trigramas(normalizado))
+                if self.similaridade(normalizado, outro, self.limiar) >= self.limiar
+            ]
+            nomes = set()
+            for outro in candidatos:
+                nomes.update(self._normalizados[outro][1])
+            return sorted(nomes, key=lambda n: -self._contagem[n])
+
+    def grupos(self):
+        """
+        Grupos de nomes (componentes conexos) com mais de uma grafia,
+        do maior para o menor
+        """
+        with self._lock:
+            visitados = set()
+            grupos = []
+            for inicio in self._normalizados:
+                if inicio in visitados:
+                    continue
+                componente, pendentes, pontuacoes = [], [inicio], []
+                visitados.add(inicio)
+                while pendentes:
+                    atual = pendentes.pop()
+                    componente.append(atual)
+                    for vizinho, pontuacao in self._semelhantes.get(atual, {}).items():
+                        pontuacoes.append(pontuacao)
+                        if vizinho not in visitados:
+                            visitados.add(vizinho)
+                            pendentes.append(vizinho)
+                nomes = [nome for normalizado in componente for nome in self._normalizados[normalizado][1]]
+                if len(nomes) < 2:
+                    continue
+                nomes.sort(key=lambda n: (-self._contagem[n], n))
+                grupos.append({
+                    'sugestao': nomes[0],
+                    'nomes': [{'nome': nome, 'processos': self._contagem[nome]} for nome in nomes],
+                    'similaridadeMinima': round(min(pontuacoes), 4) if pontuacoes else 1.0
+                })
+            grupos.sort(key=lambda grupo: (-len(grupo['nomes']), grupo['sugestao']))
+            return grupos
+
+
+class CadastroClientes:
+    """
+    Cadastro de clientes identificados por CPF/CNPJ (SQLite); os processos
+    referenciam o cliente pelo id (coluna Cliente_Id da planilha)
+    """
+    CAMPOS = ('nome', 'endereco', 'telefone', 'email')
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conexao().execute("""
+            CREATE TABLE IF NOT EXISTS clientes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                documento TEXT NOT NULL UNIQUE,
+                tipo TEXT NOT NULL,
+                nome TEXT NOT NULL,
+                endereco TEXT,
+                telefone TEXT,
+                email TEXT,
+                criado_em REAL NOT NULL,
+                atualizado_em REAL NOT NULL
+            )
+        """)
+
+    def __getstate__(self):
+        # Conexões são por thread/processo (tarefas em ProcessPoolExecutor)
+        return {'caminho': self.caminho}
+
+    def __setstate__(self, estado):
+        self.caminho = estado['caminho']
+        self._local = threading.local()
+
+    def _conexao(self):
+        """
+        Retorna a conexão SQLite da thread atual (criada sob demanda)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.row_factory = sqlite3.Row
+            self._local.conexao = conexao
+        return conexao
+
+    def fechar(self):
+        """
+        Fecha a conexão da thread atual (ex.: no processo mestre antes do fork)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def compactar(self):
+        return compactar_sqlite(self._conexao())
+
+    @staticmethod
+    def normalizar_documento(documento):
+        return ''.join(filter(str.isdigit, str(documento or '')))
+
+    @classmethod
+    def tipo_documento(cls, documento):
+        """
+        'PF' para CPF válido, 'PJ' para CNPJ válido, None caso contrário
+        """
+        documento = cls.normalizar_documento(documento)
+        if SistemaAutenticacao.validar_cpf(documento):
+            return 'PF'
+        if SistemaAutenticacao.validar_cnpj(documento):
+            return 'PJ'
+        return None
+
+    @staticmethod
+    def _para_dict(linha):
+        if linha is None:
+            return None
+        cliente = {campo: linha[campo] for campo in ('id', 'documento', 'tipo', 'nome', 'endereco', 'telefone', 'email')}
+        # Chave usada pelos templates de contrato
+        cliente['cpf' if linha['tipo'] == 'PF' else 'cnpj'] = linha['documento']
+        return cliente
+
+    def obter(self, id_cliente):
+        linha = self._conexao().execute('SELECT * FROM clientes WHERE id = ?', (id_cliente,)).fetchone()
+        return self._para_dict(linha)
+
+    def obter_por_documento(self, documento):
+        linha = self._conexao().execute(
+            'SELECT * FROM clientes WHERE documento = ?', (self.normalizar_documento(documento),)
+        ).fetchone()
+        return self._para_dict(linha)
+
+    def salvar(self, dados):
+        """
+        Cria ou atualiza (pelo documento) um cliente; campos ausentes são mantidos
+        """
+        documento = self.normalizar_documento(dados.get('documento') or dados.get('cpf') or dados.get('cnpj'))
+        tipo = self.tipo_documento(documento)
+        if tipo is None:
+            raise ValueError('CPF/CNPJ inválido')
+        campos = {campo: dados[campo] for campo in self.CAMPOS if dados.get(campo)}
+        agora = time.time()
+        conexao = self._conexao()
+        if self.obter_por_documento(documento) is None:
+            if not campos.get('nome'):
+                raise ValueError('Nome do cliente é obrigatório')
+            conexao.execute(
+                'INSERT OR IGNORE INTO clientes (documento, tipo, nome, endereco, telefone, email, criado_em, atualizado_em) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (documento, tipo, campos['nome'], campos.get('endereco'), campos.get('telefone'),
+                 campos.get('email'), agora, agora)
+            )
+        elif campos:
+            atribuicoes = ', '.join(f'{campo} = ?' for campo in campos)
+            conexao.execute(
+                f'UPDATE clientes SET {atribuicoes}, atualizado_em = ? WHERE documento = ?',
+                (*campos.values(), agora, documento)
+            )
+        return self.obter_por_documento(documento)
+
+    def listar(self, busca=None, limite=100):
+        if busca:
+            linhas = self._conexao().execute(
+                'SELECT * FROM clientes WHERE nome LIKE ? OR documento LIKE ? ORDER BY nome LIMIT ?',
+                (f'%{busca}%', f'{self.normalizar_documento(busca) or busca}%', limite)
+            ).fetchall()
+        else:
+            linhas = self._conexao().execute('SELECT * FROM clientes ORDER BY nome LIMIT ?', (limite,)).fetchall()
+        return [self._para_dict(linha) for linha in linhas]
+
+
+class PlanejadorConsultas:
+    """
+    Compila filtros estruturados de processos num plano de predicados e o
+    executa com índices por versão dos dados: listas de posições por valor
+    (igualdade) e colunas ordenadas (intervalos de datas e de dias de prazo).
+    O predicado mais seletivo é resolvido pelo índice; os demais são
+    aplicados como máscaras vetorizadas apenas sobre as linhas restantes
+    """
+    # filtro -> coluna indexada por igualdade
+    IGUALDADE = {
+        'status': 'Status',
+        'advogado': 'Advogado_Responsavel',
+        'tipo': 'Tipo_Acao',
+        'clienteId': 'Cliente_Id'
+    }
+    # filtro -> coluna indexada por ordenação
+    INTERVALOS = {
+        'cadastro': 'Data_Cadastro',
+        'intimacao': 'Data_Intimacao',
+        'diasPrazo': 'Dias_Prazo'
+    }
+    COLUNAS_DATA = ('Data_Cadastro', 'Data_Intimacao')
+
+    def __init__(self, capacidade_planos=256):
+        self.capacidade_planos = capacidade_planos
+        self._planos = OrderedDict()
+        self._indices = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Índices e planos são refeitos sob demanda em outro processo
+        return {'capacidade_planos': self.capacidade_planos}
+
+    def __setstate__(self, estado):
+        self.__init__(estado['capacidade_planos'])
+
+    @staticmethod
+    def assinatura(filtros):
+        """
+        Chave canônica dos filtros (ordem dos parâmetros não importa)
+        """
+        return tuple(sorted(
+            (chave, tuple(sorted(map(str, valor))) if isinstance(valor, (list, tuple, set, frozenset)) else valor)
+            for chave, valor in filtros.items()
+            if valor not in (None, '', (), [])
+        ))
+
+    def compilar(self, filtros):
+        """
+        Plano (tupla de predicados) para os filtros; planos compilados ficam em cache
+        """
+        chave = self.assinatura(filtros)
+        with self._lock:
+            plano = self._planos.get(chave)
+            if plano is not None:
+                self._planos.move_to_end(chave)
+                metricas.contar('escritorio_planos_consulta_total', resultado='acerto')
+                return plano
+        metricas.contar('escritorio_planos_consulta_total', resultado='falta')
+
+        predicados = []
+        for filtro, coluna in self.IGUALDADE.items():
+            valores = filtros.get(filtro)
+            if valores in (None, '', (), []):
+                continue
+            if not isinstance(valores, (list, tuple, set, frozenset)):
+                valores = (valores,)
+            predicados.append(('igual', coluna, frozenset(valores)))
+
+        for filtro, coluna in (('cadastro', 'Data_Cadastro'), ('intimacao', 'Data_Intimacao')):
+            inicio, fim = filtros.get(f'{filtro}De'), filtros.get(f'{filtro}Ate')
+            if inicio or fim:
+                # Intervalo fechado em dias: [início, fim + 1 dia)
+                predicados.append((
+                    'intervalo', coluna,
+                    pd.Timestamp(inicio).value if inicio else None, True,
+                    (pd.Timestamp(fim) + pd.Timedelta(days=1)).value if fim else None, False
+                ))
+
+        comparacoes = filtros.get('diasPrazo') or ()
+        inicio = fim = None
+        inclui_inicio = inclui_fim = True
+        for operador, valor in comparacoes:
+            # Várias comparações se reduzem ao intervalo mais estreito
+            if operador in ('eq', 'gt', 'gte'):
+                inclusivo = operador != 'gt'
+                if inicio is None or valor > inicio or (valor == inicio and not inclusivo):
+                    inicio, inclui_inicio = valor, inclusivo
+            if operador in ('eq', 'lt', 'lte'):
+                inclusivo = operador != 'lt'
+                if fim is None or valor < fim or (valor == fim and not inclusivo):
+                    fim, inclui_fim = valor, inclusivo
+            if operador == 'ne':
+                predicados.append(('diferente', 'Dias_Prazo', valor))
+        if inicio is not None or fim is not None:
+            predicados.append(('intervalo', 'Dias_Prazo', inicio, inclui_inicio, fim, inclui_fim))
+
+        if filtros.get('busca'):
+            predicados.append(('busca', None, filtros['busca']))
+
+        plano = tuple(predicados)
+        with self._lock:
+            self._planos[chave] = plano
+            if len(self._planos) > self.capacidade_planos:
+                self._planos.popitem(last=False)
+        return plano
+
+    def _obter_indices(self, df, versao):
+        """
+        Índices da versão atual dos dados (montados coluna a coluna sob demanda)
+        """
+        chave = (versao, id(df), len(df))
+        with self._lock:
+            if self._indices is None or self._indices[0] != chave:
+                self._indices = (chave, {}, {})
+            return self._indices[1], self._indices[2]
+
+    def _indice_igualdade(self, df, versao, coluna):
+        igualdade, _ = self._obter_indices(df, versao)
+        indice = igualdade.get(coluna)
+        if indice is None:
+            if coluna not in df.columns:
+                indice = {}
+            elif coluna == 'Cliente_Id':
+                valores = pd.to_numeric(df[coluna], errors='coerce')
+                indice = {int(valor): posicoes for valor, posicoes in valores.groupby(valores.values).indices.items()}
+            else:
+                indice = df.groupby(df[coluna].values, dropna=True).indices
+            igualdade[coluna] = indice
+        return indice
+
+    def _indice_ordenado(self, df, versao, coluna):
+        """
+        (valores por linha, valores ordenados, posições na ordem) em int64/float64
+        """
+        _, ordenados = self._obter_indices(df, versao)
+        indice = ordenados.get(coluna)
+        if indice is None:
+            if coluna in self.COLUNAS_DATA:
+                datas = pd.to_datetime(df[coluna], errors='coerce', format='ISO8601')
+                valores = datas.values.astype('datetime64[ns]').astype('int64').astype('float64')
+                valores[datas.isna().values] = float('inf')
+            else:
+                valores = pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype='float64', na_value=float('inf'))
+            posicoes = valores.argsort(kind='stable')
+            indice = (valores, valores[posicoes], posicoes)
+            ordenados[coluna] = indice
+        return indice
+
+    def _limites(self, ordenados, predicado):
+        _, _, _, inicio, inclui_inicio, fim, inclui_fim = (None,) + predicado
+        esquerda = 0 if inicio is None else ordenados.searchsorted(inicio, 'left' if inclui_inicio else 'right')
+        direita = (ordenados.searchsorted(float('inf'), 'left') if fim is None
+                   else ordenados.searchsorted(fim, 'right' if inclui_fim else 'left'))
+        return esquerda, max(esquerda, direita)
+
+    def _estimar(self, df, versao, predicado):
+        """
+        Quantidade de linhas que o predicado seleciona (exata para os indexáveis)
+        """
+        tipo, coluna = predicado[0], predicado[1]
+        if tipo == 'igual':
+            indice = self._indice_igualdade(df, versao, coluna)
+            return sum(len(indice.get(valor, ())) for valor in predicado[2])
+        if tipo == 'intervalo':
+            _, ordenados, _ = self._indice_ordenado(df, versao, coluna)
+            esquerda, direita = self._limites(ordenados, predicado)
+            return direita - esquerda
+        # Sem índice: avaliado por último, como filtro residual
+        return len(df) + 1
+
+    def _buscar_no_indice(self, df, versao, predicado):
+        if predicado[0] == 'igual':
+            indice = self._indice_igualdade(df, versao, predicado[1])
+            partes = [indice[valor] for valor in predicado[2] if valor in indice]
+            return np.concatenate(partes) if partes else np.empty(0, dtype='int64')
+        _, ordenados, posicoes = self._indice_ordenado(df, versao, predicado[1])
+        esquerda, direita = self._limites(ordenados, predicado)
+        return posicoes[esquerda:direita]
+
+    def _filtrar(self, df, versao, predicado, posicoes):
+        tipo, coluna = predicado[0], predicado[1]
+        if tipo == 'igual':
+            if coluna not in df.columns:
+                return posicoes[:0]
+            valores = df[coluna].values[posicoes]
+            if coluna == 'Cliente_Id':
+                valores = pd.to_numeric(pd.Series(valores), errors='coerce').values
+            return posicoes[pd.Series(valores).isin(predicado[2]).values]
+        if tipo == 'busca':
+            subconjunto = df.iloc[posicoes]
+            return posicoes[AutomatizacaoEscritorio._mascara_busca(subconjunto, predicado[2]).values]
+        valores = self._indice_ordenado(df, versao, coluna)[0][posicoes]
+        if tipo == 'diferente':
+            return posicoes[valores != predicado[2]]
+        _, _, inicio, inclui_inicio, fim, inclui_fim = predicado
+        mascara = valores < float('inf')
+        if inicio is not None:
+            mascara &= (valores >= inicio) if inclui_inicio else (valores > inicio)
+        if fim is not None:
+            mascara &= (valores <= fim) if inclui_fim else (valores < fim)
+        return posicoes[mascara]
+
+    def executar(self, df, versao, plano):
+        """
+        Posições (em ordem) das linhas que atendem ao plano
+        """
+        if not plano or df.empty:
+            return np.arange(len(df))
+        estimados = sorted(((self._estimar(df, versao, p), i, p) for i, p in enumerate(plano)))
+        primeiro = estimados[0][2]
+        if primeiro[0] in ('igual', 'intervalo'):
+            posicoes = self._buscar_no_indice(df, versao, primeiro)
+            restantes = estimados[1:]
+        else:
+            posicoes = np.arange(len(df))
+            restantes = estimados
+        for _, _, predicado in restantes:
+            if not len(posicoes):
+                break
+            metricas.contar('escritorio_linhas_lidas_total', len(posicoes), operacao='consultar_processos')
+            posicoes = self._filtrar(df, versao, predicado, posicoes)
+        return np.sort(posicoes)
+
+    def explicar(self, df, versao, plano):
+        """
+        Ordem de execução escolhida e estimativas (diagnóstico)
+        """
+        return [
+            {'predicado': p[0], 'coluna': p[1], 'estimativa': int(min(e, len(df)))}
+            for e, _, p in sorted((self._estimar(df, versao, p), i, p) for i, p in enumerate(plano))
+        ]
+
+
+class JornalAlteracoes:
+    """
+    Jornal das alterações da planilha (SQLite), compartilhado pelos processos
+    que a gravam (workers do servidor, comandos em lote). Cada gravação anexa
+    aqui, na mesma transação exclusiva, uma linha por processo alterado; os
+    demais processos leem as linhas novas e aplicam os deltas sem recarregar
+    a planilha. A sequência (seq) é global e sobrevive a reinícios.
+
+    Tipos: 'processo_adicionado'/'processo_atualizado' (com a linha da
+    planilha em JSON), 'processo_removido' e 'planilha' (alteração em bloco,
+    ex.: importação: quem lê recarrega a planilha)
+    """
+    # Linhas mantidas: processos mais atrasados que isso recarregam a planilha
+    RETENCAO = 50000
+    INTERVALO_PODA = 1000
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        conexao = self._conexao()
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS alteracoes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                numero NOT NULL,
+                tipo TEXT NOT NULL,
+                linha TEXT,
+                assinatura TEXT,
+                criado_em REAL NOT NULL
+            )
+        """)
+        conexao.execute('CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)')
+        conexao.execute("INSERT OR IGNORE INTO meta VALUES ('epoca', ?)", (secrets.token_hex(4),))
+        # Identifica o jornal: sequências de outro jornal não valem
+        self.epoca = conexao.execute("SELECT valor FROM meta WHERE chave = 'epoca'").fetchone()[0]
+
+    def __getstate__(self):
+        # Conexões são por thread/processo (tarefas em ProcessPoolExecutor)
+        return {'caminho': self.caminho, 'epoca': self.epoca}
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._local = threading.local()
+
+    def _conexao(self):
+        """
+        Retorna a conexão SQLite da thread atual (criada sob demanda)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            # Gravações da planilha grande podem manter a transação por vários segundos
+            conexao = sqlite3.connect(self.caminho, timeout=120, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.row_factory = sqlite3.Row
+            self._local.conexao = conexao
+        return conexao
+
+    def fechar(self):
+        """
+        Fecha a conexão da thread atual (ex.: no processo mestre antes do fork)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def compactar(self):
+        return compactar_sqlite(self._conexao())
+
+    @contextmanager
+    def transacao(self):
+        """
+        Transação exclusiva entre os processos: uma gravação por vez
+        """
+        conexao = self._conexao()
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            conexao.execute('ROLLBACK')
+            raise
+        conexao.execute('COMMIT')
+
+    def ultimo_seq(self):
+        linha = self._conexao().execute('SELECT max(seq) FROM alteracoes').fetchone()
+        return linha[0] or 0
+
+    def desde(self, seq):
+        """
+        Linhas com seq maior que `seq`, em ordem
+        """
+        return self._conexao().execute(
+            'SELECT seq, numero, tipo, linha, assinatura FROM alteracoes WHERE seq > ? ORDER BY seq', (seq,)
+        ).fetchall()
+
+    def anexar(self, numero, tipo, linha=None, assinatura=None):
+        """
+        Anexa uma alteração (dentro de `transacao`) e retorna sua seq
+        """
+        seq = self._conexao().execute(
+            'INSERT INTO alteracoes (numero, tipo, linha, assinatura, criado_em) VALUES (?, ?, ?, ?, ?)',
+            (numero, tipo, None if linha is None else json.dumps(linha, default=str),
+             None if assinatura is None else json.dumps(assinatura), time.time())
+        ).lastrowid
+        if seq % self.INTERVALO_PODA == 0:
+            self.podar()
+        return seq
+
+    def anexar_bloco(self, numeros, assinatura=None):
+        """
+        Anexa uma alteração em bloco (dentro de `transacao`): uma linha
+        'planilha' por número, a assinatura na última. Retorna as seqs
+        """
+        conexao = self._conexao()
+        agora = time.time()
+        conexao.executemany(
+            'INSERT INTO alteracoes (numero, tipo, criado_em) VALUES (?, ?, ?)',
+            ((numero, 'planilha', agora) for numero in numeros[:-1])
+        )
+        ultimo = conexao.execute(
+            'INSERT INTO alteracoes (numero, tipo, assinatura, criado_em) VALUES (?, ?, ?, ?)',
+            (numeros[-1], 'planilha', None if assinatura is None else json.dumps(assinatura), agora)
+        ).lastrowid
+        self.podar()
+        return range(ultimo - len(numeros) + 1, ultimo + 1)
+
+    def podar(self):
+        self._conexao().execute(
+            'DELETE FROM alteracoes WHERE seq <= (SELECT max(seq) FROM alteracoes) - ?', (self.RETENCAO,)
+        )
+
+
+class RegistroAlteracoes:
+    """
+    Log compacto de alterações para sincronização incremental.
+    Guarda apenas a alteração mais recente de cada processo (compactação),
+    com exclusões marcadas como tombstones, limitado a `retencao` entradas.
+    Com jornal, a época e as sequências são as dele; `seq` é a última
+    alteração já incorporada aos dados ao criar o registro
+    """
+    def __init__(self, retencao=50000, epoca=None, seq=0):
+        self.retencao = retencao
+        # Identifica esta instância do log: sequências de outra época não valem
+        self.epoca = epoca or secrets.token_hex(4)
+        self.seq = seq
+        # Alterações com seq <= seq_minima podem ter sido descartadas
+        self.seq_minima = seq
+        self._por_numero = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, numero, removido=False, seq=None):
+        """
+        Registra a alteração de um processo com a próxima sequência (ou com
+        `seq`, a sequência do jornal) e a retorna
+        """
+        with self._lock:
+            self.seq = self.seq + 1 if seq is None else max(self.seq, seq)
+            self._por_numero[numero] = (self.seq if seq is None else seq, removido)
+            self._por_numero.move_to_end(numero)
+            while len(self._por_numero) > self.retencao:
+                _, (seq_descartada, _) = self._por_numero.popitem(last=False)
+                self.seq_minima = seq_descartada
+            return self.seq if seq is None else seq
+
+    def desde(self, seq, limite=None):
+        """
+        Retorna [(seq, numero, removido)] em ordem crescente com seq maior que
+        `seq`, ou None se parte delas já foi descartada (cliente deve ressincronizar)
+        """
+        with self._lock:
+            if seq < self.seq_minima:
+                return None
+            alteracoes = []
+            for numero in reversed(self._por_numero):
+                seq_alteracao, removido = self._por_numero[numero]
+                if seq_alteracao <= seq:
+                    break
+                alteracoes.append((seq_alteracao, numero, removido))
+        alteracoes.reverse()
+        if limite is not None:
+            alteracoes = alteracoes[:limite]
+        return alteracoes
+
+    def reiniciar(self, seq=None):
+        """
+        Os dados foram trocados em bloco: as alterações registradas não os
+        descrevem mais. A sequência continua (é também o id dos eventos do
+        feed), avançando até `seq` se informada, e quem pedir alterações
+        anteriores deve ressincronizar
+        """
+        with self._lock:
+            self._por_numero.clear()
+            if seq is not None:
+                self.seq = max(self.seq, seq)
+            self.seq_minima = self.seq
+
+
+class FalhaGravacao(OSError):
+    """
+    A planilha não pôde ser gravada; a alteração foi desfeita
+    """
+
+
+class AutomatizacaoEscritorio:
+    # Incrementar ao alterar os templates de documentos (invalida o cache)
+    VERSAO_TEMPLATES = 1
+    
+    # Segundos que uma mudança da planilha pode ficar sem linha no jornal
+    # (gravação de outro processo em curso) antes de ser tratada como edição externa
+    ESPERA_JORNAL = 2
+    
+    def __init__(self, arquivo_excel, armazem_documentos=None, cadastro_clientes=None, jornal=None):
+        """
+        Inicializa a classe com o arquivo Excel base
+        """
+        self.arquivo_excel = arquivo_excel
+        self.armazem_documentos = armazem_documentos or ArmazemDocumentos('documentos_gerados')
+        self.clientes = cadastro_clientes or CadastroClientes(
+            os.path.join(os.path.dirname(arquivo_excel), 'clientes.db')
+        )
+        # Alterações gravadas pelos demais processos (workers, comandos em lote)
+        self.jornal = jornal or JornalAlteracoes(
+            os.path.join(os.path.dirname(arquivo_excel), 'alteracoes.db')
+        )
+        # Lida antes da planilha: o que for gravado entre as duas leituras é
+        # reaplicado do jornal (aplicar uma linha de novo não muda o resultado)
+        self._seq_aplicada = self.jornal.ultimo_seq()
+        self.df = self.carregar_dados()
+        # Planilhas anteriores ao cadastro de clientes não têm o vínculo
+        if 'Cliente_Id' not in self.df.columns:
+            self.df['Cliente_Id'] = None
+        # Identidade do arquivo carregado/gravado: uma mudança que não veio
+        # pelo jornal é uma edição externa e provoca a recarga
+        self._lock_arquivo = threading.Lock()
+        self._assinatura_arquivo = self._assinar_arquivo()
+        # (assinatura, instante) da primeira vez que a planilha divergiu sem linha no jornal
+        self._divergencia = None
+        # Gravações e aplicação do jornal, uma thread por vez
+        self._lock_escrita = threading.RLock()
+        # Versão dos dados: incrementada a cada alteração (usada para caches)
+        self.versao = 0
+        # Log de alterações para sincronização incremental (/api/processos/changes)
+        self.alteracoes = RegistroAlteracoes(epoca=self.jornal.epoca, seq=self._seq_aplicada)
+        # Ouvintes notificados a cada alteração (ex.: feed de eventos)
+        self._ouvintes = []
+        # Último status de prazo conhecido por processo (preenchido sob demanda)
+        self._status_prazos = None
+        # Agregados mensais de meses encerrados ('AAAA-MM' -> bucket) e
+        # colunas de datas já convertidas (reaproveitadas enquanto a versão não mudar)
+        self._tendencias = {}
+        self._geracao_tendencias = 0
+        self._colunas_tendencias = None
+        # Índice ordenado de prazos (montado no primeiro uso)
+        self._indice_prazos = None
+        # Detector de grafias duplicadas de clientes (montado no aquecimento e
+        # mantido pelas alterações, inclusive as trocas de dados em bloco)
+        self._detector_clientes = None
+        self._lock_detector = threading.Lock()
+        # Índice id do cliente -> números dos processos (montado no primeiro uso)
+        self._processos_por_cliente = None
+        # (df, número -> posição da linha em df): refeito quando descreve outro df
+        self._posicoes = None
+        # Planos e índices dos filtros estruturados de /api/processos
+        self.planejador = PlanejadorConsultas()
+        # Resumo dos cards do dashboard: ((versão, dia), resumo)
+        self._resumo_dashboard = None
+    
+    def __getstate__(self):
+        """
+        Estado enviado a processos de trabalho (fila de tarefas em modo
+        processo): apenas os dados, sem ouvintes nem log de alterações
+        """
+        estado = self.__dict__.copy()
+        estado['_ouvintes'] = []
+        estado['alteracoes'] = None
+        estado['_indice_prazos'] = None
+        estado['_detector_clientes'] = None
+        estado['_processos_por_cliente'] = None
+        estado['_posicoes'] = None
+        estado['_lock_arquivo'] = None
+        estado['_lock_escrita'] = None
+        estado['_lock_detector'] = None
+        return estado
+    
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock_arquivo = threading.Lock()
+        self._lock_escrita = threading.RLock()
+        self._lock_detector = threading.Lock()
+    
+    def registrar_ouvinte(self, callback):
+        """
+        Registra uma função callback(tipo, dados, seq) chamada a cada alteração;
+        `seq` é a sequência do log de alterações (None em eventos que não
+        alteram os dados, como a mudança de status de um prazo)
+        """
+        self._ouvintes.append(callback)
+    
+    def _notificar(self, tipo, dados, seq=None):
+        """
+        Notifica os ouvintes registrados sobre uma alteração
+        """
+        for callback in self._ouvintes:
+            try:
+                callback(tipo, dados, seq)
+            except Exception:
+                log.exception('notificar_alteracao_falhou', extra={'campos': {'tipo': tipo}})
+    
+    @metricas.cronometrar('carregar_dados')
+    def carregar_dados(self):
+        """
+        Carrega os dados do arquivo Excel
+        """
+        try:
+            if os.path.exists(self.arquivo_excel):
+                df = pd.read_excel(self.arquivo_excel)
+                metricas.contar('escritorio_linhas_lidas_total', len(df), operacao='carregar_dados')
+                log.info('dados_carregados', extra={'campos': {'arquivo': self.arquivo_excel, 'linhas': len(df)}})
+                return df
+            else:
+                return self.criar_estrutura_inicial()
+        except Exception:
+            log.exception('carregar_dados_falhou', extra={'campos': {'arquivo': self.arquivo_excel}})
+            return self.criar_estrutura_inicial()
+    
+    def _assinar_arquivo(self):
+        """
+        (inode, mtime, tamanho) da planilha; None se ela não existir
+        """
+        try:
+            info = os.stat(self.arquivo_excel)
+        except OSError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+    
+    def _recarregar_planilha(self):
+        """
+        Relê a planilha inteira. Se a leitura falhar mantém os dados atuais
+        (nova tentativa na próxima sincronização) e retorna False
+        """
+        try:
+            with metricas.medir('recarregar_dados'):
+                df = pd.read_excel(self.arquivo_excel)
+        except Exception:
+            log.warning('recarregar_dados_falhou', exc_info=True, extra={'campos': {'arquivo': self.arquivo_excel}})
+            return False
+        metricas.contar('escritorio_linhas_lidas_total', len(df), operacao='recarregar_dados')
+        log.info('dados_recarregados', extra={'campos': {'arquivo': self.arquivo_excel, 'linhas': len(df)}})
+        if 'Cliente_Id' not in df.columns:
+            df['Cliente_Id'] = None
+        self._trocar_dados(df)
+        return True
+    
+    def sincronizar(self, esperar=False):
+        """
+        Incorpora as alterações gravadas por outros processos: aplica as
+        linhas novas do jornal ou, se a planilha mudou sem passar por ele
+        (edição externa), recarrega-a. Sem `esperar` não aguarda uma gravação
+        em curso nesta instância. Retorna True se os dados mudaram
+        """
+        if not self._lock_escrita.acquire(blocking=esperar):
+            return False
+        try:
+            linhas = self.jornal.desde(self._seq_aplicada)
+            if linhas:
+                return self._aplicar_jornal(linhas)
+            
+            assinatura = self._assinar_arquivo()
+            if assinatura is None or assinatura == self._assinatura_arquivo:
+                self._divergencia = None
+                return False
+            # Gravação de outro processo cuja linha ainda não chegou ao jornal,
+            # ou edição externa: só esta continua sem linha depois da espera
+            agora = time.monotonic()
+            if self._divergencia is None or self._divergencia[0] != assinatura:
+                self._divergencia = (assinatura, agora)
+                return False
+            if agora - self._divergencia[1] < self.ESPERA_JORNAL or not self._recarregar_planilha():
+                return False
+            self._divergencia = None
+            self._assinatura_arquivo = assinatura
+            # As alterações registradas não descrevem os novos dados: os clientes ressincronizam
+            self.alteracoes.reiniciar()
+            self._notificar('resync', {}, self.alteracoes.seq)
+            return True
+        finally:
+            self._lock_escrita.release()
+    
+    def posicao_jornal(self):
+        """
+        (época, seq) da última linha do jornal incorporada a estes dados
+        """
+        return self.jornal.epoca, self._seq_aplicada
+    
+    def sincronizar_ate(self, posicao):
+        """
+        Garante que as linhas do jornal até `posicao` (de posicao_jornal, possivelmente
+        em outro processo) foram aplicadas, aguardando uma gravação em curso
+        """
+        if not posicao or posicao[0] != self.jornal.epoca or posicao[1] <= self._seq_aplicada:
+            return False
+        return self.sincronizar(esperar=True)
+    
+    def _aplicar_jornal(self, linhas):
+        """
+        Aplica linhas do jornal gravadas por outros processos e as publica.
+        Alterações em bloco, ou linhas já podadas do jornal, recarregam a
+        planilha: ela já contém todas as linhas lidas
+        """
+        podadas = linhas[0]['seq'] > self._seq_aplicada + 1
+        if podadas or any(linha['tipo'] == 'planilha' for linha in linhas):
+            if not self._recarregar_planilha():
+                return False
+        else:
+            for linha in linhas:
+                self._aplicar_linha(linha['numero'], linha['linha'] and json.loads(linha['linha']))
+        
+        self._seq_aplicada = linhas[-1]['seq']
+        assinatura = next((linha['assinatura'] for linha in reversed(linhas) if linha['assinatura']), None)
+        if assinatura is not None:
+            self._assinatura_arquivo = tuple(json.loads(assinatura))
+        if podadas:
+            self.alteracoes.reiniciar(self._seq_aplicada)
+            self._notificar('resync', {}, self._seq_aplicada)
+        else:
+            self._publicar([(linha['seq'], linha['numero'], linha['tipo']) for linha in linhas])
+        return True
+    
+    @contextmanager
+    def _escrita(self):
+        """
+        Seção de gravação, exclusiva entre as threads e (pela transação do
+        jornal) entre os processos. Aplica antes as alterações pendentes de
+        outros processos, para que a validação e a planilha gravada partam
+        dos dados atuais. Fornece a lista das alterações anexadas ao jornal
+        (_anexar), publicadas após o commit
+        """
+        with self._lock_escrita:
+            anexadas = []
+            with self.jornal.transacao():
+                pendentes = self.jornal.desde(self._seq_aplicada)
+                if pendentes:
+                    self._aplicar_jornal(pendentes)
+                yield anexadas
+            if anexadas:
+                self._seq_aplicada = anexadas[-1][0]
+                self._publicar(anexadas)
+    
+    def _gravar(self, anexadas, numero, tipo, anterior):
+        """
+        Grava a planilha com a alteração de um processo já aplicada e a anexa
+        ao jornal. Se a gravação falhar, volta o processo a `anterior` e
+        levanta FalhaGravacao, desfazendo a transação do jornal
+        """
+        if not self.salvar_dados():
+            self._aplicar_linha(numero, anterior)
+            raise FalhaGravacao(f"Não foi possível gravar a planilha; processo {numero} não alterado.")
+        self._anexar(anexadas, numero, tipo)
+    
+    def _anexar(self, anexadas, numero, tipo):
+        """
+        Anexa ao jornal a alteração de um processo, já aplicada e gravada
+        """
+        linha = None if tipo == 'processo_removido' else self._linha_processo(numero)
+        anexadas.append((self.jornal.anexar(numero, tipo, linha, self._assinatura_arquivo), numero, tipo))
+    
+    def _publicar(self, alteracoes):
+        """
+        Registra alterações [(seq, numero, tipo)] com as sequências do jornal,
+        notifica os ouvintes e reavalia os status de prazo dos processos alterados
+        """
+        em_bloco = any(tipo == 'planilha' for _, _, tipo in alteracoes)
+        existentes = set(self.df['Numero_Processo']) if em_bloco else None
+        numeros = []
+        for seq, numero, tipo in alteracoes:
+            if tipo == 'planilha':
+                self.alteracoes.registrar(numero, numero not in existentes, seq)
+            elif tipo == 'processo_removido':
+                self.alteracoes.registrar(numero, True, seq)
+                self._notificar(tipo, {'numero': numero}, seq)
+            else:
+                self.alteracoes.registrar(numero, False, seq)
+                processo = self.obter_processo(numero)
+                # Removido por uma alteração seguinte do mesmo lote
+                if processo is not None:
+                    self._notificar(tipo, processo, seq)
+                    numeros.append(numero)
+        if em_bloco:
+            self._notificar('resync', {}, alteracoes[-1][0])
+        if numeros:
+            self.verificar_status_prazos(numeros)
+    
+    def _linha_processo(self, numero):
+        """
+        Linha da planilha de um processo como dict (valores nativos, None para vazios)
+        """
+        df = self.df
+        row = df.iloc[self._posicao(df, numero)]
+        return {
+            coluna: None if pd.isna(valor) else (valor.item() if isinstance(valor, np.generic) else valor)
+            for coluna, valor in row.items()
+        }
+    
+    def _aplicar_linha(self, numero, linha):
+        """
+        Aplica aos dados e às estruturas mantidas a partir deles (índices,
+        agregados) a nova versão da linha de um processo, ou sua remoção
+        (`linha` None). Usada nas alterações feitas aqui e nas lidas do jornal
+        """
+        mascara = self.df['Numero_Processo'] == numero
+        anterior = self.df.loc[mascara].iloc[0] if mascara.any() else None
+        if anterior is None and linha is None:
+            return
+        periodos = self._periodos_processo(numero)
+        if linha is None:
+            self.df = self.df[~mascara]
+            # As linhas seguintes mudam de posição
+            self._posicoes = None
+        elif anterior is None:
+            indice = self._posicoes
+            df = pd.concat([self.df, pd.DataFrame([linha])], ignore_index=True)
+            if indice is not None and indice[0] is self.df:
+                indice[1].setdefault(numero, len(df) - 1)
+                self._posicoes = (df, indice[1])
+            self.df = df
+        else:
+            for coluna, valor in linha.items():
+                atual = anterior.get(coluna)
+                if coluna in self.df.columns and not (atual == valor or (valor is None and pd.isna(atual))):
+                    self.df.loc[mascara, coluna] = valor
+        
+        self.versao += 1
+        self._invalidar_tendencias(periodos | self._periodos_processo(numero))
+        if linha is None:
+            if self._status_prazos is not None:
+                self._status_prazos.pop(numero, None)
+            if self._indice_prazos is not None:
+                self._indice_prazos.remover(numero)
+        else:
+            self._atualizar_indice_prazos(numero)
+        cliente_anterior = None if anterior is None else anterior['Cliente']
+        cliente = None if linha is None else linha.get('Cliente')
+        if self._detector_clientes is not None and cliente != cliente_anterior:
+            if pd.notna(cliente_anterior):
+                self._detector_clientes.remover(cliente_anterior)
+            if pd.notna(cliente):
+                self._detector_clientes.adicionar(cliente)
+        self._vincular_cliente(
+            numero,
+            None if anterior is None else self._id_cliente(anterior.get('Cliente_Id')),
+            None if linha is None else self._id_cliente(linha.get('Cliente_Id'))
+        )
+    
+    def _trocar_dados(self, df):
+        """
+        Substitui os dados em bloco (recarga da planilha, importação). O
+        detector de clientes, caro de montar, só recebe a diferença de nomes
+        """
+        if self._detector_clientes is not None:
+            with metricas.medir('ajustar_detector_clientes'):
+                alterados = self._detector_clientes.ajustar(df['Cliente'].dropna())
+            metricas.contar('escritorio_clientes_ajustados_total', alterados)
+        self.df = df
+        self._redefinir_derivados()
+    
+    def _redefinir_derivados(self):
+        """
+        Após trocar os dados em bloco: nova versão, e índices e agregados
+        refeitos sob demanda
+        """
+        self.versao += 1
+        self._tendencias = {}
+        self._geracao_tendencias += 1
+        self._colunas_tendencias = None
+        self._indice_prazos = None
+        self._processos_por_cliente = None
+        self._posicoes = None
+    
+    # Colunas obrigatórias na importação e valores padrão das demais (processos novos)
+    COLUNAS_IMPORTACAO_OBRIGATORIAS = ('Numero_Processo', 'Cliente', 'Advogado_Responsavel', 'Tipo_Acao')
+    
+    def importar_processos(self, novos, substituir=False):
+        """
+        Importa processos em lote com uma única gravação da planilha.
+        `novos` usa as colunas da planilha (ou os rótulos da exportação).
+        Processos existentes têm atualizadas apenas as colunas presentes;
+        com `substituir` a base passa a ser exatamente a importada.
+        Retorna (adicionados, atualizados, erros), erros como [(linha, mensagem)]
+        """
+        with self._escrita() as anexadas:
+            novos = novos.rename(columns=dict(self.COLUNAS_EXPORTACAO_PROCESSOS))
+            faltando = [coluna for coluna in self.COLUNAS_IMPORTACAO_OBRIGATORIAS if coluna not in novos.columns]
+            if faltando:
+                raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+            colunas = [coluna for coluna in self.df.columns if coluna in novos.columns]
+            novos = novos[colunas].copy()
+            hoje = datetime.now().strftime('%Y-%m-%d')
+        
+            # Validação vetorizada; a linha informada é a da planilha (cabeçalho = 1)
+            erros = []
+            invalidas = pd.Series(False, index=novos.index)
+            for coluna in self.COLUNAS_IMPORTACAO_OBRIGATORIAS:
+                vazias = novos[coluna].isna() | (novos[coluna].astype(str).str.strip() == '')
+                erros.extend((indice + 2, f'{coluna} vazio') for indice in novos.index[vazias & ~invalidas])
+                invalidas |= vazias
+            for coluna in ('Data_Cadastro', 'Data_Intimacao'):
+                if coluna in novos.columns:
+                    datas = pd.to_datetime(novos[coluna], errors='coerce', format='mixed')
+                    ruins = datas.isna() & novos[coluna].notna()
+                    erros.extend((indice + 2, f'{coluna} inválida') for indice in novos.index[ruins & ~invalidas])
+                    invalidas |= ruins
+                    novos[coluna] = datas.dt.strftime('%Y-%m-%d').where(datas.notna(), None)
+            if 'Dias_Prazo' in novos.columns:
+                dias = pd.to_numeric(novos['Dias_Prazo'], errors='coerce')
+                ruins = dias.isna() & novos['Dias_Prazo'].notna()
+                erros.extend((indice + 2, 'Dias_Prazo inválido') for indice in novos.index[ruins & ~invalidas])
+                invalidas |= ruins
+                novos['Dias_Prazo'] = dias
+            erros.sort()
+            novos = novos[~invalidas]
+            novos['Numero_Processo'] = novos['Numero_Processo'].astype(str).str.strip()
+            # Número repetido no arquivo: vale a última ocorrência
+            novos = novos.drop_duplicates('Numero_Processo', keep='last')
+        
+            existentes = self.df['Numero_Processo'].astype(str)
+            ja_existem = novos['Numero_Processo'].isin(existentes)
+            padroes = {'Data_Cadastro': hoje, 'Data_Intimacao': hoje, 'Dias_Prazo': 15, 'Status': 'Ativo', 'Cliente_Id': None}
+        
+            def com_padroes(linhas):
+                linhas = linhas.reindex(columns=self.df.columns)
+                for coluna, padrao in padroes.items():
+                    if padrao is not None:
+                        linhas[coluna] = linhas[coluna].fillna(padrao)
+                return linhas
+        
+            if substituir:
+                removidos = existentes[~existentes.isin(novos['Numero_Processo'])]
+                base = com_padroes(novos)
+            else:
+                removidos = existentes.iloc[:0]
+                base = self.df.copy()
+                if ja_existem.any():
+                    atualizacoes = novos[ja_existem].set_index('Numero_Processo')
+                    mascara = existentes.isin(atualizacoes.index).values
+                    numeros = existentes[mascara]
+                    for coluna in colunas:
+                        if coluna != 'Numero_Processo':
+                            base.loc[mascara, coluna] = atualizacoes.loc[numeros, coluna].values
+                base = pd.concat([base, com_padroes(novos[~ja_existem])], ignore_index=True)
+        
+            numeros = list(novos['Numero_Processo']) + list(removidos)
+            if not numeros:
+                return 0, 0, erros
+            anterior = self.df
+            self._trocar_dados(base.reset_index(drop=True))
+            if not self.salvar_dados():
+                self._trocar_dados(anterior)
+                raise FalhaGravacao('Não foi possível gravar a planilha; importação desfeita.')
+            seqs = self.jornal.anexar_bloco(numeros, self._assinatura_arquivo)
+            anexadas.extend((seq, numero, 'planilha') for seq, numero in zip(seqs, numeros))
+        return int((~ja_existem).sum()), int(ja_existem.sum()), erros
+    
+    def criar_estrutura_inicial(self):
+        """
+        Cria uma planilha inicial se não existir
+        """
+        # Garantir que o diretório existe
+        os.makedirs(os.path.dirname(self.arquivo_excel), exist_ok=True)
+        
+        dados_iniciais = {
+            'Numero_Processo': ['001/2025', '002/2025'],
+            'Cliente': ['Cliente Exemplo 1', 'Cliente Exemplo 2'],
+            'Advogado_Responsavel': ['Dr. Silva', 'Dra. Santos'],
+            'Tipo_Acao': ['Cível', 'Trabalhista'],
+            'Data_Cadastro': [datetime.now().strftime('%Y-%m-%d'), datetime.now().strftime('%Y-%m-%d')],
+            'Data_Intimacao': [datetime.now().strftime('%Y-%m-%d'), datetime.now().strftime('%Y-%m-%d')],
+            'Dias_Prazo': [15, 10],
+            'Status': ['Ativo', 'Ativo']
+        }
+        
+        df = pd.DataFrame(dados_iniciais)
+        try:
+            df.to_excel(self.arquivo_excel, index=False)
+            log.info('planilha_criada', extra={'campos': {'arquivo': self.arquivo_excel}})
+        except Exception:
+            log.exception('criar_planilha_falhou', extra={'campos': {'arquivo': self.arquivo_excel}})
+        return df
+    
+    def adicionar_processo(self, dados):
+        """
+        Adiciona um novo processo à planilha
+        """
+        try:
+            with self._escrita() as anexadas:
+                # Verificar se processo já existe
+                if dados['numero'] in self.df['Numero_Processo'].values:
+                    return False, f"Processo {dados['numero']} já existe na base de dados."
+            
+                cliente, erro = self._resolver_cliente(dados)
+                if erro:
+                    return False, erro
+                if cliente is not None and not dados.get('cliente'):
+                    dados = dict(dados, cliente=cliente['nome'])
+            
+                novo_processo = {
+                    'Numero_Processo': dados['numero'],
+                    'Cliente': dados['cliente'],
+                    'Cliente_Id': cliente['id'] if cliente else None,
+                    'Advogado_Responsavel': dados['advogado'],
+                    'Tipo_Acao': dados['tipo'],
+                    'Data_Cadastro': datetime.now().strftime('%Y-%m-%d'),
+                    'Data_Intimacao': dados.get('dataIntimacao', datetime.now().strftime('%Y-%m-%d')),
+                    'Dias_Prazo': dados.get('diasPrazo', 15),
+                    'Status': 'Ativo'
+                }
+            
+                self._aplicar_linha(dados['numero'], novo_processo)
+                self._gravar(anexadas, dados['numero'], 'processo_adicionado', None)
+        except FalhaGravacao as e:
+            return False, str(e)
+        return True, f"Processo {dados['numero']} adicionado com sucesso."
+    
+    def atualizar_processo(self, numero, dados):
+        """
+        Atualiza dados de um processo específico
+        """
+        try:
+            with self._escrita() as anexadas:
+                if numero not in self.df['Numero_Processo'].values:
+                    return False, f"Processo {numero} não encontrado."
+            
+                # Mapeamento dos campos
+                campos_mapeados = {
+                    'cliente': 'Cliente',
+                    'advogado': 'Advogado_Responsavel',
+                    'tipo': 'Tipo_Acao',
+                    'dataIntimacao': 'Data_Intimacao',
+                    'diasPrazo': 'Dias_Prazo',
+                    'status': 'Status'
+                }
+            
+                anterior = self._linha_processo(numero)
+                linha = dict(anterior)
+                if 'clienteId' in dados or 'clienteDocumento' in dados:
+                    cliente, erro = self._resolver_cliente(dados)
+                    if erro:
+                        return False, erro
+                    linha['Cliente_Id'] = cliente['id'] if cliente else None
+                    if cliente is not None and not dados.get('cliente'):
+                        dados = dict(dados, cliente=cliente['nome'])
+            
+                for campo_front, campo_db in campos_mapeados.items():
+                    if campo_front in dados:
+                        linha[campo_db] = dados[campo_front]
+            
+                self._aplicar_linha(numero, linha)
+                self._gravar(anexadas, numero, 'processo_atualizado', anterior)
+        except FalhaGravacao as e:
+            return False, str(e)
+        return True, f"Processo {numero} atualizado com sucesso."
+    
+    def remover_processo(self, numero):
+        """
+        Remove um processo da base de dados
+        """
+        try:
+            with self._escrita() as anexadas:
+                if numero not in self.df['Numero_Processo'].values:
+                    return False, f"Processo {numero} não encontrado."
+            
+                anterior = self._linha_processo(numero)
+                self._aplicar_linha(numero, None)
+                self._gravar(anexadas, numero, 'processo_removido', anterior)
+        except FalhaGravacao as e:
+            return False, str(e)
+        return True, f"Processo {numero} removido com sucesso."
+    
+    @metricas.cronometrar('salvar_dados')
+    def salvar_dados(self):
+        """
+        Salva os dados no arquivo Excel
+        """
+        try:
+            # Grava num temporário e troca de uma vez: outros workers nunca
+            # leem uma planilha pela metade
+            with self._lock_arquivo:
+                descritor, temporario = tempfile.mkstemp(
+                    dir=os.path.dirname(os.path.abspath(self.arquivo_excel)), prefix='.processos-', suffix='.xlsx'
+                )
+                os.close(descritor)
+                try:
+                    self.df.to_excel(temporario, index=False)
+                    # mkstemp cria o arquivo só para o dono: mantém as permissões da planilha
+                    if os.path.exists(self.arquivo_excel):
+                        shutil.copymode(self.arquivo_excel, temporario)
+                    else:
+                        os.chmod(temporario, 0o644)
+                    os.replace(temporario, self.arquivo_excel)
+                except BaseException:
+                    os.unlink(temporario)
+                    raise
+                self._assinatura_arquivo = self._assinar_arquivo()
+            metricas.contar('escritorio_bytes_gravados_total', os.path.getsize(self.arquivo_excel), arquivo='processos')
+            return True
+        except Exception:
+            log.exception('salvar_dados_falhou', extra={'campos': {'arquivo': self.arquivo_excel}})
+            return False
+    
+    def _processo_para_dict(self, row):
+        """
+        Converte uma linha do DataFrame no formato usado pela API
+        """
+        return {
+            'numero': row['Numero_Processo'],
+            'cliente': row['Cliente'],
+            'advogado': row['Advogado_Responsavel'],
+            'tipo': row['Tipo_Acao'],
+            'dataCadastro': row['Data_Cadastro'],
+            'dataIntimacao': row['Data_Intimacao'],
+            'diasPrazo': int(row['Dias_Prazo']),
+            'status': row['Status'],
+            'clienteId': self._id_cliente(row.get('Cliente_Id'))
+        }
+    
+    @staticmethod
+    def _id_cliente(valor):
+        """
+        Id do cliente como int (a planilha devolve float/NaN)
+        """
+        try:
+            return None if valor is None or valor != valor else int(valor)
+        except (TypeError, ValueError):
+            return None
+    
+    def _resolver_cliente(self, dados):
+        """
+        Cliente indicado por clienteId ou clienteDocumento; um documento ainda
+        não cadastrado é cadastrado com o nome informado. Retorna (cliente, erro)
+        """
+        if 'clienteId' in dados:
+            if dados['clienteId'] is None:
+                return None, None
+            cliente = self.clientes.obter(dados['clienteId'])
+            return (cliente, None) if cliente else (None, f"Cliente {dados['clienteId']} não encontrado.")
+        if dados.get('clienteDocumento'):
+            cliente = self.clientes.obter_por_documento(dados['clienteDocumento'])
+            if cliente is None:
+                try:
+                    cliente = self.clientes.salvar({'documento': dados['clienteDocumento'], 'nome': dados.get('cliente')})
+                except ValueError as e:
+                    return None, str(e)
+            return cliente, None
+        return None, None
+    
+    def _vincular_cliente(self, numero, id_anterior, id_novo):
+        """
+        Mantém o índice cliente -> processos após uma alteração
+        """
+        if self._processos_por_cliente is None or id_anterior == id_novo:
+            return
+        if id_anterior is not None:
+            numeros = self._processos_por_cliente.get(id_anterior)
+            if numeros is not None:
+                numeros.discard(numero)
+                if not numeros:
+                    del self._processos_por_cliente[id_anterior]
+        if id_novo is not None:
+            self._processos_por_cliente.setdefault(id_novo, set()).add(numero)
+    
+    def processos_do_cliente(self, id_cliente):
+        """
+        Números dos processos de um cliente (índice montado no primeiro uso)
+        """
+        if self._processos_por_cliente is None:
+            indice = {}
+            if 'Cliente_Id' not in self.df.columns:
+                self.df['Cliente_Id'] = None
+            vinculados = self.df[self.df['Cliente_Id'].notna()]
+            for numero, valor in zip(vinculados['Numero_Processo'], vinculados['Cliente_Id']):
+                indice.setdefault(self._id_cliente(valor), set()).add(numero)
+            self._processos_por_cliente = indice
+        return sorted(self._processos_por_cliente.get(id_cliente, ()))
+    
+    def dados_contrato(self, dados_cliente):
+        """
+        Completa os dados do contrato com o cadastro do cliente (por clienteId
+        ou CPF/CNPJ), sem alterá-lo: quem quiser gravar os dados informados
+        usa cadastrar_clientes
+        """
+        documento = dados_cliente.get('cpf') or dados_cliente.get('cnpj') or dados_cliente.get('documento')
+        cliente = None
+        if dados_cliente.get('clienteId') is not None:
+            cliente = self.clientes.obter(dados_cliente['clienteId'])
+        elif documento and CadastroClientes.tipo_documento(documento):
+            cliente = self.clientes.obter_por_documento(documento)
+        if cliente is None:
+            return dados_cliente
+        completos = {chave: valor for chave, valor in cliente.items() if valor and chave not in ('id', 'tipo')}
+        completos.update({chave: valor for chave, valor in dados_cliente.items() if valor and chave != 'clienteId'})
+        return completos
+    
+    def cadastrar_clientes(self, lista_dados):
+        """
+        Grava no cadastro (cria ou atualiza pelo CPF/CNPJ) os clientes
+        informados para contratos; os sem documento são ignorados.
+        ValueError se um documento for inválido ou faltar o nome de um novo
+        """
+        for dados_cliente in lista_dados:
+            if dados_cliente.get('cpf') or dados_cliente.get('cnpj') or dados_cliente.get('documento'):
+                self.clientes.salvar(dados_cliente)
+    
+    def obter_processo(self, numero):
+        """
+        Retorna um processo em formato JSON ou None se não existir
+        """
+        df = self.df
+        posicao = self._posicao(df, numero)
+        if posicao is None:
+            return None
+        return self._processo_para_dict(df.iloc[posicao])
+    
+    def obter_processos(self, numeros):
+        """
+        Processos dos números informados, lidos pela posição (número -> processo)
+        """
+        if not numeros:
+            return {}
+        df = self.df
+        posicoes = [posicao for posicao in (self._posicao(df, numero) for numero in numeros) if posicao is not None]
+        return {
+            row['Numero_Processo']: self._processo_para_dict(row)
+            for _, row in df.iloc[sorted(set(posicoes))].iterrows()
+        }
+    
+    def _posicao(self, df, numero):
+        """
+        Posição (iloc) do processo em `df`, ou None. O índice número -> posição
+        é mantido por _aplicar_linha e refeito quando descreve outro df
+        (troca dos dados, remoção ou gravação concorrente)
+        """
+        indice = self._posicoes
+        if indice is None or indice[0] is not df:
+            posicoes = {}
+            for posicao, valor in enumerate(df['Numero_Processo'].tolist()):
+                posicoes.setdefault(valor, posicao)
+            indice = self._posicoes = (df, posicoes)
+        posicao = indice[1].get(numero)
+        # Acrescentado ao índice por uma inclusão concorrente, ainda fora de `df`
+        if posicao is None or posicao >= len(df):
+            return None
+        return posicao
+    
+    def obter_alteracoes(self, desde, limite=1000):
+        """
+        Retorna os processos alterados após a sequência `desde`
+        (tombstones para excluídos) ou None se for preciso ressincronizar
+        """
+        alteracoes = self.alteracoes.desde(desde, limite)
+        if alteracoes is None:
+            return None
+        
+        numeros = [numero for _, numero, removido in alteracoes if not removido]
+        linhas = {}
+        if numeros:
+            for _, row in self.df[self.df['Numero_Processo'].isin(numeros)].iterrows():
+                linhas[row['Numero_Processo']] = self._processo_para_dict(row)
+        
+        resultado = []
+        for seq, numero, removido in alteracoes:
+            processo = None if removido else linhas.get(numero)
+            resultado.append({
+                'seq': seq,
+                'numero': numero,
+                'removido': processo is None,
+                'processo': processo
+            })
+        return resultado
+    
+    @metricas.cronometrar('obter_todos_processos')
+    def obter_todos_processos(self):
+        """
+        Retorna todos os processos em formato JSON
+        """
+        if self.df.empty:
+            return []
+        
+        metricas.contar('escritorio_linhas_lidas_total', len(self.df), operacao='obter_todos_processos')
+        processos = []
+        for _, row in self.df.iterrows():
+            processos.append(self._processo_para_dict(row))
+        
+        return processos
+    
+    @metricas.cronometrar('calcular_prazos')
+    def calcular_prazos(self):
+        """
+        Calcula prazos processuais e retorna informações de prazo
+        """
+        if self.df.empty:
+            return []
+        
+        metricas.contar('escritorio_linhas_lidas_total', len(self.df), operacao='calcular_prazos')
+        processos_com_prazo = []
+        hoje = datetime.now().date()
+        # Um único evento para todas as linhas com data ou prazo inválido
+        erros = ResumoErros()
+        
+        for _, row in self.df.iterrows():
+            try:
+                processos_com_prazo.append(self._calcular_prazo_linha(row, hoje))
+            except Exception as e:
+                erros.registrar(row['Numero_Processo'], e)
+        
+        erros.emitir('prazos_invalidos', 'calcular_prazos')
+        return processos_com_prazo
+    
+    @classmethod
+    def _calcular_prazo_linha(cls, row, hoje):
+        """
+        Calcula o prazo final e o status de prazo de uma linha (não depende da
+        instância: usado também por processos de trabalho com blocos de linhas)
+        """
+        data_intimacao = pd.to_datetime(row['Data_Intimacao']).date()
+        prazo_final = data_intimacao + timedelta(days=int(row['Dias_Prazo']))
+        dias_restantes = (prazo_final - hoje).days
+        
+        return {
+            'numero': row['Numero_Processo'],
+            'cliente': row['Cliente'],
+            'advogado': row['Advogado_Responsavel'],
+            'dataIntimacao': row['Data_Intimacao'],
+            'prazoFinal': prazo_final.strftime('%Y-%m-%d'),
+            'diasRestantes': dias_restantes,
+            'statusPrazo': cls.classificar_prazo(dias_restantes)
+        }
+    
+    @staticmethod
+    def classificar_prazo(dias_restantes):
+        """
+        Status do prazo conforme os dias restantes
+        """
+        if dias_restantes < 0:
+            return 'vencido'
+        elif dias_restantes <= 2:
+            return 'critico'
+        elif dias_restantes <= 5:
+            return 'atencao'
+        return 'normal'
+    
+    def obter_indice_prazos(self):
+        """
+        Índice ordenado de prazos; montado no primeiro uso e mantido pelas alterações
+        """
+        if self._indice_prazos is None:
+            with metricas.medir('construir_indice_prazos'):
+                metricas.contar('escritorio_linhas_lidas_total', len(self.df), operacao='construir_indice_prazos')
+                self._indice_prazos = IndicePrazos.construir(self.df)
+        return self._indice_prazos
+    
+    def _atualizar_indice_prazos(self, numero):
+        """
+        Reposiciona no índice o prazo de um processo alterado
+        """
+        if self._indice_prazos is None:
+            return
+        linhas = self.df[self.df['Numero_Processo'] == numero]
+        try:
+            prazo = self._calcular_prazo_linha(linhas.iloc[0], datetime.now().date())
+        except Exception:
+            self._indice_prazos.remover(numero)
+            return
+        prazo_final = datetime.strptime(prazo['prazoFinal'], '%Y-%m-%d').date()
+        for campo in ('diasRestantes', 'statusPrazo'):
+            del prazo[campo]
+        self._indice_prazos.definir(numero, prazo_final, prazo)
+    
+    @metricas.cronometrar('proximos_prazos')
+    def proximos_prazos(self, dias=7, advogado=None, limite=None, inicio=None, fim=None):
+        """
+        Prazos que vencem de `inicio` (padrão: hoje) até `fim` (padrão: hoje + dias),
+        em ordem de vencimento, opcionalmente só de um advogado
+        """
+        hoje = datetime.now().date()
+        inicio = inicio or hoje
+        fim = fim or hoje + timedelta(days=dias)
+        prazos = []
+        for dados in self.obter_indice_prazos().consultar(inicio, fim, advogado, limite):
+            prazo = dict(dados)
+            prazo['diasRestantes'] = (datetime.strptime(prazo['prazoFinal'], '%Y-%m-%d').date() - hoje).days
+            prazo['statusPrazo'] = self.classificar_prazo(prazo['diasRestantes'])
+            prazos.append(prazo)
+        return prazos
+    
+    def contar_status_prazos(self, hoje=None):
+        """
+        Quantidade de processos em cada status de prazo, por busca binária no índice
+        """
+        hoje = hoje or datetime.now().date()
+        # Faixas de classificar_prazo: < 0, 0-2, 3-5 e >= 6 dias restantes
+        vencido, critico, atencao, normal = self.obter_indice_prazos().contar_por_dias(hoje, [0, 3, 6])
+        return {'vencido': vencido, 'critico': critico, 'atencao': atencao, 'normal': normal}
+    
+    def resumo_dashboard(self):
+        """
+        Números dos cards do dashboard, reaproveitados enquanto os dados e o dia não mudarem
+        """
+        hoje = datetime.now().date()
+        chave = (self.versao, hoje)
+        cache = self._resumo_dashboard
+        if cache is not None and cache[0] == chave:
+            metricas.contar('escritorio_resumo_dashboard_cache_total', resultado='acerto')
+            return cache[1]
+        metricas.contar('escritorio_resumo_dashboard_cache_total', resultado='falta')
+        
+        mes = self.calcular_tendencias(hoje.strftime('%Y-%m'), hoje.strftime('%Y-%m'))[0]
+        resumo = {
+            'totalProcessos': len(self.df),
+            'processosPorStatus': {
+                str(status): int(quantidade) for status, quantidade in self.df['Status'].value_counts().items()
+            } if not self.df.empty else {},
+            'statusPrazos': self.contar_status_prazos(hoje),
+            'mesAtual': {
+                'periodo': mes['periodo'],
+                'processosNovos': mes['processosNovos'],
+                'prazos': mes['prazos'],
+                'prazosVencidos': mes['prazosVencidos'],
+                'taxaCumprimento': mes['taxaCumprimento']
+            }
+        }
+        self._resumo_dashboard = (chave, resumo)
+        return resumo
+    
+    def obter_pagina_processos(self, limite=50):
+        """
+        Primeiros `limite` processos em formato JSON
+        """
+        return [self._processo_para_dict(row) for _, row in self.df.head(limite).iterrows()]
+    
+    def obter_detector_clientes(self):
+        """
+        Detector de clientes duplicados; montado uma única vez (no aquecimento)
+        e mantido pelas alterações
+        """
+        if self._detector_clientes is None:
+            with self._lock_detector:
+                if self._detector_clientes is None:
+                    clientes = self.df['Cliente'].dropna()
+                    with metricas.medir('construir_detector_clientes'):
+                        metricas.contar('escritorio_linhas_lidas_total', len(clientes), operacao='construir_detector_clientes')
+                        detector = DetectorClientesDuplicados.construir(clientes)
+                    # Alterações gravadas durante a montagem entram pela diferença
+                    with self._lock_escrita:
+                        detector.ajustar(self.df['Cliente'].dropna())
+                        self._detector_clientes = detector
+        return self._detector_clientes
+    
+    def verificar_status_prazos(self, numeros=None):
+        """
+        Compara o status de prazo atual com o último conhecido e notifica mudanças.
+        Sem `numeros` verifica todos os processos (ex.: virada do dia)
+        """
+        if self._status_prazos is None:
+            if numeros is not None:
+                return
+            self._status_prazos = {}
+        
+        hoje = datetime.now().date()
+        df = self.df if numeros is None else self.df[self.df['Numero_Processo'].isin(numeros)]
+        for _, row in df.iterrows():
+            try:
+                prazo = self._calcular_prazo_linha(row, hoje)
+            except Exception:
+                continue
+            anterior = self._status_prazos.get(prazo['numero'])
+            self._status_prazos[prazo['numero']] = prazo['statusPrazo']
+            if anterior is not None and anterior != prazo['statusPrazo']:
+                self._notificar('prazo_alterado', prazo)
+    
+    def gerar_contrato(self, dados_cliente, template_tipo='contrato_servicos'):
+        """
+        Gera um contrato personalizado
+        """
+        try:
+            dados_cliente = self.dados_contrato(dados_cliente)
+            # Documentos idênticos (mesmo template, dados e data) saem do cache em disco
+            data_documento = datetime.now().strftime('%d/%m/%Y')
+            chave = self.armazem_documentos.chave(
+                self.VERSAO_TEMPLATES, template_tipo, dados_cliente, data_documento
+            )
+            titulo = 'PROCURAÇÃO' if template_tipo == 'procuracao' else 'CONTRATO DE PRESTAÇÃO DE SERVIÇOS JURÍDICOS'
+            filename = f"{titulo}_{dados_cliente.get('nome', 'Cliente')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            filepath = self.armazem_documentos.obter(chave, '.txt')
+            if filepath is not None:
+                return True, filepath, filename
+            
+            # Template básico em memória (em produção, usar arquivos .docx reais)
+            templates = {
+                'contrato_servicos': {
+                    'titulo': 'CONTRATO DE PRESTAÇÃO DE SERVIÇOS JURÍDICOS',
+                    'conteudo': f"""
+CONTRATO DE PRESTAÇÃO DE SERVIÇOS JURÍDICOS
+
+CONTRATANTE: {dados_cliente.get('nome', '[NOME_CLIENTE]')}
+CPF: {dados_cliente.get('cpf', '[CPF_CLIENTE]')}
+Endereço: {dados_cliente.get('endereco', '[ENDERECO_CLIENTE]')}
+Telefone: {dados_cliente.get('telefone', '[TELEFONE_CLIENTE]')}
+E-mail: {dados_cliente.get('email', '[EMAIL_CLIENTE]')}
+
+CONTRATADO: {dados_cliente.get('advogado', '[ADVOGADO]')}
+
+Data: {data_documento}
+
+Pelo presente instrumento, as partes acima qualificadas acordam
+as seguintes cláusulas e condições:
+
+CLÁUSULA 1ª - DO OBJETO
+O presente contrato tem por objeto a prestação de serviços jurídicos
+pelo CONTRATADO ao CONTRATANTE.
+
+CLÁUSULA 2ª - DAS RESPONSABILIDADES
+O CONTRATADO compromete-se a prestar os serviços com diligência
+e em conformidade com a legislação vigente.
+
+CLÁUSULA 3ª - DO FORO
+Fica eleito o foro da comarca para dirimir quaisquer questões
+decorrentes do presente contrato.
+
+____________________                    ____________________
+    CONTRATANTE                             CONTRATADO
+                    """
+                },
+                'procuracao': {
+                    'titulo': 'PROCURAÇÃO',
+                    'conteudo': f"""
+PROCURAÇÃO
+
+OUTORGANTE: {dados_cliente.get('nome', '[NOME_CLIENTE]')}
+CPF: {dados_cliente.get('cpf', '[CPF_CLIENTE]')}
+
+OUTORGADO: {dados_cliente.get('advogado', '[ADVOGADO]')}
+
+Pelo presente instrumento, o OUTORGANTE nomeia e constitui
+seu bastante procurador o OUTORGADO, para representá-lo
+perante órgãos públicos e tribunais.
+
+Data: {data_documento}
+
+____________________
+    OUTORGANTE
+                    """
+                }
+            }
+            
+            template = templates.get(template_tipo, templates['contrato_servicos'])
+            
+            filepath = self.armazem_documentos.guardar(chave, '.txt', template['conteudo'])
+            return True, filepath, filename
+            
+        except Exception as e:
+            return False, str(e), None
+    
+    @metricas.cronometrar('gerar_relatorio')
+    def gerar_relatorio(self, mes=None, ano=None):
+        """
+        Gera um relatório com estatísticas dos processos
+        """
+        if mes is None:
+            mes = datetime.now().month
+        if ano is None:
+            ano = datetime.now().year
+        
+        if self.df.empty:
+            return {
+                'periodo': f"{mes:02d}/{ano}",
+                'totalProcessos': 0,
+                'mensagem': 'Não há processos cadastrados'
+            }
+        
+        # Filtrar por mês/ano
+        metricas.contar('escritorio_linhas_lidas_total', len(self.df), operacao='gerar_relatorio')
+        df = self.df.copy()
+        try:
+            df['Data_Cadastro'] = pd.to_datetime(df['Data_Cadastro'])
+            df_filtrado = df[
+                (df['Data_Cadastro'].dt.month == mes) & 
+                (df['Data_Cadastro'].dt.year == ano)
+            ]
+        except Exception:
+            log.warning('filtrar_periodo_falhou', exc_info=True, extra={'campos': {'mes': mes, 'ano': ano}})
+            df_filtrado = df
+        
+        # Calcular estatísticas
+        total_processos = len(df_filtrado)
+        
+        if total_processos == 0:
+            return {
+                'periodo': f"{mes:02d}/{ano}",
+                'totalProcessos': 0,
+                'mensagem': f'Não há processos cadastrados para {mes:02d}/{ano}'
+            }
+        
+        processos_por_advogado = df_filtrado['Advogado_Responsavel'].value_counts().to_dict()
+        processos_por_tipo = df_filtrado['Tipo_Acao'].value_counts().to_dict()
+        processos_por_status = df_filtrado['Status'].value_counts().to_dict()
+        
+        # Calcular status dos prazos
+        processos_com_prazo = self.calcular_prazos()
+        status_prazos = {}
+        for processo in processos_com_prazo:
+            status = processo['statusPrazo']
+            status_prazos[status] = status_prazos.get(status, 0) + 1
+        
+        return {
+            'periodo': f"{mes:02d}/{ano}",
+            'totalProcessos': total_processos,
+            'processosPorAdvogado': processos_por_advogado,
+            'processosPorTipo': processos_por_tipo,
+            'processosPorStatus': processos_por_status,
+            'statusPrazos': status_prazos,
+            'dataGeracao': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        }
+    
+    @staticmethod
+    def _mascara_busca(df, termo):
+        """
+        Linhas que contêm o termo em número, cliente, advogado ou tipo
+        """
+        return (
+            df['Numero_Processo'].astype(str).str.contains(termo, case=False, na=False, regex=False) |
+            df['Cliente'].astype(str).str.contains(termo, case=False, na=False, regex=False) |
+            df['Advogado_Responsavel'].astype(str).str.contains(termo, case=False, na=False, regex=False) |
+            df['Tipo_Acao'].astype(str).str.contains(termo, case=False, na=False, regex=False)
+        )
+    
+    def _periodos_processo(self, numero):
+        """
+        Meses ('AAAA-MM') de cadastro e de vencimento do prazo de um processo
+        """
+        periodos = set()
+        for _, row in self.df[self.df['Numero_Processo'] == numero].iterrows():
+            try:
+                periodos.add(pd.to_datetime(row['Data_Cadastro']).strftime('%Y-%m'))
+                prazo = pd.to_datetime(row['Data_Intimacao']) + timedelta(days=int(row['Dias_Prazo']))
+                periodos.add(prazo.strftime('%Y-%m'))
+            except Exception:
+                continue
+        return periodos
+    
+    def _invalidar_tendencias(self, periodos):
+        """
+        Descarta os agregados em cache dos meses afetados por uma alteração
+        """
+        self._geracao_tendencias += 1
+        for periodo in periodos:
+            self._tendencias.pop(periodo, None)
+    
+    def _obter_colunas_tendencias(self):
+        """
+        Mês de cadastro, data e mês do prazo final de cada linha (convertidos
+        uma vez por versão dos dados)
+        """
+        chave = (self.versao, id(self.df), len(self.df))
+        if self._colunas_tendencias is None or self._colunas_tendencias[0] != chave:
+            metricas.contar('escritorio_linhas_lidas_total', len(self.df), operacao='calcular_tendencias')
+            cadastro = pd.to_datetime(self.df['Data_Cadastro'], errors='coerce')
+            prazo = (
+                pd.to_datetime(self.df['Data_Intimacao'], errors='coerce')
+                + pd.to_timedelta(pd.to_numeric(self.df['Dias_Prazo'], errors='coerce'), unit='D')
+            )
+            self._colunas_tendencias = (
+                chave,
+                cadastro.dt.strftime('%Y-%m'),
+                prazo,
+                prazo.dt.strftime('%Y-%m')
+            )
+        return self._colunas_tendencias[1:]
+    
+    def _agregar_periodos(self, periodos):
+        """
+        Calcula numa única passada agrupada os buckets mensais dos períodos pedidos
+        """
+        buckets = {
+            periodo: {
+                'periodo': periodo,
+                'processosNovos': 0,
+                'novosPorAdvogado': {},
+                'prazos': 0,
+                'prazosVencidos': 0,
+                'prazosCumpridos': 0,
+                'taxaCumprimento': None,
+                'prazosPorAdvogado': {}
+            }
+            for periodo in periodos
+        }
+        if self.df.empty:
+            return buckets
+        
+        mes_cadastro, prazo, mes_prazo = self._obter_colunas_tendencias()
+        advogado = self.df['Advogado_Responsavel']
+        
+        # Processos abertos por mês e por advogado
+        mascara = mes_cadastro.isin(periodos)
+        for (periodo, nome), quantidade in advogado[mascara].groupby(mes_cadastro[mascara]).value_counts().items():
+            buckets[periodo]['novosPorAdvogado'][nome] = int(quantidade)
+            buckets[periodo]['processosNovos'] += int(quantidade)
+        
+        # Prazos que vencem no mês: um prazo já vencido conta como cumprido
+        # quando o processo não está mais ativo
+        mascara = mes_prazo.isin(periodos)
+        hoje = pd.Timestamp(datetime.now().date())
+        vencidos = (prazo[mascara] < hoje)
+        cumpridos = vencidos & (self.df['Status'][mascara] != 'Ativo')
+        grupos = pd.DataFrame({
+            'periodo': mes_prazo[mascara],
+            'vencido': vencidos,
+            'cumprido': cumpridos
+        }).groupby('periodo').agg(total=('vencido', 'size'), vencidos=('vencido', 'sum'), cumpridos=('cumprido', 'sum'))
+        for periodo, linha in grupos.iterrows():
+            bucket = buckets[periodo]
+            bucket['prazos'] = int(linha['total'])
+            bucket['prazosVencidos'] = int(linha['vencidos'])
+            bucket['prazosCumpridos'] = int(linha['cumpridos'])
+            if bucket['prazosVencidos']:
+                bucket['taxaCumprimento'] = round(bucket['prazosCumpridos'] / bucket['prazosVencidos'], 4)
+        for (periodo, nome), quantidade in advogado[mascara].groupby(mes_prazo[mascara]).value_counts().items():
+            buckets[periodo]['prazosPorAdvogado'][nome] = int(quantidade)
+        
+        return buckets
+    
+    @metricas.cronometrar('calcular_tendencias')
+    def calcular_tendencias(self, inicio=None, fim=None):
+        """
+        Buckets mensais ('AAAA-MM') de `inicio` a `fim` (padrão: últimos 12 meses).
+        Meses encerrados ficam em cache; o mês corrente e os futuros são sempre recalculados
+        """
+        atual = datetime.now().strftime('%Y-%m')
+        fim = pd.Period(fim or atual, freq='M')
+        inicio = pd.Period(inicio, freq='M') if inicio else fim - 11
+        if inicio > fim:
+            raise ValueError('Início deve ser anterior ao fim')
+        periodos = [str(p) for p in pd.period_range(inicio, fim, freq='M')]
+        if len(periodos) > 240:
+            raise ValueError('Intervalo máximo de 240 meses')
+        
+        faltando = [p for p in periodos if p >= atual or p not in self._tendencias]
+        metricas.contar('escritorio_tendencias_cache_total', len(periodos) - len(faltando), resultado='acerto')
+        metricas.contar('escritorio_tendencias_cache_total', len(faltando), resultado='falta')
+        if faltando:
+            geracao = self._geracao_tendencias
+            calculados = self._agregar_periodos(faltando)
+            # Só guarda se nenhuma alteração aconteceu durante o cálculo
+            if geracao == self._geracao_tendencias:
+                for periodo, bucket in calculados.items():
+                    if periodo < atual:
+                        self._tendencias[periodo] = bucket
+        else:
+            calculados = {}
+        
+        return [calculados.get(p) or self._tendencias[p] for p in periodos]
+    
+    @metricas.cronometrar('buscar_processos')
+    def buscar_processos(self, termo):
+        """
+        Busca processos com base em termo
+        """
+        if self.df.empty or not termo:
+            return self.obter_todos_processos()
+        
+        # Buscar em múltiplas colunas
+        metricas.contar('escritorio_linhas_lidas_total', len(self.df), operacao='buscar_processos')
+        df_resultado = self.df[self._mascara_busca(self.df, termo)]
+        
+        processos = []
+        for _, row in df_resultado.iterrows():
+            processos.append(self._processo_para_dict(row))
+        
+        return processos
+    
+    # Colunas das exportações (rótulo, coluna do DataFrame / chave do prazo)
+    COLUNAS_EXPORTACAO_PROCESSOS = [
+        ('Número', 'Numero_Processo'),
+        ('Cliente', 'Cliente'),
+        ('Advogado', 'Advogado_Responsavel'),
+        ('Tipo de Ação', 'Tipo_Acao'),
+        ('Data de Cadastro', 'Data_Cadastro'),
+        ('Data de Intimação', 'Data_Intimacao'),
+        ('Dias de Prazo', 'Dias_Prazo'),
+        ('Status', 'Status')
+    ]
+    COLUNAS_EXPORTACAO_PRAZOS = [
+        ('Número', 'numero'),
+        ('Cliente', 'cliente'),
+        ('Advogado', 'advogado'),
+        ('Data de Intimação', 'dataIntimacao'),
+        ('Prazo Final', 'prazoFinal'),
+        ('Dias Restantes', 'diasRestantes'),
+        ('Status do Prazo', 'statusPrazo')
+    ]
+    
+    def filtrar(self, **filtros):
+        """
+        Retorna o recorte do DataFrame que atende aos filtros informados
+        (ver ler_filtros_processos), executado pelo planejador de consultas
+        """
+        df = self.df
+        plano = self.planejador.compilar(filtros)
+        if not plano:
+            return df
+        with metricas.medir('consultar_processos'):
+            return df.iloc[self.planejador.executar(df, self.versao, plano)]
+    
+    def consultar_processos(self, **filtros):
+        """
+        Processos (em formato JSON) que atendem aos filtros estruturados
+        """
+        return [self._processo_para_dict(row) for _, row in self.filtrar(**filtros).iterrows()]
+    
+    @staticmethod
+    def _iterar_blocos(df, tamanho_bloco=5000):
+        """
+        Percorre o DataFrame em blocos de registros (dicts), sem materializar tudo
+        """
+        for inicio in range(0, len(df), tamanho_bloco):
+            bloco = df.iloc[inicio:inicio + tamanho_bloco]
+            metricas.contar('escritorio_linhas_lidas_total', len(bloco), operacao='exportar')
+            yield from bloco.to_dict('records')
+    
+    def exportar_processos(self, **filtros):
+        """
+        Cabeçalho e gerador de linhas da lista de processos filtrada
+        """
+        df = self.filtrar(**filtros)
+        rotulos, colunas = zip(*self.COLUNAS_EXPORTACAO_PROCESSOS)
+        linhas = ([row[coluna] for coluna in colunas] for row in self._iterar_blocos(df))
+        return list(rotulos), linhas
+    
+    def exportar_prazos(self, status_prazo=None, **filtros):
+        """
+        Cabeçalho e gerador de linhas dos prazos, opcionalmente por status de prazo
+        """
+        df = self.filtrar(**filtros)
+        rotulos, chaves = zip(*self.COLUNAS_EXPORTACAO_PRAZOS)
+        hoje = datetime.now().date()
+        
+        def linhas():
+            for row in self._iterar_blocos(df):
+                try:
+                    prazo = self._calcular_prazo_linha(row, hoje)
+                except Exception:
+                    continue
+                if status_prazo and prazo['statusPrazo'] != status_prazo:
+                    continue
+                yield [prazo[chave] for chave in chaves]
+        
+        return list(rotulos), linhas()
+    
+    def exportar_relatorio(self, mes=None, ano=None):
+        """
+        Cabeçalho e linhas (seção, item, quantidade) do relatório mensal
+        """
+        relatorio = self.gerar_relatorio(mes, ano)
+        secoes = [
+            ('Por advogado', 'processosPorAdvogado'),
+            ('Por tipo de ação', 'processosPorTipo'),
+            ('Por status', 'processosPorStatus'),
+            ('Status dos prazos', 'statusPrazos')
+        ]
+        linhas = [['Período', relatorio['periodo'], ''], ['Total de processos', '', relatorio['totalProcessos']]]
+        for titulo, chave in secoes:
+            for item, quantidade in relatorio.get(chave, {}).items():
+                linhas.append([titulo, item, quantidade])
+        return ['Seção', 'Item', 'Quantidade'], iter(linhas)
+
+
+class SistemaAutenticacao:
+    """
+    Sistema simples de autenticação para demonstração
+    """
+    def __init__(self):
+        # Usuários de demonstração (em produção, usar banco de dados)
+        self.usuarios = {
+            'admin@sistema.com': {
+                'senha': self.hash_senha('admin123'),
+                'nome': 'Administrador do Sistema',
+                'tipo': 'admin',
+                'ativo': True
+            },
+            'escritorio@juridico.com': {
+                'senha': self.hash_senha('juridico2025'),
+                'nome': 'Escritório Jurídico',
+                'tipo': 'escritorio',
+                'ativo': True
+            },
+            '123.456.789-00': {
+                'senha': self.hash_senha('advogado123'),
+                'nome': 'Dr. Silva Santos',
+                'tipo': 'advogado',
+                'ativo': True
+            }
+        }
+    
+    def hash_senha(self, senha):
+        """
+        Hash simples da senha (em produção, usar bcrypt ou similar)
+        """
+        return hashlib.sha256(senha.encode()).hexdigest()
+    
+    def validar_email(self, email):
+        """
+        Valida formato de email
+        """
+        import re
+        pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
+        return re.match(pattern, email) is not None
+    
+    @staticmethod
+    def validar_cpf(cpf):
+        """
+        Valida CPF brasileiro
+        """
+        cpf = ''.join(filter(str.isdigit, cpf))
+        
+        if len(cpf) != 11:
+            return False
+        
+        if cpf == cpf[0] * 11:
+            return False
+        
+        # Validação dos dígitos verificadores
+        soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
+        resto = 11 - (soma % 11)
+        if resto < 2:
+            resto = 0
+        if resto != int(cpf[9]):
+            return False
+        
+        soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
+        resto = 11 - (soma % 11)
+        if resto < 2:
+            resto = 0
+        if resto != int(cpf[10]):
+            return False
+        
+        return True
+    
+    @staticmethod
+    def validar_cnpj(cnpj):
+        """
+        Valida CNPJ brasileiro
+        """
+        cnpj = ''.join(filter(str.isdigit, cnpj))
+        
+        if len(cnpj) != 14 or cnpj == cnpj[0] * 14:
+            return False
+        
+        # Validação dos dígitos verificadores
+        for posicao in (12, 13):
+            pesos = list(range(posicao - 7, 1, -1)) + list(range(9, 1, -1))
+            soma = sum(int(digito) * peso for digito, peso in zip(cnpj[:posicao], pesos))
+            resto = soma % 11
+            if (0 if resto < 2 else 11 - resto) != int(cnpj[posicao]):
+                return False
+        
+        return True
+    
+    def autenticar_usuario(self, usuario, senha):
+        """
+        Autentica o usuário
+        """
+        # Verificar se o usuário existe
+        if usuario not in self.usuarios:
+            return False, "Usuário não encontrado"
+        
+        # Verificar senha
+        if self.usuarios[usuario]['senha'] != self.hash_senha(senha):
+            return False, "Senha incorreta"
+        
+        # Verificar se usuário está ativo
+        if not self.usuarios[usuario]['ativo']:
+            return False, "Usuário inativo"
+        
+        return True, self.usuarios[usuario]
+    
+    def validar_formato_usuario(self, usuario):
+        """
+        Valida se o formato do usuário é email ou CPF válido
+        """
+        if self.validar_email(usuario):
+            return True, "email"
+        elif self.validar_cpf(usuario):
+            return True, "cpf"
+        else:
+            return False, "inválido"
+
+
+class CacheSessoesLRU:
+    """
+    Cache LRU em memória com expiração (TTL) para dados de sessão
+    """
+    def __init__(self, capacidade=10000, ttl=3600):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, sid):
+        """
+        Retorna (dados, expira_em) da sessão ou None se ausente/expirada
+        """
+        with self._lock:
+            item = self._itens.get(sid)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self._itens[sid]
+                return None
+            self._itens.move_to_end(sid)
+            return item
+
+    def definir(self, sid, dados, expira_em=None):
+        """
+        Armazena a sessão, descartando a menos usada quando cheio
+        """
+        if expira_em is None:
+            expira_em = time.time() + self.ttl
+        with self._lock:
+            self._itens[sid] = (dados, expira_em)
+            self._itens.move_to_end(sid)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def remover(self, sid):
+        """
+        Remove uma sessão do cache
+        """
+        with self._lock:
+            self._itens.pop(sid, None)
+
+    def remover_por_usuario(self, usuario):
+        """
+        Remove todas as sessões de um usuário e retorna quantas foram removidas
+        """
+        with self._lock:
+            sids = [sid for sid, (dados, _) in self._itens.items() if dados.get('usuario') == usuario]
+            for sid in sids:
+                del self._itens[sid]
+        return len(sids)
+
+
+class ArmazenamentoSessaoSQLite:
+    """
+    Armazenamento de sessões em SQLite, compartilhado entre workers
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._local = threading.local()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conexao().execute("""
+            CREATE TABLE IF NOT EXISTS sessoes (
+                sid TEXT PRIMARY KEY,
+                usuario TEXT,
+                dados TEXT NOT NULL,
+                expira_em REAL NOT NULL
+            )
+        """)
+        self._conexao().execute('CREATE INDEX IF NOT EXISTS idx_sessoes_usuario ON sessoes (usuario)')
+
+    def _conexao(self):
+        """
+        Retorna a conexão SQLite da thread atual (criada sob demanda)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def fechar(self):
+        """
+        Fecha a conexão da thread atual (ex.: no processo mestre antes do fork)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def obter(self, sid):
+        linha = self._conexao().execute(
+            'SELECT dados, expira_em FROM sessoes WHERE sid = ?', (sid,)
+        ).fetchone()
+        if linha is None:
+            return None
+        if linha[1] <= time.time():
+            self.remover(sid)
+            return None
+        return json.loads(linha[0]), linha[1]
+
+    def definir(self, sid, dados, expira_em):
+        self._conexao().execute(
+            'INSERT OR REPLACE INTO sessoes (sid, usuario, dados, expira_em) VALUES (?, ?, ?, ?)',
+            (sid, dados.get('usuario'), json.dumps(dados), expira_em)
+        )
+
+    def remover(self, sid):
+        self._conexao().execute('DELETE FROM sessoes WHERE sid = ?', (sid,))
+
+    def remover_por_usuario(self, usuario):
+        cursor = self._conexao().execute('DELETE FROM sessoes WHERE usuario = ?', (usuario,))
+        return cursor.rowcount
+
+    def limpar_expiradas(self):
+        cursor = self._conexao().execute('DELETE FROM sessoes WHERE expira_em <= ?', (time.time(),))
+        return cursor.rowcount
+
+    def compactar(self):
+        return compactar_sqlite(self._conexao())
+
+
+class ArmazenamentoSessaoArquivo:
+    """
+    Armazenamento de sessões em arquivos JSON (um por sessão)
+    """
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, sid):
+        # O sid vem do cookie: só identificadores gerados por novo_id viram caminho
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', sid or ''):
+            return None
+        return os.path.join(self.diretorio, f"{sid}.json")
+
+    def obter(self, sid):
+        caminho = self._caminho(sid)
+        if caminho is None:
+            return None
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                registro = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Registro corrompido equivale a sessão inexistente
+        if (not isinstance(registro, dict) or not isinstance(registro.get('dados'), dict)
+                or not isinstance(registro.get('expira_em'), (int, float))):
+            return None
+        if registro['expira_em'] <= time.time():
+            self.remover(sid)
+            return None
+        return registro['dados'], registro['expira_em']
+
+    def definir(self, sid, dados, expira_em):
+        caminho = self._caminho(sid)
+        if caminho is None:
+            raise ValueError(f"Identificador de sessão inválido: {sid!r}")
+        # Escrita atômica: arquivo temporário + rename
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'dados': dados, 'expira_em': expira_em}, f)
+        os.replace(temporario, caminho)
+
+    def remover(self, sid):
+        caminho = self._caminho(sid)
+        if caminho is None:
+            return
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+    def remover_por_usuario(self, usuario):
+        removidas = 0
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith('.json'):
+                sid = nome[:-5]
+                registro = self.obter(sid)
+                if registro and registro[0].get('usuario') == usuario:
+                    self.remover(sid)
+                    removidas += 1
+        return removidas
+
+    def limpar_expiradas(self):
+        removidas = 0
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith('.json') and self.obter(nome[:-5]) is None:
+                removidas += 1
+        return removidas
+
+
+class GerenciadorSessoes:
+    """
+    Sessões no servidor: o cookie carrega apenas um identificador opaco
+    """
+    def __init__(self, armazenamento=None, ttl=8 * 3600, capacidade_cache=10000, ttl_cache=30):
+        """
+        Sem armazenamento persistente o cache LRU é a própria base de sessões.
+        Com armazenamento (SQLite/arquivo) o cache guarda leituras por
+        `ttl_cache` segundos, limitando o atraso de revogações entre workers.
+        """
+        self.armazenamento = armazenamento
+        self.ttl = ttl
+        self.cache = CacheSessoesLRU(capacidade_cache, ttl if armazenamento is None else ttl_cache)
+
+    def novo_id(self):
+        return secrets.token_urlsafe(24)
+
+    @staticmethod
+    def id_valido(sid):
+        """
+        Formato dos identificadores de novo_id (token_urlsafe)
+        """
+        return isinstance(sid, str) and re.fullmatch(r'[A-Za-z0-9_-]+', sid) is not None
+
+    def obter(self, sid):
+        """
+        Retorna os dados da sessão ou None se inexistente, expirada, revogada
+        ou com identificador que não foi gerado aqui
+        """
+        if not self.id_valido(sid):
+            return None
+        item = self.cache.obter(sid)
+        if item is not None:
+            return item[0]
+        if self.armazenamento is None:
+            return None
+
+        registro = self.armazenamento.obter(sid)
+        if registro is None:
+            return None
+        dados, expira_em = registro
+        self.cache.definir(sid, dados, min(expira_em, time.time() + self.cache.ttl))
+        return dados
+
+    def salvar(self, sid, dados):
+        expira_em = time.time() + self.ttl
+        if self.armazenamento is not None:
+            self.armazenamento.definir(sid, dados, expira_em)
+            expira_em = min(expira_em, time.time() + self.cache.ttl)
+        self.cache.definir(sid, dados, expira_em)
+
+    def revogar(self, sid):
+        """
+        Invalida uma sessão específica
+        """
+        self.cache.remover(sid)
+        if self.armazenamento is not None:
+            self.armazenamento.remover(sid)
+
+    def revogar_usuario(self, usuario):
+        """
+        Invalida todas as sessões de um usuário
+        """
+        removidas = self.cache.remover_por_usuario(usuario)
+        if self.armazenamento is not None:
+            removidas = self.armazenamento.remover_por_usuario(usuario)
+        return removidas
+
+
+class SessaoServidor(CallbackDict, SessionMixin):
+    """
+    Sessão Flask cujos dados ficam no servidor
+    """
+    def __init__(self, dados=None, sid=None, novo=False):
+        def ao_alterar(self):
+            self.modified = True
+        CallbackDict.__init__(self, dados, ao_alterar)
+        self.sid = sid
+        self.new = novo
+        self.modified = False
+        self.sid_anterior = None
+
+    def regenerar(self):
+        """
+        Troca o identificador da sessão (ex.: no login, contra fixação de sessão)
+        """
+        if self.sid_anterior is None:
+            self.sid_anterior = self.sid
+        self.sid = None
+        self.modified = True
+
+
+class InterfaceSessaoServidor(SessionInterface):
+    """
+    Integra o GerenciadorSessoes ao mecanismo de sessões do Flask
+    """
+    def __init__(self, gerenciador):
+        self.gerenciador = gerenciador
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            dados = self.gerenciador.obter(sid)
+            if dados is not None:
+                return SessaoServidor(dados, sid=sid)
+        return SessaoServidor(novo=True)
+
+    def save_session(self, app, session, response):
+        if session is None:
+            # open_session falhou: não há sessão a gravar
+            return
+        nome = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        caminho = self.get_cookie_path(app)
+
+        if session.sid_anterior:
+            self.gerenciador.revogar(session.sid_anterior)
+
+        if not session:
+            # Sessão vazia (ex.: logout): revogar e apagar o cookie
+            if session.sid:
+                self.gerenciador.revogar(session.sid)
+                response.delete_cookie(nome, domain=dominio, path=caminho)
+            return
+
+        if not session.modified:
+            return
+
+        if session.sid is None:
+            session.sid = self.gerenciador.novo_id()
+        self.gerenciador.salvar(session.sid, dict(session))
+        response.set_cookie(
+            nome, session.sid,
+            max_age=self.gerenciador.ttl,
+            httponly=self.get_cookie_httponly(app),
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+            domain=dominio,
+            path=caminho
+        )
+
+
+def criar_gerenciador_sessoes(backend, caminho):
+    """
+    Cria o gerenciador de sessões para o backend configurado
+    ('memoria', 'sqlite' ou 'arquivo')
+    """
+    if backend == 'sqlite':
+        return GerenciadorSessoes(ArmazenamentoSessaoSQLite(caminho))
+    if backend == 'arquivo':
+        return GerenciadorSessoes(ArmazenamentoSessaoArquivo(caminho))
+    return GerenciadorSessoes()
+
+
+class GerenciadorAssets:
+    """
+    Arquivos estáticos com nome versionado por conteúdo e variantes pré-comprimidas
+    """
+    TIPOS = {
+        '.css': 'text/css; charset=utf-8',
+        '.js': 'application/javascript; charset=utf-8'
+    }
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.manifesto = {}
+        self.arquivos = {}
+        self.carregar()
+
+    def carregar(self):
+        """
+        Lê os assets, calcula o hash do conteúdo e gera as variantes gzip/brotli
+        """
+        for raiz, _, nomes in os.walk(self.diretorio):
+            for nome in nomes:
+                base, extensao = os.path.splitext(nome)
+                if extensao not in self.TIPOS:
+                    continue
+                caminho = os.path.join(raiz, nome)
+                relativo = os.path.relpath(caminho, self.diretorio).replace(os.sep, '/')
+                with open(caminho, 'rb') as f:
+                    conteudo = f.read()
+
+                digest = hashlib.sha256(conteudo).hexdigest()[:12]
+                versionado = f"{relativo[:-len(extensao)]}.{digest}{extensao}"
+                variantes = {'identity': conteudo, 'gzip': gzip.compress(conteudo, 9)}
+                if brotli is not None:
+                    variantes['br'] = brotli.compress(conteudo, quality=11)
+
+                self.manifesto[relativo] = versionado
+                self.arquivos[versionado] = {
+                    'tipo': self.TIPOS[extensao],
+                    'etag': digest,
+                    'variantes': variantes
+                }
+
+    def url(self, relativo):
+        """
+        URL versionada de um asset (usada nos templates)
+        """
+        return f"/assets/{self.manifesto.get(relativo, relativo)}"
+
+    def resposta(self, nome, aceita_codificacao):
+        """
+        Monta a resposta do asset com a melhor codificação aceita pelo cliente
+        """
+        arquivo = self.arquivos.get(nome)
+        if arquivo is None:
+            return None
+
+        variantes = arquivo['variantes']
+        codificacao = 'identity'
+        for candidata in ('br', 'gzip'):
+            if candidata in variantes and candidata in aceita_codificacao:
+                codificacao = candidata
+                break
+
+        resposta = current_app.response_class(variantes[codificacao], mimetype=arquivo['tipo'])
+        if codificacao != 'identity':
+            resposta.headers['Content-Encoding'] = codificacao
+        resposta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        resposta.headers['Vary'] = 'Accept-Encoding'
+        resposta.set_etag(arquivo['etag'])
+        return resposta
+
+
+class CompressorRespostas:
+    """
+    Compressão de respostas (gzip, brotli ou zstd) negociada por Accept-Encoding
+    """
+    TIPOS_COMPRIMIVEIS = (
+        'application/json', 'text/', 'application/javascript', 'text/event-stream', 'text/csv'
+    )
+
+    def __init__(self, tamanho_minimo=1024, capacidade_cache=128):
+        self.tamanho_minimo = tamanho_minimo
+        self.capacidade_cache = capacidade_cache
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def codificacoes_disponiveis(self):
+        disponiveis = []
+        if brotli is not None:
+            disponiveis.append('br')
+        if zstandard is not None:
+            disponiveis.append('zstd')
+        disponiveis.append('gzip')
+        return disponiveis
+
+    def escolher_codificacao(self, aceita_codificacao):
+        """
+        Escolhe a codificação preferida pelo cliente entre as disponíveis
+        """
+        pesos = {}
+        for parte in aceita_codificacao.split(','):
+            campos = parte.strip().split(';')
+            nome = campos[0].strip().lower()
+            peso = 1.0
+            for parametro in campos[1:]:
+                parametro = parametro.strip()
+                if parametro.startswith('q='):
+                    try:
+                        peso = float(parametro[2:])
+                    except ValueError:
+                        peso = 0.0
+            if nome:
+                pesos[nome] = peso
+
+        melhor, melhor_peso = None, 0.0
+        for codificacao in self.codificacoes_disponiveis():
+            peso = pesos.get(codificacao, pesos.get('*', 0.0))
+            if peso > melhor_peso:
+                melhor, melhor_peso = codificacao, peso
+        return melhor
+
+    def comprimir_bytes(self, dados, codificacao):
+        if codificacao == 'br':
+            return brotli.compress(dados, quality=5)
+        if codificacao == 'zstd':
+            return zstandard.ZstdCompressor(level=3).compress(dados)
+        return gzip.compress(dados, 6)
+
+    def _compressor_fluxo(self, codificacao):
+        """
+        Retorna funções (comprimir_parte, finalizar) para respostas em streaming
+        """
+        if codificacao == 'br':
+            compressor = brotli.Compressor(quality=5)
+            return lambda parte: compressor.process(parte) + compressor.flush(), compressor.finish
+        if codificacao == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=3).compressobj()
+            return (
+                lambda parte: compressor.compress(parte) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                compressor.flush
+            )
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return lambda parte: compressor.compress(parte) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    def _fluxo_comprimido(self, partes, codificacao):
+        comprimir_parte, finalizar = self._compressor_fluxo(codificacao)
+        for parte in partes:
+            if isinstance(parte, str):
+                parte = parte.encode('utf-8')
+            if parte:
+                yield comprimir_parte(parte)
+        yield finalizar()
+
+    def _obter_cache(self, chave):
+        with self._lock:
+            dados = self._cache.get(chave)
+            if dados is not None:
+                self._cache.move_to_end(chave)
+            return dados
+
+    def _guardar_cache(self, chave, dados):
+        with self._lock:
+            self._cache[chave] = dados
+            self._cache.move_to_end(chave)
+            while len(self._cache) > self.capacidade_cache:
+                self._cache.popitem(last=False)
+
+    def comprimir_resposta(self, resposta):
+        """
+        Hook after_request: comprime a resposta quando vantajoso
+        """
+        if (resposta.status_code < 200 or resposta.status_code in (204, 304)
+                or resposta.direct_passthrough
+                or 'Content-Encoding' in resposta.headers
+                or not (resposta.mimetype or '').startswith(self.TIPOS_COMPRIMIVEIS)):
+            return resposta
+
+        resposta.vary.add('Accept-Encoding')
+        codificacao = self.escolher_codificacao(request.headers.get('Accept-Encoding', ''))
+        if codificacao is None:
+            return resposta
+
+        if resposta.is_streamed:
+            resposta.response = self._fluxo_comprimido(resposta.response, codificacao)
+            resposta.headers.pop('Content-Length', None)
+            resposta.headers['Content-Encoding'] = codificacao
+            return resposta
+
+        dados = resposta.get_data()
+        if len(dados) < self.tamanho_minimo:
+            return resposta
+
+        # Rotas que marcam g.versao_dados têm o resultado comprimido reaproveitado
+        versao = g.get('versao_dados')
+        chave = (request.full_path, versao, codificacao) if versao is not None else None
+        comprimido = self._obter_cache(chave) if chave else None
+        if comprimido is None:
+            comprimido = self.comprimir_bytes(dados, codificacao)
+            if chave:
+                self._guardar_cache(chave, comprimido)
+
+        resposta.set_data(comprimido)
+        resposta.headers['Content-Encoding'] = codificacao
+        return resposta
+
+
+class BarramentoEventos:
+    """
+    Pub/sub em processo para o feed de eventos (SSE).
+    Os eventos ficam num buffer circular compartilhado: publicar custa O(1)
+    independentemente do número de assinantes, e cada conexão apenas lembra a
+    posição do último evento que já enviou (sem fila nem thread dedicada por
+    assinante).
+
+    O id de cada evento é a sequência do log de alterações (a mesma devolvida
+    com a lista de processos): o cliente descarta eventos já contidos na
+    lista que carregou e retoma o feed a partir dela (Last-Event-ID ou ?desde=).
+    """
+    def __init__(self, historico=1000):
+        # (posição, id, tipo, dados); a posição ordena o buffer
+        self._eventos = deque(maxlen=historico)
+        self._posicao = 0
+        self._ultimo_id = 0
+        # Maior id que saiu do buffer: quem retoma de antes dele perdeu eventos
+        self._id_descartado = 0
+        self._condicao = threading.Condition()
+
+    @property
+    def ultimo_id(self):
+        return self._ultimo_id
+
+    def iniciar_em(self, id_evento):
+        """
+        Alterações até `id_evento` não passaram por este barramento (ex.:
+        anteriores ao início do processo): retomá-las exige ressincronizar
+        """
+        with self._condicao:
+            self._ultimo_id = max(self._ultimo_id, id_evento)
+            self._id_descartado = max(self._id_descartado, id_evento)
+
+    def publicar(self, tipo, dados, id_evento=None):
+        """
+        Sem `id_evento` (evento sem alteração de dados) repete o último id
+        """
+        with self._condicao:
+            if id_evento is None:
+                id_evento = self._ultimo_id
+            self._ultimo_id = max(self._ultimo_id, id_evento)
+            if len(self._eventos) == self._eventos.maxlen:
+                self._id_descartado = max(self._id_descartado, self._eventos[0][1])
+            self._posicao += 1
+            self._eventos.append((self._posicao, id_evento, tipo, dados))
+            self._condicao.notify_all()
+
+    def _posicao_apos(self, id_evento):
+        """
+        Posição de onde retomar quem já recebeu os eventos até `id_evento`;
+        None se parte dos seguintes já saiu do buffer ou se o id não é deste log
+        """
+        if id_evento < self._id_descartado or id_evento > self._ultimo_id:
+            return None
+        for posicao, id_buffer, _, _ in self._eventos:
+            if id_buffer > id_evento:
+                return posicao - 1
+        return self._posicao
+
+    def eventos_desde(self, posicao, timeout=None):
+        """
+        Retorna (eventos, perdeu_eventos) publicados após `posicao`,
+        aguardando até `timeout` segundos se ainda não houver nenhum
+        """
+        with self._condicao:
+            if self._posicao <= posicao and timeout:
+                self._condicao.wait_for(lambda: self._posicao > posicao, timeout)
+            if self._posicao <= posicao:
+                return [], False
+            perdeu = not self._eventos or self._eventos[0][0] > posicao + 1
+            return [evento for evento in self._eventos if evento[0] > posicao], perdeu
+
+    def fluxo_sse(self, serializar, ultimo_id=None, intervalo_ping=15):
+        """
+        Gerador de mensagens no formato text/event-stream, a partir dos
+        eventos posteriores a `ultimo_id` (padrão: apenas os novos)
+        """
+        with self._condicao:
+            posicao = self._posicao if ultimo_id is None else self._posicao_apos(ultimo_id)
+        yield 'retry: 3000\n\n'
+        while True:
+            if posicao is None:
+                # O cliente ficou para trás do buffer: deve recarregar a lista
+                with self._condicao:
+                    posicao, id_atual = self._posicao, self._ultimo_id
+                yield f'id: {id_atual}\nevent: resync\ndata: {{}}\n\n'
+            eventos, perdeu = self.eventos_desde(posicao, intervalo_ping)
+            if perdeu:
+                posicao = None
+                continue
+            if not eventos:
+                yield ': ping\n\n'
+                continue
+            for _, id_evento, tipo, dados in eventos:
+                yield f'id: {id_evento}\nevent: {tipo}\ndata: {serializar(dados)}\n\n'
+            posicao = eventos[-1][0]
+
+
+class MonitorPrazos:
+    """
+    Thread única que reavalia periodicamente os status de prazo
+    (eles mudam com a passagem dos dias, sem alteração nos dados)
+    """
+    def __init__(self, automacao, intervalo=300):
+        self.automacao = automacao
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='monitor-prazos', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self):
+        while True:
+            try:
+                self.automacao.verificar_status_prazos()
+            except Exception:
+                log.exception('verificar_status_prazos_falhou')
+            if self._parar.wait(self.intervalo):
+                break
+
+
+class SincronizadorJornal:
+    """
+    Thread única que incorpora periodicamente as alterações gravadas por
+    outros processos: o feed de eventos deste worker as recebe mesmo sem
+    requisições chegando a ele
+    """
+    def __init__(self, automacao, intervalo=1):
+        self.automacao = automacao
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='sincronizar-jornal', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.automacao.sincronizar()
+            except Exception:
+                log.exception('sincronizar_jornal_falhou')
+
+
+class PoolSMTP:
+    """
+    Conexões SMTP reutilizadas entre envios (até `tamanho` abertas ao mesmo
+    tempo). Cada conexão é renovada após `max_mensagens` mensagens, limite
+    comum nos servidores. Os servidores encerram conexões ociosas (entre as
+    execuções dos alertas, por exemplo): conexões paradas há mais de
+    `max_ocioso` segundos são descartadas e as demais testadas com NOOP ao
+    serem emprestadas. Falhas transitórias (desconexão, respostas 4xx)
+    são repetidas com espera exponencial; recusas definitivas (5xx) não
+    """
+    def __init__(self, host, porta=25, usuario=None, senha=None, starttls=False,
+                 tamanho=2, timeout=30, max_mensagens=100, tentativas=3, espera=1.0, max_ocioso=60):
+        self.host = host
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.starttls = starttls
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self.max_mensagens = max_mensagens
+        self.tentativas = tentativas
+        self.espera = espera
+        self.max_ocioso = max_ocioso
+        # Conexões ociosas: [smtp, mensagens já enviadas por ela, devolvida em (monotonic)]
+        self._livres = []
+        self._lock = threading.Lock()
+        self._vagas = threading.Semaphore(tamanho)
+
+    def _conectar(self):
+        smtp = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.usuario:
+            smtp.login(self.usuario, self.senha)
+        metricas.contar('escritorio_smtp_conexoes_total')
+        return [smtp, 0, time.monotonic()]
+
+    @staticmethod
+    def _descartar(conexao):
+        try:
+            conexao[0].quit()
+        except (smtplib.SMTPException, OSError):
+            conexao[0].close()
+
+    def _reaproveitar(self):
+        """
+        Conexão ociosa ainda aceita pelo servidor, ou None. As expiradas ou
+        que não respondem ao NOOP são descartadas
+        """
+        while True:
+            with self._lock:
+                if not self._livres:
+                    return None
+                conexao = self._livres.pop()
+            if time.monotonic() - conexao[2] <= self.max_ocioso:
+                try:
+                    if conexao[0].noop()[0] == 250:
+                        return conexao
+                except (smtplib.SMTPException, OSError):
+                    pass
+            metricas.contar('escritorio_smtp_conexoes_descartadas_total')
+            self._descartar(conexao)
+
+    @contextmanager
+    def conexao(self):
+        """
+        Empresta uma conexão (reaproveitada ou nova); devolvida ao pool ao final
+        """
+        self._vagas.acquire()
+        try:
+            conexao = self._reaproveitar()
+            if conexao is None:
+                conexao = self._conectar()
+            try:
+                yield conexao
+            except BaseException:
+                # Estado da sessão SMTP incerto: não volta ao pool
+                self._descartar(conexao)
+                raise
+            if conexao[1] >= self.max_mensagens:
+                self._descartar(conexao)
+            else:
+                conexao[2] = time.monotonic()
+                with self._lock:
+                    self._livres.append(conexao)
+        finally:
+            self._vagas.release()
+
+    @staticmethod
+    def _transitoria(erro):
+        if isinstance(erro, smtplib.SMTPRecipientsRefused):
+            return all(400 <= codigo < 500 for codigo, _ in erro.recipients.values())
+        if isinstance(erro, smtplib.SMTPResponseException):
+            return 400 <= erro.smtp_code < 500
+        # Desconexões, timeouts e erros de rede
+        return isinstance(erro, (smtplib.SMTPServerDisconnected, OSError))
+
+    def enviar_lote(self, mensagens):
+        """
+        Envia as mensagens por uma mesma conexão (renovada se cair).
+        Retorna uma lista com None (enviada) ou o erro de cada mensagem
+        """
+        resultados = []
+        for mensagem in mensagens:
+            erro = None
+            for tentativa in range(self.tentativas):
+                try:
+                    with self.conexao() as conexao:
+                        conexao[0].send_message(mensagem)
+                        conexao[1] += 1
+                    erro = None
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    erro = e
+                    if not self._transitoria(e):
+                        break
+                    metricas.contar('escritorio_smtp_tentativas_repetidas_total')
+                    time.sleep(self.espera * 2 ** tentativa)
+            resultados.append(erro)
+        return resultados
+
+    def fechar(self):
+        with self._lock:
+            livres, self._livres = self._livres, []
+        for conexao in livres:
+            self._descartar(conexao)
+
+
+class RegistroAlertas:
+    """
+    Alertas de prazo já enviados (SQLite), um por processo, status e prazo
+    final: cada alerta sai uma única vez por mudança de status. A reserva
+    antes do envio impede que dois workers enviem o mesmo alerta
+    """
+    def __init__(self, caminho, validade_reserva=900):
+        self.caminho = caminho
+        self.validade_reserva = validade_reserva
+        self._local = threading.local()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conexao().execute("""
+            CREATE TABLE IF NOT EXISTS alertas (
+                numero TEXT NOT NULL,
+                status TEXT NOT NULL,
+                prazo_final TEXT NOT NULL,
+                estado TEXT NOT NULL,
+                atualizado_em REAL NOT NULL,
+                PRIMARY KEY (numero, status, prazo_final)
+            )
+        """)
+
+    def _conexao(self):
+        """
+        Retorna a conexão SQLite da thread atual (criada sob demanda)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def fechar(self):
+        """
+        Fecha a conexão da thread atual (ex.: no processo mestre antes do fork)
+        """
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def compactar(self):
+        return compactar_sqlite(self._conexao())
+
+    @staticmethod
+    def chave(prazo):
+        return (str(prazo['numero']), prazo['statusPrazo'], prazo['prazoFinal'])
+
+    def reservar(self, prazos):
+        """
+        Reserva os alertas ainda não enviados nem reservados (reservas
+        abandonadas expiram) e retorna os prazos reservados
+        """
+        conexao = self._conexao()
+        agora = time.time()
+        reservados = []
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            conexao.execute(
+                "DELETE FROM alertas WHERE estado = 'reservado' AND atualizado_em < ?",
+                (agora - self.validade_reserva,)
+            )
+            for prazo in prazos:
+                cursor = conexao.execute(
+                    "INSERT OR IGNORE INTO alertas VALUES (?, ?, ?, 'reservado', ?)", self.chave(prazo) + (agora,)
+                )
+                if cursor.rowcount:
+                    reservados.append(prazo)
+            conexao.execute('COMMIT')
+        except BaseException:
+            conexao.execute('ROLLBACK')
+            raise
+        return reservados
+
+    def pendentes(self, prazos):
+        """
+        Prazos sem alerta enviado ou reservado, sem reservar (simulação)
+        """
+        conexao = self._conexao()
+        return [
+            prazo for prazo in prazos
+            if conexao.execute(
+                'SELECT 1 FROM alertas WHERE numero = ? AND status = ? AND prazo_final = ?', self.chave(prazo)
+            ).fetchone() is None
+        ]
+
+    def confirmar(self, prazos):
+        self._conexao().executemany(
+            "UPDATE alertas SET estado = 'enviado', atualizado_em = ? WHERE numero = ? AND status = ? AND prazo_final = ?",
+            [(time.time(),) + self.chave(prazo) for prazo in prazos]
+        )
+
+    def liberar(self, prazos):
+        """
+        Desfaz a reserva (envio falhou): o alerta volta na próxima execução
+        """
+        self._conexao().executemany(
+            "DELETE FROM alertas WHERE estado = 'reservado' AND numero = ? AND status = ? AND prazo_final = ?",
+            [self.chave(prazo) for prazo in prazos]
+        )
+
+
+class AlertasPrazos:
+    """
+    Resumo diário por advogado dos prazos críticos e vencidos dos processos
+    ativos, enviado por e-mail em lotes pelo PoolSMTP
+    """
+    STATUS_ALERTA = ('vencido', 'critico')
+
+    def __init__(self, automacao, registro, pool, remetente, destinatarios=None, email_padrao=None,
+                 tamanho_lote=20, max_itens=200):
+        self.automacao = automacao
+        self.registro = registro
+        self.pool = pool
+        self.remetente = remetente
+        # Advogado_Responsavel -> e-mail; sem correspondência usa email_padrao
+        self.destinatarios = destinatarios or {}
+        self.email_padrao = email_padrao
+        self.tamanho_lote = tamanho_lote
+        self.max_itens = max_itens
+
+    def coletar(self, hoje=None):
+        """
+        Prazos críticos e vencidos dos processos ativos, pelo índice de prazos
+        """
+        hoje = hoje or datetime.now().date()
+        df = self.automacao.df
+        ativos = set(df.loc[df['Status'] == 'Ativo', 'Numero_Processo'].astype(str))
+        prazos = []
+        for dados in self.automacao.obter_indice_prazos().consultar(datetime.min.date(), hoje + timedelta(days=2)):
+            if str(dados['numero']) not in ativos:
+                continue
+            prazo = dict(dados)
+            prazo['diasRestantes'] = (datetime.strptime(prazo['prazoFinal'], '%Y-%m-%d').date() - hoje).days
+            prazo['statusPrazo'] = self.automacao.classificar_prazo(prazo['diasRestantes'])
+            prazos.append(prazo)
+        return prazos
+
+    def montar_resumo(self, advogado, email, prazos):
+        """
+        E-mail (texto) com os prazos de um advogado, vencidos primeiro
+        """
+        prazos = sorted(prazos, key=lambda prazo: (prazo['statusPrazo'] != 'vencido', prazo['prazoFinal']))
+        vencidos = sum(prazo['statusPrazo'] == 'vencido' for prazo in prazos)
+        linhas = [
+            f"Prezado(a) {advogado},",
+            "",
+            f"Há {len(prazos)} prazo(s) que exigem atenção: {vencidos} vencido(s) e "
+            f"{len(prazos) - vencidos} crítico(s).",
+            ""
+        ]
+        for prazo in prazos[:self.max_itens]:
+            situacao = 'VENCIDO' if prazo['statusPrazo'] == 'vencido' else f"vence em {prazo['diasRestantes']} dia(s)"
+            linhas.append(
+                f"- {prazo['numero']} | {prazo['cliente']} | prazo final "
+                f"{datetime.strptime(prazo['prazoFinal'], '%Y-%m-%d').strftime('%d/%m/%Y')} | {situacao}"
+            )
+        if len(prazos) > self.max_itens:
+            linhas.append(f"... e mais {len(prazos) - self.max_itens} prazo(s). Consulte o sistema.")
+        linhas += ["", "Mensagem automática do Sistema Jurídico."]
+
+        mensagem = EmailMessage()
+        mensagem['Subject'] = f"Prazos: {vencidos} vencido(s), {len(prazos) - vencidos} crítico(s)"
+        mensagem['From'] = self.remetente
+        mensagem['To'] = email
+        mensagem['Date'] = formatdate(localtime=True)
+        mensagem['Message-ID'] = make_msgid()
+        mensagem.set_content('\n'.join(linhas))
+        return mensagem
+
+    def executar(self, simular=False):
+        """
+        Coleta, reserva, envia e confirma os alertas novos. Com `simular`
+        monta os resumos dos alertas pendentes sem enviar nem registrar.
+        Retorna um resumo da execução
+        """
+        with metricas.medir('alertas_prazos'):
+            prazos = self.coletar()
+            novos = [prazo for prazo in prazos if prazo['statusPrazo'] in self.STATUS_ALERTA]
+            novos = self.registro.pendentes(novos) if simular else self.registro.reservar(novos)
+
+            por_advogado = {}
+            for prazo in novos:
+                por_advogado.setdefault(str(prazo['advogado']), []).append(prazo)
+            resumos, sem_destinatario = [], []
+            for advogado, itens in por_advogado.items():
+                email = self.destinatarios.get(advogado) or self.email_padrao
+                if email:
+                    resumos.append((self.montar_resumo(advogado, email, itens), itens))
+                else:
+                    sem_destinatario.extend(itens)
+
+            resultado = {
+                'alertas': len(novos),
+                'resumos': len(resumos),
+                'enviados': 0,
+                'falhas': [],
+                'semDestinatario': sorted({str(prazo['advogado']) for prazo in sem_destinatario})
+            }
+            if simular:
+                resultado['mensagens'] = [mensagem for mensagem, _ in resumos]
+                return resultado
+            # Sem destinatário: fica pendente até o advogado ser configurado
+            self.registro.liberar(sem_destinatario)
+
+            lotes = [resumos[i:i + self.tamanho_lote] for i in range(0, len(resumos), self.tamanho_lote)]
+            with ThreadPoolExecutor(max_workers=max(1, min(self.pool.tamanho, len(lotes)))) as executor:
+                erros_lotes = list(executor.map(lambda lote: self.pool.enviar_lote([m for m, _ in lote]), lotes))
+            for lote, erros in zip(lotes, erros_lotes):
+                for (mensagem, itens), erro in zip(lote, erros):
+                    if erro is None:
+                        self.registro.confirmar(itens)
+                        resultado['enviados'] += 1
+                    else:
+                        self.registro.liberar(itens)
+                        resultado['falhas'].append({'para': mensagem['To'], 'erro': str(erro)})
+            metricas.contar('escritorio_alertas_resumos_total', resultado['enviados'], resultado='enviado')
+            metricas.contar('escritorio_alertas_resumos_total', len(resultado['falhas']), resultado='falha')
+            return resultado
+
+
+class AgendadorAlertas:
+    """
+    Thread que executa os alertas de prazo a cada `intervalo` segundos
+    """
+    def __init__(self, alertas, intervalo=3600):
+        self.alertas = alertas
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='alertas-prazos', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.alertas.executar()
+            except Exception:
+                log.exception('alertas_prazos_falhou')
+        self.alertas.pool.fechar()
+
+
+def criar_alertas(config, automacao):
+    """
+    AlertasPrazos a partir da configuração (chaves ALERTAS_*); None se não
+    houver servidor SMTP configurado
+    """
+    if not config.get('ALERTAS_SMTP_HOST'):
+        return None
+    pool = PoolSMTP(
+        config['ALERTAS_SMTP_HOST'],
+        config.get('ALERTAS_SMTP_PORTA', 25),
+        config.get('ALERTAS_SMTP_USUARIO'),
+        config.get('ALERTAS_SMTP_SENHA'),
+        config.get('ALERTAS_SMTP_STARTTLS', False),
+        config.get('ALERTAS_CONEXOES', 2)
+    )
+    return AlertasPrazos(
+        automacao,
+        RegistroAlertas(config['ALERTAS_CAMINHO']),
+        pool,
+        config.get('ALERTAS_REMETENTE', 'alertas@escritorio.local'),
+        config.get('ALERTAS_DESTINATARIOS') or {},
+        config.get('ALERTAS_EMAIL_PADRAO')
+    )
+
+
+# HTML da página de login
+LOGIN_HTML = """
+<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Sistema Jurídico - Login</title>
+    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
+    <link href="{{ asset('css/login.css') }}" rel="stylesheet">
+</head>
+<body>
+    <div class="login-container">
+        <div class="logo">
+            <i class="fas fa-balance-scale"></i>
+        </div>
+        <h1>Sistema Jurídico</h1>
+        <p class="subtitle">Faça login para acessar o sistema</p>
+
+        <div id="alertContainer"></div>
+
+        <form id="loginForm">
+            <div class="form-group">
+                <label for="usuario">E-mail ou CPF</label>
+                <div class="input-container">
+                    <i class="fas fa-user input-icon"></i>
+                    <input 
+                        type="text" 
+                        id="usuario" 
+                        name="usuario" 
+                        class="form-control" 
+                        placeholder="seu@email.com ou 000.000.000-00"
+                        required
+                    >
+                </div>
+                <div class="format-hint">
+                    Formato aceito: e-mail válido ou CPF (000.000.000-00)
+                </div>
+            </div>
+
+            <div class="form-group">
+                <label for="senha">Senha</label>
+                <div class="input-container">
+                    <i class="fas fa-lock input-icon"></i>
+                    <input 
+                        type="password" 
+                        id="senha" 
+                        name="senha" 
+                        class="form-control" 
+                        placeholder="Digite sua senha"
+                        required
+                    >
+                    <i class="fas fa-eye password-toggle" id="togglePassword"></i>
+                </div>
+            </div>
+
+            <button type="submit" class="btn-login" id="btnLogin">
+                <span id="loginText">
+                    <i class="fas fa-sign-in-alt"></i>
+                    Entrar no Sistema
+                </span>
+                <div class="loading-spinner" id="loginSpinner" style="display: none;"></div>
+            </button>
+        </form>
+
+        <div class="demo-section">
+            <div class="demo-title">Contas de Demonstração</div>
+            <div class="demo-user" onclick="preencherCredenciais('admin@sistema.com', 'admin123')">
+                <div>
+                    <div class="demo-user-email">admin@sistema.com</div>
+                    <div class="demo-user-role">Administrador</div>
+                </div>
+                <i class="fas fa-crown" style="color: #9ca3af;"></i>
+            </div>
+            <div class="demo-user" onclick="preencherCredenciais('escritorio@juridico.com', 'juridico2025')">
+                <div>
+                    <div class="demo-user-email">escritorio@juridico.com</div>
+                    <div class="demo-user-role">Escritório</div>
+                </div>
+                <i class="fas fa-building" style="color: #9ca3af;"></i>
+            </div>
+            <div class="demo-user" onclick="preencherCredenciais('123.456.789-00', 'advogado123')">
+                <div>
+                    <div class="demo-user-email">123.456.789-00</div>
+                    <div class="demo-user-role">Advogado</div>
+                </div>
+                <i class="fas fa-gavel" style="color: #9ca3af;"></i>
+            </div>
+        </div>
+    </div>
+
+    <script src="{{ asset('js/login.js') }}"></script>
+</body>
+</html>
+"""
+
+# Interface principal do dashboard
+DASHBOARD_HTML = """
+<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Sistema de Automação - Escritório de Advocacia</title>
+    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
+    <link href="{{ asset('css/dashboard.css') }}" rel="stylesheet">
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <div>
+                <h1><i class="fas fa-balance-scale"></i> Sistema Jurídico</h1>
+                <p>Gestão de processos e prazos</p>
+            </div>
+            <div class="user-info">
+                <div class="user-avatar" id="userAvatar"></div>
+                <div>
+                    <div id="userName" style="font-weight: bold;"></div>
+                    <div id="userType" style="font-size: 0.9em; color: #666;"></div>
+                </div>
+                <button class="logout-btn" onclick="logout()">
+                    <i class="fas fa-sign-out-alt"></i> Sair
+                </button>
+            </div>
+        </div>
+
+        <div class="nav-tabs">
+            <button class="nav-tab active" data-tab="processos">
+                <i class="fas fa-folder-open"></i> Processos
+            </button>
+            <button class="nav-tab" data-tab="prazos">
+                <i class="fas fa-clock"></i> Prazos
+            </button>
+            <button class="nav-tab" data-tab="documentos">
+                <i class="fas fa-file-contract"></i> Documentos
+            </button>
+            <button class="nav-tab" data-tab="relatorios">
+                <i class="fas fa-chart-bar"></i> Relatórios
+            </button>
+        </div>
+
+        <!-- Painel de Processos -->
+        <div class="content-panel active" id="processos">
+            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
+                <h2><i class="fas fa-folder-open"></i> Gestão de Processos</h2>
+                <button class="btn btn-primary" onclick="openModal('modalNovoProcesso')">
+                    <i class="fas fa-plus"></i> Novo Processo
+                </button>
+            </div>
+
+            <div class="resumo-cards" id="resumoCards"></div>
+
+            <div class="search-box">
+                <i class="fas fa-search"></i>
+                <input type="text" id="searchProcessos" placeholder="Buscar por número, cliente ou advogado...">
+            </div>
+
+            <div class="table-container">
+                <table id="tabelaProcessos">
+                    <thead>
+                        <tr>
+                            <th data-coluna="0">Número</th>
+                            <th data-coluna="1">Cliente</th>
+                            <th data-coluna="2">Advogado</th>
+                            <th data-coluna="3">Tipo</th>
+                            <th data-coluna="4">Data Cadastro</th>
+                            <th data-coluna="5">Status</th>
+                            <th>Ações</th>
+                        </tr>
+                    </thead>
+                    <tbody id="bodyProcessos"></tbody>
+                </table>
+            </div>
+        </div>
+
+        <!-- Outros painéis (prazos, documentos, relatórios) seguem o mesmo padrão... -->
+    </div>
+
+    <!-- Modal Novo Processo -->
+    <div class="modal" id="modalNovoProcesso">
+        <div class="modal-content">
+            <div class="modal-header">
+                <h3><i class="fas fa-plus"></i> Novo Processo</h3>
+                <button class="close" onclick="closeModal('modalNovoProcesso')">&times;</button>
+            </div>
+            
+            <form id="formNovoProcesso">
+                <div class="form-row">
+                    <div class="form-group">
+                        <label for="numeroProcesso">Número do Processo *</label>
+                        <input type="text" id="numeroProcesso" required placeholder="001/2025">
+                    </div>
+                    <div class="form-group">
+                        <label for="clienteProcesso">Cliente *</label>
+                        <input type="text" id="clienteProcesso" required placeholder="Nome do cliente">
+                    </div>
+                </div>
+
+                <div class="form-row">
+                    <div class="form-group">
+                        <label for="advogadoProcesso">Advogado Responsável *</label>
+                        <input type="text" id="advogadoProcesso" required placeholder="Nome do advogado">
+                    </div>
+                    <div class="form-group">
+                        <label for="tipoAcao">Tipo de Ação *</label>
+                        <select id="tipoAcao" required>
+                            <option value="">Selecione</option>
+                            <option value="Cível">Cível</option>
+                            <option value="Trabalhista">Trabalhista</option>
+                            <option value="Penal">Penal</option>
+                            <option value="Família">Família</option>
+                            <option value="Tributário">Tributário</option>
+                            <option value="Administrativo">Administrativo</option>
+                        </select>
+                    </div>
+                </div>
+
+                <div class="form-row">
+                    <div class="form-group">
+                        <label for="dataIntimacao">Data da Intimação</label>
+                        <input type="date" id="dataIntimacao">
+                    </div>
+                    <div class="form-group">
+                        <label for="diasPrazo">Dias de Prazo</label>
+                        <input type="number" id="diasPrazo" value="15" min="1" max="365">
+                    </div>
+                </div>
+
+                <div style="display: flex; gap: 10px; justify-content: flex-end; margin-top: 20px;">
+                    <button type="button" class="btn" style="background: #6c757d; color: white;" onclick="closeModal('modalNovoProcesso')">
+                        Cancelar
+                    </button>
+                    <button type="submit" class="btn btn-primary">
+                        <i class="fas fa-save"></i> Salvar Processo
+                    </button>
+                </div>
+            </form>
+        </div>
+    </div>
+
+    <script src="{{ asset('js/dashboard.js') }}"></script>
+</body>
+</html>
+"""
+
+class FilaTarefas:
+    """
+    Fila local de tarefas longas (relatórios, documentos) executadas num pool
+    de threads ou de processos, sem broker externo. Os resultados ficam num
+    armazenamento limitado em quantidade e com expiração (TTL).
+    """
+    def __init__(self, max_trabalhadores=4, usar_processos=False, capacidade=500, ttl=3600):
+        self.usar_processos = usar_processos
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._executor_classe = ProcessPoolExecutor if usar_processos else ThreadPoolExecutor
+        self._max_trabalhadores = max_trabalhadores
+        self._executor = None
+        self._tarefas = OrderedDict()
+        self._condicao = threading.Condition()
+
+    def _obter_executor(self):
+        # Criado sob demanda (não é herdado por workers após fork)
+        if self._executor is None:
+            self._executor = self._executor_classe(max_workers=self._max_trabalhadores)
+        return self._executor
+
+    def submeter(self, tipo, usuario, funcao, *args, **kwargs):
+        """
+        Agenda `funcao(*args, **kwargs)` e retorna o id da tarefa. Em modo
+        thread a função recebe `progresso(percentual, mensagem)` se o aceitar.
+        """
+        id_tarefa = secrets.token_urlsafe(12)
+        with self._condicao:
+            self._limpar()
+            self._tarefas[id_tarefa] = {
+                'id': id_tarefa,
+                'tipo': tipo,
+                'usuario': usuario,
+                'status': 'pendente',
+                'progresso': 0,
+                'mensagem': '',
+                'criadaEm': time.time(),
+                'concluidaEm': None,
+                'resultado': None,
+                'erro': None,
+                'versao': 0
+            }
+
+        if not self.usar_processos and 'progresso' in inspect.signature(funcao).parameters:
+            kwargs['progresso'] = lambda percentual, mensagem='': self._atualizar(
+                id_tarefa, progresso=percentual, mensagem=mensagem
+            )
+        futuro = self._obter_executor().submit(funcao, *args, **kwargs)
+        self._atualizar(id_tarefa, status='executando')
+        futuro.add_done_callback(lambda f: self._concluir(id_tarefa, f))
+        return id_tarefa
+
+    def _atualizar(self, id_tarefa, **campos):
+        with self._condicao:
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is None or tarefa['status'] in ('concluida', 'erro'):
+                return
+            tarefa.update(campos)
+            tarefa['versao'] += 1
+            self._condicao.notify_all()
+
+    def _concluir(self, id_tarefa, futuro):
+        erro = futuro.exception()
+        if erro is None:
+            campos = {'status': 'concluida', 'progresso': 100, 'resultado': futuro.result()}
+        else:
+            campos = {'status': 'erro', 'erro': str(erro)}
+        with self._condicao:
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is None:
+                return
+            tarefa.update(campos, concluidaEm=time.time())
+            tarefa['versao'] += 1
+            self._condicao.notify_all()
+
+    def _limpar(self):
+        """
+        Remove tarefas concluídas expiradas e, acima da capacidade, as mais antigas
+        """
+        agora = time.time()
+        finalizadas = [
+            id_tarefa for id_tarefa, tarefa in self._tarefas.items()
+            if tarefa['concluidaEm'] is not None
+        ]
+        excedente = len(self._tarefas) - self.capacidade
+        for id_tarefa in finalizadas:
+            tarefa = self._tarefas[id_tarefa]
+            if excedente > 0 or agora - tarefa['concluidaEm'] > self.ttl:
+                self._descartar(self._tarefas.pop(id_tarefa))
+                excedente -= 1
+
+    @staticmethod
+    def _descartar(tarefa):
+        resultado = tarefa.get('resultado')
+        if isinstance(resultado, dict) and resultado.get('arquivoTemporario'):
+            try:
+                os.remove(resultado['caminho'])
+            except OSError:
+                pass
+
+    def obter(self, id_tarefa, usuario=None):
+        """
+        Retorna uma cópia da tarefa (None se inexistente, expirada ou de outro usuário)
+        """
+        with self._condicao:
+            self._limpar()
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is None or (usuario is not None and tarefa['usuario'] != usuario):
+                return None
+            return dict(tarefa)
+
+    def aguardar_mudanca(self, id_tarefa, versao, timeout):
+        """
+        Aguarda a tarefa passar da `versao` informada e retorna seu estado atual
+        """
+        with self._condicao:
+            self._condicao.wait_for(
+                lambda: id_tarefa not in self._tarefas or self._tarefas[id_tarefa]['versao'] > versao,
+                timeout
+            )
+            tarefa = self._tarefas.get(id_tarefa)
+            return dict(tarefa) if tarefa else None
+
+    @staticmethod
+    def publico(tarefa):
+        """
+        Campos da tarefa expostos pela API (sem o resultado)
+        """
+        return {chave: tarefa[chave] for chave in (
+            'id', 'tipo', 'status', 'progresso', 'mensagem', 'criadaEm', 'concluidaEm', 'erro'
+        )}
+
+    def fluxo_sse(self, id_tarefa, serializar, intervalo_ping=15):
+        """
+        Gerador text/event-stream com o progresso da tarefa até sua conclusão
+        """
+        versao = -1
+        while True:
+            tarefa = self.aguardar_mudanca(id_tarefa, versao, intervalo_ping)
+            if tarefa is None:
+                yield 'event: erro\ndata: {"error": "Tarefa não encontrada"}\n\n'
+                return
+            if tarefa['versao'] == versao:
+                yield ': ping\n\n'
+                continue
+            versao = tarefa['versao']
+            yield f"event: progresso\ndata: {serializar(self.publico(tarefa))}\n\n"
+            if tarefa['status'] in ('concluida', 'erro'):
+                return
+
+
+def tarefa_relatorio(automacao, mes=None, ano=None, progresso=None):
+    """
+    Tarefa: relatório mensal
+    """
+    if progresso:
+        progresso(10, 'Gerando relatório')
+    return automacao.gerar_relatorio(mes, ano)
+
+
+def tarefa_contratos(automacao, lista_dados, template_tipo='contrato_servicos', progresso=None):
+    """
+    Tarefa: gera um ou mais contratos; vários são entregues num único .zip
+    """
+    arquivos = []
+    for indice, dados_cliente in enumerate(lista_dados, 1):
+        sucesso, caminho, nome = automacao.gerar_contrato(dados_cliente, template_tipo)
+        if not sucesso:
+            raise RuntimeError(f"Erro ao gerar contrato: {caminho}")
+        arquivos.append((caminho, nome))
+        if progresso:
+            progresso(int(indice * 100 / len(lista_dados)), f'{indice}/{len(lista_dados)} contratos gerados')
+
+    if len(arquivos) == 1:
+        caminho, nome = arquivos[0]
+        return {'caminho': caminho, 'nome': nome}
+
+    fd, caminho_zip = tempfile.mkstemp(suffix='.zip')
+    with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as pacote:
+        for caminho, nome in arquivos:
+            pacote.write(caminho, nome)
+    return {
+        'caminho': caminho_zip,
+        'nome': f"contratos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+        'arquivoTemporario': True
+    }
+
+
+class ServicoIndisponivel(Exception):
+    """
+    Os dados ainda estão sendo carregados (aquecimento em andamento)
+    """
+
+
+bp = Blueprint('escritorio', __name__)
+
+
+def servicos():
+    """
+    Serviços da instância atual da aplicação
+    """
+    return current_app.extensions['escritorio']
+
+
+def obter_automacao():
+    """
+    Retorna a AutomatizacaoEscritorio, aguardando o aquecimento por até
+    ESPERA_PRONTIDAO segundos
+    """
+    escritorio = servicos()
+    if not escritorio.pronto.wait(current_app.config['ESPERA_PRONTIDAO']):
+        raise ServicoIndisponivel()
+    # As gravações dos demais workers chegam pelo SincronizadorJornal; só as
+    # deste navegador (feitas em outro worker) são aplicadas já (ver registrar_gravacao)
+    epoca, _, seq = request.cookies.get('jornal', '').partition('.')
+    if seq.isdigit():
+        escritorio.automacao.sincronizar_ate((epoca, int(seq)))
+    g.automacao = escritorio.automacao
+    return escritorio.automacao
+
+
+@bp.app_errorhandler(ServicoIndisponivel)
+def servico_indisponivel(erro):
+    resposta = jsonify({'success': False, 'error': 'Sistema inicializando, tente novamente em instantes'})
+    resposta.status_code = 503
+    resposta.headers['Retry-After'] = '2'
+    return resposta
+
+
+ID_REQUISICAO_VALIDO = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Latência por rota (registrado no app antes da compressão para incluí-la na
+# medição, pois os hooks after_request executam em ordem inversa)
+@bp.before_app_request
+def iniciar_medicao():
+    g.inicio_requisicao = time.perf_counter()
+    # Correlação: reaproveita o X-Request-ID do proxy quando for um valor seguro
+    recebido = request.headers.get('X-Request-ID', '')
+    g.id_requisicao = recebido if ID_REQUISICAO_VALIDO.match(recebido) else secrets.token_hex(8)
+    id_requisicao_atual.set(g.id_requisicao)
+
+@bp.after_app_request
+def registrar_latencia(resposta):
+    inicio = g.get('inicio_requisicao')
+    if inicio is not None:
+        rota = request.url_rule.rule if request.url_rule else 'nao_encontrada'
+        metricas.observar(
+            'http_requisicao_segundos', time.perf_counter() - inicio,
+            rota=rota, metodo=request.method, status=resposta.status_code
+        )
+    if 'id_requisicao' in g:
+        resposta.headers['X-Request-ID'] = g.id_requisicao
+    return resposta
+
+@bp.after_app_request
+def registrar_gravacao(resposta):
+    # Leitura das próprias gravações com vários workers: um cookie guarda a
+    # posição do jornal após cada requisição que pode ter alterado os dados
+    # (a sessão não serve: cada worker a mantém em cache por alguns segundos)
+    automacao = g.get('automacao')
+    if automacao is not None and request.method != 'GET':
+        epoca, seq = automacao.posicao_jornal()
+        resposta.set_cookie(
+            'jornal', f'{epoca}.{seq}',
+            httponly=True,
+            secure=current_app.config['SESSION_COOKIE_SECURE'],
+            samesite=current_app.config['SESSION_COOKIE_SAMESITE'] or 'Lax'
+        )
+    return resposta
+
+@bp.teardown_app_request
+def encerrar_correlacao(erro=None):
+    # A thread volta ao pool: eventos fora de requisições ficam sem id
+    id_requisicao_atual.set(None)
+
+
+# Rotas da aplicação
+@bp.route('/')
+def index():
+    """Página inicial - redireciona para login ou dashboard"""
+    if 'usuario' in session:
+        return redirect(url_for('.dashboard'))
+    return servicos().template_login.render()
+
+@bp.route('/dashboard')
+def dashboard():
+    """Dashboard principal - requer autenticação"""
+    if 'usuario' not in session:
+        return redirect(url_for('.index'))
+    return servicos().template_dashboard.render()
+
+@bp.route('/assets/<path:nome>')
+def servir_asset(nome):
+    """Assets versionados por hash, com cache de longa duração"""
+    resposta = servicos().assets.resposta(nome, request.headers.get('Accept-Encoding', ''))
+    if resposta is None:
+        return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
+    return resposta.make_conditional(request)
+
+# API Routes
+@bp.route('/api/login', methods=['POST'])
+def login():
+    """Endpoint de autenticação"""
+    try:
+        dados = request.get_json()
+        usuario = dados.get('usuario', '').strip()
+        senha = dados.get('senha', '')
+        
+        if not usuario or not senha:
+            return jsonify({
+                'success': False,
+                'error': 'Usuário e senha são obrigatórios'
+            }), 400
+        
+        # Validar formato do usuário
+        formato_valido, tipo_usuario = servicos().auth.validar_formato_usuario(usuario)
+        if not formato_valido:
+            return jsonify({
+                'success': False,
+                'error': 'Formato de usuário inválido. Use e-mail ou CPF válido.'
+            }), 400
+        
+        # Autenticar usuário
+        sucesso, resultado = servicos().auth.autenticar_usuario(usuario, senha)
+        
+        if not sucesso:
+            return jsonify({
+                'success': False,
+                'error': resultado
+            }), 401
+        
+        # Salvar sessão (nunca guardar o hash da senha)
+        session.regenerar()
+        session['usuario'] = usuario
+        session['dados_usuario'] = {k: v for k, v in resultado.items() if k != 'senha'}
+        
+        return jsonify({
+            'success': True,
+            'message': 'Login realizado com sucesso',
+            'usuario': {
+                'nome': resultado['nome'],
+                'tipo': resultado['tipo']
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Erro interno: {str(e)}'
+        }), 500
+
+@bp.route('/api/logout', methods=['POST'])
+def logout():
+    """Endpoint de logout"""
+    session.clear()
+    return jsonify({
+        'success': True,
+        'message': 'Logout realizado com sucesso'
+    })
+
+@bp.route('/api/usuario')
+def get_usuario():
+    """Obter dados do usuário logado"""
+    if 'usuario' not in session:
+        return jsonify({
+            'success': False,
+            'error': 'Usuário não autenticado'
+        }), 401
+    
+    return jsonify({
+        'success': True,
+        'usuario': session['dados_usuario']
+    })
+
+OPERADORES_DIAS_PRAZO = ('eq', 'ne', 'lt', 'lte', 'gt', 'gte')
+
+
+def ler_filtros_processos(args):
+    """
+    Filtros estruturados dos parâmetros da requisição. Aceita:
+    busca, status/advogado/tipo (repetíveis ou separados por vírgula),
+    clienteId, cadastroDe/cadastroAte e intimacaoDe/intimacaoAte (AAAA-MM-DD)
+    e diasPrazo (repetível: "15" ou "operador:15", operador em eq, ne, lt,
+    lte, gt, gte). Levanta ValueError para valores inválidos
+    """
+    filtros = {'busca': args.get('busca', '').strip() or None}
+    
+    for nome in ('status', 'tipo'):
+        valores = [v.strip() for valor in args.getlist(nome) for v in valor.split(',') if v.strip()]
+        filtros[nome] = tuple(valores) or None
+    # Nomes de advogados podem conter vírgula: apenas repetição do parâmetro
+    filtros['advogado'] = tuple(v.strip() for v in args.getlist('advogado') if v.strip()) or None
+    
+    cliente_id = args.get('clienteId', '').strip()
+    if cliente_id:
+        if not cliente_id.isdigit():
+            raise ValueError('clienteId inválido')
+        filtros['clienteId'] = int(cliente_id)
+    
+    for nome in ('cadastroDe', 'cadastroAte', 'intimacaoDe', 'intimacaoAte'):
+        valor = args.get(nome, '').strip()
+        if valor:
+            try:
+                filtros[nome] = datetime.strptime(valor, '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f'{nome} deve estar no formato AAAA-MM-DD')
+    
+    comparacoes = []
+    for valor in args.getlist('diasPrazo'):
+        operador, _, numero = valor.strip().rpartition(':')
+        operador = operador or 'eq'
+        if operador not in OPERADORES_DIAS_PRAZO:
+            raise ValueError(f'Operador de diasPrazo inválido: {operador}')
+        try:
+            comparacoes.append((operador, int(numero)))
+        except ValueError:
+            raise ValueError(f'diasPrazo inválido: {valor}')
+    filtros['diasPrazo'] = tuple(comparacoes) or None
+    return filtros
+
+
+@bp.route('/api/processos', methods=['GET'])
+def get_processos():
+    """Obter todos os processos (ou apenas os que casam com a busca e os filtros)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    try:
+        g.versao_dados = automacao.versao
+        seq = automacao.alteracoes.seq
+        try:
+            filtros = ler_filtros_processos(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        termo = filtros.pop('busca')
+        if any(filtros.values()):
+            processos = automacao.consultar_processos(busca=termo, **filtros)
+        elif termo:
+            processos = automacao.buscar_processos(termo)
+        else:
+            processos = automacao.obter_todos_processos()
+        with metricas.medir('serializar_processos'):
+            return jsonify({
+                'success': True,
+                'processos': processos,
+                'epoca': automacao.alteracoes.epoca,
+                'seq': seq
+            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos/changes', methods=['GET'])
+def get_alteracoes_processos():
+    """Processos alterados desde a sequência `since` (sincronização incremental)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    since = request.args.get('since', 0, type=int)
+    epoca = request.args.get('epoca')
+    limite = min(request.args.get('limite', 1000, type=int), 10000)
+    
+    try:
+        registro = automacao.alteracoes
+        alteracoes = None
+        if not epoca or epoca == registro.epoca:
+            alteracoes = automacao.obter_alteracoes(since, limite)
+        
+        if alteracoes is None:
+            # Log reiniciado ou alterações já descartadas: refazer a carga completa
+            return jsonify({
+                'success': True,
+                'resync': True,
+                'epoca': registro.epoca,
+                'seq': registro.seq
+            })
+        
+        return jsonify({
+            'success': True,
+            'resync': False,
+            'epoca': registro.epoca,
+            'seq': alteracoes[-1]['seq'] if alteracoes else max(since, 0),
+            'mais': len(alteracoes) == limite,
+            'alteracoes': alteracoes
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos', methods=['POST'])
+def add_processo():
+    """Adicionar novo processo"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    try:
+        dados = request.get_json()
+        sucesso, mensagem = automacao.adicionar_processo(dados)
+        
+        if sucesso:
+            return jsonify({
+                'success': True,
+                'message': mensagem,
+                # Outras grafias já cadastradas que parecem ser o mesmo cliente
+                'possiveisDuplicados': automacao.obter_detector_clientes().semelhantes(
+                    automacao.obter_processo(dados['numero'])['cliente']
+                )
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': mensagem
+            }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos/<path:numero>', methods=['PUT'])
+def update_processo(numero):
+    """Atualizar um processo existente"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    try:
+        dados = request.get_json() or {}
+        sucesso, mensagem = automacao.atualizar_processo(numero, dados)
+        
+        if sucesso:
+            return jsonify({
+                'success': True,
+                'message': mensagem
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': mensagem
+            }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos/<path:numero>', methods=['DELETE'])
+def delete_processo(numero):
+    """Remover um processo"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    try:
+        sucesso, mensagem = automacao.remover_processo(numero)
+        
+        if sucesso:
+            return jsonify({
+                'success': True,
+                'message': mensagem
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': mensagem
+            }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/eventos')
+def eventos():
+    """
+    Feed de alterações (Server-Sent Events). Só nos workers gevent um feed
+    não prende uma thread; no gthread e no werkzeug cada feed ocupa a sua
+    enquanto estiver aberto, e EVENTOS_MAX_CONEXOES limita quantas
+    """
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    
+    escritorio = servicos()
+    vagas = escritorio.vagas_eventos
+    if vagas is not None and not vagas.acquire(blocking=False):
+        # Feeds demais neste worker: o dashboard consulta /api/processos/changes
+        metricas.contar('escritorio_eventos_recusados_total')
+        resposta = jsonify({'success': False, 'error': 'Limite de conexões ao feed atingido'})
+        resposta.status_code = 503
+        resposta.headers['Retry-After'] = '60'
+        return resposta
+    
+    # Reconexão: Last-Event-ID; primeira conexão: a sequência da lista carregada
+    ultimo_id = request.headers.get('Last-Event-ID', type=int)
+    if ultimo_id is None:
+        ultimo_id = request.args.get('desde', type=int)
+    if ultimo_id is not None and ultimo_id > escritorio.barramento.ultimo_id and escritorio.automacao is not None:
+        # Cliente que vem de outro worker, mais adiantado: alcança o jornal antes de retomar
+        escritorio.automacao.sincronizar(esperar=True)
+    resposta = current_app.response_class(
+        escritorio.barramento.fluxo_sse(current_app.json.dumps, ultimo_id),
+        mimetype='text/event-stream'
+    )
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    if vagas is not None:
+        resposta.call_on_close(vagas.release)
+    return resposta
+
+@bp.route('/api/dashboard/bootstrap')
+def get_dashboard_bootstrap():
+    """Dados iniciais do dashboard numa única resposta: usuário, primeira página e resumo"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    limite = min(max(request.args.get('limite', 50, type=int), 0), 500)
+    
+    try:
+        # A resposta inclui o usuário: o cache de compressão é separado por sessão
+        g.versao_dados = (automacao.versao, datetime.now().date().isoformat(), session['usuario'])
+        seq = automacao.alteracoes.seq
+        return jsonify({
+            'success': True,
+            'usuario': session['dados_usuario'],
+            'processos': automacao.obter_pagina_processos(limite),
+            'totalProcessos': len(automacao.df),
+            'resumo': automacao.resumo_dashboard(),
+            'epoca': automacao.alteracoes.epoca,
+            'seq': seq
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/relatorio')
+def get_relatorio():
+    """Relatório de processos do mês (parâmetros opcionais: mes, ano)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    try:
+        relatorio = automacao.gerar_relatorio(
+            request.args.get('mes', type=int),
+            request.args.get('ano', type=int)
+        )
+        return jsonify({
+            'success': True,
+            'relatorio': relatorio
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def resposta_exportacao(nome, formato, cabecalho, linhas, titulo):
+    """
+    Resposta em fluxo com o arquivo exportado (CSV ou XLSX)
+    """
+    exportador = servicos().exportador
+    resposta = current_app.response_class(
+        exportador.gerar(formato, cabecalho, linhas, titulo),
+        mimetype=exportador.TIPOS[formato]
+    )
+    resposta.headers['Content-Disposition'] = (
+        f"attachment; filename={nome}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+    )
+    resposta.headers['Cache-Control'] = 'no-store'
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    return resposta
+
+@bp.route('/api/exportar/<tipo>')
+def exportar(tipo):
+    """
+    Exportar processos, prazos ou relatório (?formato=csv|xlsx e filtros:
+    busca, status, advogado, tipo, statusPrazo, mes, ano)
+    """
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+    
+    formato = request.args.get('formato', 'csv').lower()
+    if formato not in ExportadorPlanilha.TIPOS:
+        return jsonify({'success': False, 'error': 'Formato deve ser csv ou xlsx'}), 400
+    
+    try:
+        try:
+            filtros = ler_filtros_processos(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if tipo == 'processos':
+            cabecalho, linhas = automacao.exportar_processos(**filtros)
+            titulo = 'Processos'
+        elif tipo == 'prazos':
+            cabecalho, linhas = automacao.exportar_prazos(request.args.get('statusPrazo'), **filtros)
+            titulo = 'Prazos'
+        elif tipo == 'relatorio':
+            cabecalho, linhas = automacao.exportar_relatorio(
+                request.args.get('mes', type=int),
+                request.args.get('ano', type=int)
+            )
+            titulo = 'Relatório'
+        else:
+            return jsonify({'success': False, 'error': 'Exportação não encontrada'}), 404
+        return resposta_exportacao(tipo, formato, cabecalho, linhas, titulo)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/tendencias')
+def get_tendencias():
+    """Séries mensais: processos novos, cumprimento de prazos e carga por advogado (?inicio=AAAA-MM&fim=AAAA-MM)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    try:
+        # O mês corrente depende da data de hoje (prazos vencidos)
+        g.versao_dados = (automacao.versao, datetime.now().date().isoformat())
+        tendencias = automacao.calcular_tendencias(request.args.get('inicio'), request.args.get('fim'))
+        return jsonify({
+            'success': True,
+            'tendencias': tendencias
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/prazos/proximos')
+@bp.route('/api/prazos/proximos/<path:advogado>')
+def get_proximos_prazos(advogado=None):
+    """
+    Próximos prazos do escritório ou de um advogado
+    (?dias=7&limite=N, ou intervalo ?de=AAAA-MM-DD&ate=AAAA-MM-DD)
+    """
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    try:
+        def data(parametro):
+            valor = request.args.get(parametro)
+            return datetime.strptime(valor, '%Y-%m-%d').date() if valor else None
+
+        try:
+            inicio, fim = data('de'), data('ate')
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Datas devem estar no formato AAAA-MM-DD'}), 400
+
+        prazos = automacao.proximos_prazos(
+            dias=min(request.args.get('dias', 7, type=int), 3660),
+            advogado=advogado,
+            limite=request.args.get('limite', type=int),
+            inicio=inicio,
+            fim=fim
+        )
+        return jsonify({
+            'success': True,
+            'prazos': prazos
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos/<path:numero>/anexos', methods=['GET'])
+def listar_anexos(numero):
+    """Anexos de um processo"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+
+    try:
+        return jsonify({
+            'success': True,
+            'anexos': servicos().anexos.listar(numero)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos/<path:numero>/anexos', methods=['POST'])
+def enviar_anexo(numero):
+    """Upload de anexo em uma requisição (multipart, campo 'arquivo')"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    if automacao.obter_processo(numero) is None:
+        return jsonify({'success': False, 'error': f'Processo {numero} não encontrado.'}), 404
+    arquivo = request.files.get('arquivo')
+    if arquivo is None or not arquivo.filename:
+        return jsonify({'success': False, 'error': 'Arquivo não enviado'}), 400
+
+    try:
+        anexo = servicos().anexos.guardar(
+            numero, arquivo.filename, arquivo.stream, arquivo.mimetype, session['usuario']
+        )
+        return jsonify({'success': True, 'anexo': anexo}), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/processos/<path:numero>/anexos/uploads', methods=['POST'])
+def iniciar_upload_anexo(numero):
+    """Inicia um upload em partes: {nome, tamanho, tipo}"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
 
-    <script>
-        const API_BASE_URL = '';
-
-        async function apiCall(endpoint, method = 'GET', data = null) {
-            try {
-                const options = {
-                    method: method,
-                    headers: { 'Content-Type': 'application/json' }
-                };
-                if (data) options.body = JSON.stringify(data);
-
-                const response = await fetch(`${API_BASE_URL}/api/${endpoint}`, options);
-                const result = await response.json();
-
-                if (!response.ok) throw new Error(result.error || 'Erro na requisição');
-                return result;
-            } catch (error) {
-                console.error('Erro na API:', error);
-                throw error;
-            }
-        }
+    if automacao.obter_processo(numero) is None:
+        return jsonify({'success': False, 'error': f'Processo {numero} não encontrado.'}), 404
+    dados = request.get_json(silent=True) or {}
+    if not dados.get('nome') or not isinstance(dados.get('tamanho'), int):
+        return jsonify({'success': False, 'error': 'Informe nome e tamanho do arquivo'}), 400
 
-        // Navegação entre abas
-        document.querySelectorAll('.nav-tab').forEach(tab => {
-            tab.addEventListener('click', function() {
-                document.querySelectorAll('.nav-tab').forEach(t => t.classList.remove('active'));
-                document.querySelectorAll('.content-panel').forEach(p => p.classList.remove('active'));
-                
-                this.classList.add('active');
-                document.getElementById(this.dataset.tab).classList.add('active');
-                
-                if (this.dataset.tab === 'processos') carregarProcessos();
-            });
-        });
-
-        // Carregar processos
-        async function carregarProcessos() {
-            const tbody = document.getElementById('bodyProcessos');
-            tbody.innerHTML = '<tr><td colspan="7" style="text-align:center;">Carregando...</td></tr>';
-            
-            try {
-                const data = await apiCall('processos');
-                tbody.innerHTML = '';
-                
-                data.processos.forEach(processo => {
-                    const row = tbody.insertRow();
-                    row.innerHTML = `
-                        <td>${processo.numero}</td>
-                        <td>${processo.cliente}</td>
-                        <td>${processo.advogado}</td>
-                        <td>${processo.tipo}</td>
-                        <td>${formatarData(processo.dataCadastro)}</td>
-                        <td><span style="padding: 4px 12px; background: #d4edda; color: #155724; border-radius: 20px; font-size: 12px; font-weight: 600;">${processo.status}</span></td>
-                        <td>
-                            <button class="btn" style="background: #17a2b8; color: white; padding: 5px 10px; margin-right: 5px;" onclick="editarProcesso('${processo.numero}')">
-                                <i class="fas fa-edit"></i>
-                            </button>
-                            <button class="btn" style="background: #dc3545; color: white; padding: 5px 10px;" onclick="excluirProcesso('${processo.numero}')">
-                                <i class="fas fa-trash"></i>
-                            </button>
-                        </td>
-                    `;
-                });
-            } catch (error) {
-                tbody.innerHTML = '<tr><td colspan="7" style="text-align:center; color: red;">Erro ao carregar processos</td></tr>';
-            }
-        }
+    try:
+        id_upload = servicos().anexos.iniciar_upload(
+            numero, dados['nome'], dados['tamanho'], dados.get('tipo'), session['usuario']
+        )
+        return jsonify({
+            'success': True,
+            'upload': id_upload,
+            # Cada parte precisa caber no limite de uma requisição
+            'tamanhoParte': min(8 * 1024 * 1024, current_app.config['MAX_CONTENT_LENGTH'] or 8 * 1024 * 1024)
+        }), 201
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-        function formatarData(data) {
-            if (!data) return '-';
-            return new Date(data).toLocaleDateString('pt-BR');
-        }
+@bp.route('/api/anexos/uploads/<id_upload>', methods=['GET'])
+def estado_upload_anexo(id_upload):
+    """Bytes já recebidos de um upload em partes (para retomar)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
 
-        function openModal(modalId) {
-            document.getElementById(modalId).style.display = 'block';
-        }
+    estado = servicos().anexos.estado_upload(id_upload, session['usuario'])
+    if estado is None:
+        return jsonify({'success': False, 'error': 'Upload não encontrado'}), 404
+    estado.pop('meta')
+    return jsonify({'success': True, **estado})
 
-        function closeModal(modalId) {
-            document.getElementById(modalId).style.display = 'none';
-        }
+@bp.route('/api/anexos/uploads/<id_upload>', methods=['PUT'])
+def enviar_parte_anexo(id_upload):
+    """Envia uma parte do arquivo (corpo bruto, cabeçalho Content-Range: bytes inicio-fim/total)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
 
-        function editarProcesso(numero) {
-            // Implementar edição
-        }
+    intervalo = parse_content_range_header(request.headers.get('Content-Range'))
+    if intervalo is None or intervalo.units != 'bytes':
+        return jsonify({'success': False, 'error': 'Cabeçalho Content-Range inválido'}), 400
+    anexos = servicos().anexos
+    upload = anexos.estado_upload(id_upload, session['usuario'])
+    if upload is None:
+        return jsonify({'success': False, 'error': 'Upload não encontrado'}), 404
+    if intervalo.length != upload['tamanho']:
+        return jsonify({'success': False, 'error': 'Tamanho total do Content-Range difere do informado no início do upload'}), 400
+    if intervalo.stop > upload['tamanho']:
+        resposta = jsonify({'success': False, 'error': 'Content-Range além do fim do arquivo'})
+        resposta.status_code = 416
+        resposta.headers['Content-Range'] = f"bytes */{upload['tamanho']}"
+        return resposta
+    if request.content_length is not None and request.content_length != intervalo.stop - intervalo.start:
+        return jsonify({'success': False, 'error': 'Tamanho do corpo difere do intervalo do Content-Range'}), 400
 
-        function excluirProcesso(numero) {
-            if (confirm('Tem certeza que deseja excluir este processo?')) {
-                // Implementar exclusão
-            }
-        }
+    try:
+        aceita, estado = anexos.receber_parte(
+            id_upload, intervalo.start, request.stream, session['usuario'], intervalo.stop
+        )
+        if not aceita:
+            # Cliente deve retomar a partir de estado['recebido']
+            return jsonify({'success': False, 'error': 'Parte fora de ordem', **estado}), 409
+        return jsonify({'success': True, **estado}), 201 if 'anexo' in estado else 200
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Upload não encontrado'}), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-        async function logout() {
-            try {
-                await fetch('/api/logout', { method: 'POST' });
-                window.location.href = '/';
-            } catch (error) {
-                console.error('Erro no logout:', error);
-            }
-        }
+@bp.route('/api/anexos/busca')
+def buscar_anexos():
+    """Busca no texto dos anexos (?q=termos); processos ordenados por documentos encontrados"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
 
-        // Carregar dados do usuário
-        async function carregarUsuario() {
-            try {
-                const response = await fetch('/api/usuario');
-                const data = await response.json();
-                
-                if (data.success) {
-                    document.getElementById('userName').textContent = data.usuario.nome;
-                    document.getElementById('userType').textContent = data.usuario.tipo;
-                    document.getElementById('userAvatar').textContent = data.usuario.nome.charAt(0).toUpperCase();
-                }
-            } catch (error) {
-                console.error('Erro ao carregar usuário:', error);
-            }
-        }
+    try:
+        resultados = servicos().anexos.buscar_texto(
+            request.args.get('q', ''),
+            min(request.args.get('limite', 50, type=int), 500)
+        )
+        processos = automacao.obter_processos([r['numero'] for r in resultados])
+        for resultado in resultados:
+            resultado['processo'] = processos.get(resultado['numero'])
+        return jsonify({
+            'success': True,
+            'resultados': resultados
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-        // Inicializar
-        document.addEventListener('DOMContentLoaded', function() {
-            carregarUsuario();
-            carregarProcessos();
-        });
-    </script>
-</body>
-</html>
-"""
+@bp.route('/api/anexos/<id_anexo>', methods=['GET'])
+def baixar_anexo(id_anexo):
+    """Download do anexo (com suporte a Range; o servidor pode usar sendfile)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
 
-# Rotas da aplicação
-@app.route('/')
-def index():
-    """Página inicial - redireciona para login ou dashboard"""
-    if 'usuario' in session:
-        return redirect(url_for('dashboard'))
-    return render_template_string(LOGIN_HTML)
+    anexos = servicos().anexos
+    anexo = anexos.obter(id_anexo)
+    if anexo is None:
+        return jsonify({'success': False, 'error': 'Anexo não encontrado'}), 404
+    tipo = (anexo['tipo'] or '').split(';')[0].strip().lower()
+    exibivel = tipo in anexos.TIPOS_EXIBIVEIS
+    resposta = send_file(
+        anexos.caminho_objeto(anexo['hash']),
+        mimetype=tipo if exibivel else 'application/octet-stream',
+        as_attachment=not exibivel,
+        download_name=anexo['nome'],
+        conditional=True,
+        etag=anexo['hash'],
+        max_age=86400
+    )
+    resposta.cache_control.public = False
+    resposta.cache_control.private = True
+    resposta.headers['X-Content-Type-Options'] = 'nosniff'
+    return resposta
 
-@app.route('/dashboard')
-def dashboard():
-    """Dashboard principal - requer autenticação"""
+@bp.route('/api/anexos/<id_anexo>', methods=['DELETE'])
+def remover_anexo(id_anexo):
+    """Remove um anexo"""
     if 'usuario' not in session:
-        return redirect(url_for('index'))
-    return render_template_string(DASHBOARD_HTML)
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+
+    try:
+        if not servicos().anexos.remover(id_anexo):
+            return jsonify({'success': False, 'error': 'Anexo não encontrado'}), 404
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/clientes', methods=['GET'])
+def listar_clientes():
+    """Clientes cadastrados (?busca= por nome ou CPF/CNPJ)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
 
-# API Routes
-@app.route('/api/login', methods=['POST'])
-def login():
-    """Endpoint de autenticação"""
     try:
-        dados = request.get_json()
-        usuario = dados.get('usuario', '').strip()
-        senha = dados.get('senha', '')
-        
-        if not usuario or not senha:
-            return jsonify({
-                'success': False,
-                'error': 'Usuário e senha são obrigatórios'
-            }), 400
-        
-        # Validar formato do usuário
-        formato_valido, tipo_usuario = auth_sistema.validar_formato_usuario(usuario)
-        if not formato_valido:
-            return jsonify({
-                'success': False,
-                'error': 'Formato de usuário inválido. Use e-mail ou CPF válido.'
-            }), 400
-        
-        # Autenticar usuário
-        sucesso, resultado = auth_sistema.autenticar_usuario(usuario, senha)
-        
-        if not sucesso:
-            return jsonify({
-                'success': False,
-                'error': resultado
-            }), 401
-        
-        # Salvar sessão
-        session['usuario'] = usuario
-        session['dados_usuario'] = resultado
-        
         return jsonify({
             'success': True,
-            'message': 'Login realizado com sucesso',
-            'usuario': {
-                'nome': resultado['nome'],
-                'tipo': resultado['tipo']
-            }
+            'clientes': automacao.clientes.listar(
+                request.args.get('busca', '').strip() or None,
+                min(request.args.get('limite', 100, type=int), 1000)
+            )
         })
-        
     except Exception as e:
         return jsonify({
             'success': False,
-            'error': f'Erro interno: {str(e)}'
+            'error': str(e)
         }), 500
 
-@app.route('/api/logout', methods=['POST'])
-def logout():
-    """Endpoint de logout"""
-    session.clear()
-    return jsonify({
-        'success': True,
-        'message': 'Logout realizado com sucesso'
-    })
-
-@app.route('/api/usuario')
-def get_usuario():
-    """Obter dados do usuário logado"""
+@bp.route('/api/clientes', methods=['POST'])
+def salvar_cliente():
+    """Cadastrar ou atualizar um cliente: {documento, nome, endereco, telefone, email}"""
     if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    try:
+        cliente = automacao.clientes.salvar(request.get_json(silent=True) or {})
+        return jsonify({'success': True, 'cliente': cliente})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
         return jsonify({
             'success': False,
-            'error': 'Usuário não autenticado'
-        }), 401
-    
-    return jsonify({
-        'success': True,
-        'usuario': session['dados_usuario']
-    })
+            'error': str(e)
+        }), 500
 
-@app.route('/api/processos', methods=['GET'])
-def get_processos():
-    """Obter todos os processos"""
+@bp.route('/api/clientes/<documento>', methods=['GET'])
+def get_cliente(documento):
+    """Cliente (por CPF/CNPJ) com seus processos"""
     if 'usuario' not in session:
         return jsonify({'success': False, 'error': 'Não autenticado'}), 401
-    
+    automacao = obter_automacao()
+
     try:
-        processos = automacao.obter_todos_processos()
+        cliente = automacao.clientes.obter_por_documento(documento)
+        if cliente is None:
+            return jsonify({'success': False, 'error': 'Cliente não encontrado'}), 404
+        numeros = automacao.processos_do_cliente(cliente['id'])
+        processos = automacao.obter_processos(numeros)
         return jsonify({
             'success': True,
-            'processos': processos
+            'cliente': cliente,
+            'processos': [processos[numero] for numero in numeros if numero in processos]
         })
     except Exception as e:
         return jsonify({
@@ -1525,37 +5896,571 @@ def get_processos():
             'error': str(e)
         }), 500
 
-@app.route('/api/processos', methods=['POST'])
-def add_processo():
-    """Adicionar novo processo"""
+@bp.route('/api/clientes/duplicados')
+def get_clientes_duplicados():
+    """Grupos de grafias do mesmo cliente, ou os nomes semelhantes a ?nome="""
     if 'usuario' not in session:
         return jsonify({'success': False, 'error': 'Não autenticado'}), 401
-    
+    automacao = obter_automacao()
+
     try:
-        dados = request.get_json()
-        sucesso, mensagem = automacao.adicionar_processo(dados)
-        
-        if sucesso:
+        detector = automacao.obter_detector_clientes()
+        nome = request.args.get('nome', '').strip()
+        if nome:
             return jsonify({
                 'success': True,
-                'message': mensagem
+                'semelhantes': detector.semelhantes(nome)
             })
-        else:
-            return jsonify({
-                'success': False,
-                'error': mensagem
-            }), 400
+        g.versao_dados = automacao.versao
+        return jsonify({
+            'success': True,
+            'grupos': detector.grupos()
+        })
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@bp.route('/api/tarefas/relatorio', methods=['POST'])
+def criar_tarefa_relatorio():
+    """Agendar a geração do relatório mensal (retorna o id da tarefa)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    dados = request.get_json(silent=True) or {}
+    id_tarefa = servicos().tarefas.submeter(
+        'relatorio', session['usuario'], tarefa_relatorio, automacao, dados.get('mes'), dados.get('ano')
+    )
+    return jsonify({'success': True, 'tarefa': id_tarefa}), 202
+
+@bp.route('/api/tarefas/contratos', methods=['POST'])
+def criar_tarefa_contratos():
+    """
+    Agendar a geração de contratos (um cliente ou uma lista em 'clientes');
+    com cadastrarClientes os dados informados são gravados no cadastro
+    """
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    dados = request.get_json(silent=True) or {}
+    lista_dados = dados.get('clientes') or [dados.get('cliente', {})]
+    if not isinstance(lista_dados, list) or not all(isinstance(d, dict) for d in lista_dados):
+        return jsonify({'success': False, 'error': 'Dados de cliente inválidos'}), 400
+    if dados.get('cadastrarClientes'):
+        try:
+            automacao.cadastrar_clientes(lista_dados)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+    id_tarefa = servicos().tarefas.submeter(
+        'contratos', session['usuario'], tarefa_contratos,
+        automacao, lista_dados, dados.get('template', 'contrato_servicos')
+    )
+    return jsonify({'success': True, 'tarefa': id_tarefa}), 202
+
+@bp.route('/api/contratos', methods=['POST'])
+def gerar_contrato():
+    """
+    Gerar um contrato (documentos repetidos são servidos do cache em disco);
+    com cadastrarClientes os dados do cliente são gravados no cadastro
+    """
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    automacao = obter_automacao()
+
+    dados = request.get_json(silent=True) or {}
+    if dados.get('cadastrarClientes'):
+        try:
+            automacao.cadastrar_clientes([dados.get('cliente', {})])
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    sucesso, caminho, nome = automacao.gerar_contrato(
+        dados.get('cliente', {}), dados.get('template', 'contrato_servicos')
+    )
+    if not sucesso:
+        return jsonify({'success': False, 'error': caminho}), 500
+
+    # send_file usa wsgi.file_wrapper (sendfile) quando o servidor oferece
+    resposta = send_file(caminho, as_attachment=True, download_name=nome, conditional=True)
+    resposta.set_etag(os.path.splitext(os.path.basename(caminho))[0])
+    return resposta
+
+@bp.route('/api/tarefas/<id_tarefa>')
+def get_tarefa(id_tarefa):
+    """Status e progresso de uma tarefa"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+
+    fila = servicos().tarefas
+    tarefa = fila.obter(id_tarefa, session['usuario'])
+    if tarefa is None:
+        return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+    return jsonify({'success': True, 'tarefa': fila.publico(tarefa)})
+
+@bp.route('/api/tarefas/<id_tarefa>/eventos')
+def get_tarefa_eventos(id_tarefa):
+    """Progresso de uma tarefa via Server-Sent Events"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+
+    fila = servicos().tarefas
+    if fila.obter(id_tarefa, session['usuario']) is None:
+        return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+    resposta = current_app.response_class(
+        fila.fluxo_sse(id_tarefa, current_app.json.dumps),
+        mimetype='text/event-stream'
+    )
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    return resposta
+
+@bp.route('/api/tarefas/<id_tarefa>/resultado')
+def get_tarefa_resultado(id_tarefa):
+    """Resultado de uma tarefa concluída (JSON ou arquivo gerado)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+
+    tarefa = servicos().tarefas.obter(id_tarefa, session['usuario'])
+    if tarefa is None:
+        return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+    if tarefa['status'] == 'erro':
+        return jsonify({'success': False, 'error': tarefa['erro']}), 500
+    if tarefa['status'] != 'concluida':
+        return jsonify({'success': False, 'error': 'Tarefa ainda em execução'}), 409
+
+    resultado = tarefa['resultado']
+    if isinstance(resultado, dict) and 'caminho' in resultado:
+        if not os.path.exists(resultado['caminho']):
+            return jsonify({'success': False, 'error': 'Arquivo expirado, gere novamente'}), 410
+        return send_file(resultado['caminho'], as_attachment=True, download_name=resultado['nome'])
+    return jsonify({'success': True, 'resultado': resultado})
+
+@bp.route('/metrics')
+def exportar_metricas():
+    """Métricas no formato texto do Prometheus"""
+    return current_app.response_class(metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/api/sessoes/revogar', methods=['POST'])
+def revogar_sessoes():
+    """Revogar todas as sessões de um usuário (somente administradores)"""
+    if 'usuario' not in session:
+        return jsonify({'success': False, 'error': 'Não autenticado'}), 401
+    if session['dados_usuario'].get('tipo') != 'admin':
+        return jsonify({'success': False, 'error': 'Acesso restrito a administradores'}), 403
+
+    dados = request.get_json() or {}
+    usuario = dados.get('usuario', '').strip()
+    if not usuario:
+        return jsonify({'success': False, 'error': 'Usuário é obrigatório'}), 400
+
+    removidas = servicos().sessoes.revogar_usuario(usuario)
+    return jsonify({
+        'success': True,
+        'message': f'{removidas} sessão(ões) revogada(s) para {usuario}'
+    })
+
+@bp.route('/healthz')
+def healthz():
+    """Liveness: o processo está de pé (não depende dos dados)"""
+    return jsonify({'status': 'ok'})
+
+@bp.route('/readyz')
+def readyz():
+    """Readiness: os dados já foram carregados e o sistema pode atender"""
+    escritorio = servicos()
+    if escritorio.pronto.is_set():
+        return jsonify({'status': 'pronto'})
+    resposta = {'status': 'aquecendo'}
+    if escritorio.erro_aquecimento:
+        resposta = {'status': 'erro', 'error': escritorio.erro_aquecimento}
+    return jsonify(resposta), 503
+
 # Demais rotas seguem o mesmo padrão com verificação de autenticação...
 
+
+class ServicosEscritorio:
+    """
+    Serviços compartilhados por uma instância da aplicação
+    """
+    def __init__(self, app):
+        self.config = app.config
+        self.auth = SistemaAutenticacao()
+        self.sessoes = criar_gerenciador_sessoes(app.config['SESSAO_BACKEND'], app.config['SESSAO_CAMINHO'])
+        self.assets = GerenciadorAssets(app.static_folder)
+        self.compressor = CompressorRespostas()
+        self.barramento = BarramentoEventos()
+        maximo_feeds = app.config['EVENTOS_MAX_CONEXOES']
+        self.vagas_eventos = threading.BoundedSemaphore(maximo_feeds) if maximo_feeds else None
+        self.exportador = ExportadorPlanilha()
+        self.anexos = ArmazemAnexos(app.config['UPLOAD_FOLDER'], app.config['ANEXOS_TAMANHO_MAXIMO'])
+        self.extrator = ExtratorTextos(self.anexos, app.config['EXTRACAO_TRABALHADORES'])
+        self.anexos.registrar_ouvinte(self.extrator.agendar)
+        self.tarefas = FilaTarefas(
+            app.config['TAREFAS_TRABALHADORES'],
+            app.config['TAREFAS_PROCESSOS'],
+            app.config['TAREFAS_CAPACIDADE'],
+            app.config['TAREFAS_TTL']
+        )
+        # Templates compilados uma única vez na inicialização
+        self.template_login = app.jinja_env.from_string(LOGIN_HTML)
+        self.template_dashboard = app.jinja_env.from_string(DASHBOARD_HTML)
+        # Preenchidos pelo aquecimento
+        self.automacao = None
+        self.monitor_prazos = None
+        self.sincronizador = None
+        self.agendador_alertas = None
+        self.pronto = threading.Event()
+        self._encerrando = threading.Event()
+        self.erro_aquecimento = None
+
+    def aquecer(self, iniciar_servicos=True):
+        """
+        Carrega os dados e inicia os serviços que dependem deles. Com
+        `iniciar_servicos=False` (aplicação pré-carregada no processo mestre)
+        nenhuma thread é criada: os serviços iniciam em cada worker (apos_fork)
+        """
+        try:
+            automacao = AutomatizacaoEscritorio(
+                self.config['ARQUIVO_PROCESSOS'],
+                ArmazemDocumentos(
+                    self.config['DOCUMENTOS_DIR'],
+                    self.config['DOCUMENTOS_TAMANHO_MAXIMO'],
+                    self.config['DOCUMENTOS_IDADE_MAXIMA']
+                ),
+                CadastroClientes(self.config['CLIENTES_CAMINHO'])
+            )
+            automacao.registrar_ouvinte(self.barramento.publicar)
+            self.barramento.iniciar_em(automacao.alteracoes.seq)
+            # Agregados da primeira carga do dashboard já prontos antes do readyz
+            automacao.resumo_dashboard()
+            self.automacao = automacao
+            if iniciar_servicos:
+                self.iniciar_servicos()
+            self.erro_aquecimento = None
+            self.pronto.set()
+        except Exception as e:
+            self.erro_aquecimento = str(e)
+            log.exception('aquecimento_falhou')
+            return
+        # Detector de clientes duplicados (segundos em bases grandes) fora do
+        # caminho das requisições; pré-carregado, é herdado pelos workers
+        try:
+            automacao.obter_detector_clientes()
+        except Exception:
+            log.exception('construir_detector_clientes_falhou')
+
+    def iniciar_aquecimento(self, em_segundo_plano=True, iniciar_servicos=True):
+        if not em_segundo_plano:
+            self.aquecer(iniciar_servicos)
+            return
+        threading.Thread(target=self.aquecer, args=(iniciar_servicos,), name='aquecimento', daemon=True).start()
+
+    def iniciar_servicos(self, retomar_extracoes=True):
+        """
+        Threads e pools de segundo plano: monitor de prazos, alertas por
+        e-mail (se houver servidor SMTP configurado) e extração de texto
+        """
+        self.monitor_prazos = MonitorPrazos(self.automacao, self.config['INTERVALO_MONITOR_PRAZOS'])
+        self.monitor_prazos.iniciar()
+        self.sincronizador = SincronizadorJornal(self.automacao, self.config['INTERVALO_SINCRONIZACAO'])
+        self.sincronizador.iniciar()
+        alertas = criar_alertas(self.config, self.automacao)
+        if alertas is not None:
+            self.agendador_alertas = AgendadorAlertas(alertas, self.config['ALERTAS_INTERVALO'])
+            self.agendador_alertas.iniciar()
+        if retomar_extracoes:
+            self.extrator.retomar()
+
+    def antes_fork(self):
+        """
+        No processo mestre: fecha as conexões SQLite abertas durante o
+        pré-carregamento (uma conexão não pode ser usada dos dois lados do fork)
+        """
+        for armazem in (self.sessoes.armazenamento, self.anexos, getattr(self.automacao, 'clientes', None),
+                        getattr(self.automacao, 'jornal', None)):
+            fechar = getattr(armazem, 'fechar', None)
+            if fechar is not None:
+                fechar()
+
+    def apos_fork(self):
+        """
+        No worker recém-criado: inicia os serviços que não sobrevivem ao fork.
+        As extrações pendentes são retomadas pelo worker eleito
+        """
+        if self.automacao is not None:
+            self.iniciar_servicos(retomar_extracoes=False)
+            self.disputar_extracoes()
+
+    def disputar_extracoes(self, intervalo=5):
+        """
+        Só um worker retoma as extrações pendentes: o que obtiver a trava
+        (flock) no diretório de anexos, mantida até ele encerrar. Os demais
+        seguem tentando e um deles assume quando o eleito sai (ex.: workers
+        substituídos por kill -HUP); a trava some com o processo, mesmo
+        que ele morra sem encerrar
+        """
+        if fcntl is None:
+            self.extrator.retomar()
+            return
+        
+        def disputar():
+            with open(os.path.join(self.anexos.diretorio, 'extracoes.lock'), 'a') as trava:
+                while True:
+                    try:
+                        fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except OSError:
+                        if self._encerrando.wait(intervalo):
+                            return
+                log.info('extracoes_retomadas', extra={'campos': {'agendadas': self.extrator.retomar()}})
+                self._encerrando.wait()
+        
+        threading.Thread(target=disputar, name='eleicao-extracoes', daemon=True).start()
+
+    def encerrar(self):
+        if self.monitor_prazos is not None:
+            self.monitor_prazos.parar()
+        if self.sincronizador is not None:
+            self.sincronizador.parar()
+        if self.agendador_alertas is not None:
+            self.agendador_alertas.parar()
+        self.extrator.encerrar()
+        # Libera a trava das extrações para o próximo worker
+        self._encerrando.set()
+
+
+def create_app(config=None):
+    """
+    Cria e configura uma instância da aplicação.
+
+    Os caminhos podem ser definidos em `config` ou por variáveis de ambiente
+    com prefixo ESCRITORIO_ (ex.: ESCRITORIO_DADOS_DIR=/srv/escritorio/dados).
+    Os dados são carregados numa thread de aquecimento; /readyz indica quando
+    terminou e as rotas que dependem deles aguardam até ESPERA_PRONTIDAO segundos.
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(
+        SECRET_KEY=os.environ.get('SECRET_KEY', 'sua_chave_secreta_super_segura_aqui'),  # Em produção, usar variável de ambiente
+        MAX_CONTENT_LENGTH=16 * 1024 * 1024,  # 16MB max file size
+        DADOS_DIR='dados',
+        ARQUIVO_PROCESSOS=None,
+        CLIENTES_CAMINHO=None,
+        UPLOAD_FOLDER='uploads',
+        DOCUMENTOS_DIR='documentos_gerados',
+        # Sessões no servidor: 'memoria' (processo único), 'sqlite' ou 'arquivo' (vários workers)
+        SESSAO_BACKEND=os.environ.get('SESSAO_BACKEND', 'memoria'),
+        SESSAO_CAMINHO=os.environ.get('SESSAO_CAMINHO'),
+        AQUECER_EM_SEGUNDO_PLANO=True,
+        ESPERA_PRONTIDAO=10,
+        INTERVALO_MONITOR_PRAZOS=300,
+        # Segundos entre leituras do jornal de alterações dos demais processos
+        INTERVALO_SINCRONIZACAO=1,
+        # Feeds /api/eventos simultâneos por processo (None: sem limite)
+        EVENTOS_MAX_CONEXOES=None,
+        # Fila de tarefas longas: pool de threads (ou processos) e retenção dos resultados
+        TAREFAS_TRABALHADORES=4,
+        TAREFAS_PROCESSOS=False,
+        TAREFAS_CAPACIDADE=500,
+        TAREFAS_TTL=3600,
+        # Cache de documentos gerados (bytes e segundos)
+        DOCUMENTOS_TAMANHO_MAXIMO=512 * 1024 * 1024,
+        DOCUMENTOS_IDADE_MAXIMA=30 * 86400,
+        # Anexos enviados em partes podem exceder MAX_CONTENT_LENGTH
+        ANEXOS_TAMANHO_MAXIMO=1024 * 1024 * 1024,
+        # Processos dedicados à extração de texto dos anexos
+        EXTRACAO_TRABALHADORES=2,
+        # Alertas de prazos críticos/vencidos por e-mail (desativados sem ALERTAS_SMTP_HOST)
+        ALERTAS_SMTP_HOST=None,
+        ALERTAS_SMTP_PORTA=25,
+        ALERTAS_SMTP_USUARIO=None,
+        ALERTAS_SMTP_SENHA=None,
+        ALERTAS_SMTP_STARTTLS=False,
+        ALERTAS_CONEXOES=2,
+        ALERTAS_REMETENTE='alertas@escritorio.local',
+        # Advogado_Responsavel -> e-mail; os demais vão para ALERTAS_EMAIL_PADRAO
+        ALERTAS_DESTINATARIOS={},
+        ALERTAS_EMAIL_PADRAO=None,
+        ALERTAS_INTERVALO=3600,
+        ALERTAS_CAMINHO=None,
+        # False quando a aplicação é pré-carregada antes do fork dos workers (servir)
+        INICIAR_SERVICOS=True,
+        # Eventos de log em JSON, gravados por uma thread de segundo plano (stderr se sem arquivo)
+        LOG_NIVEL='INFO',
+        LOG_ARQUIVO=None
+    )
+    app.config.from_prefixed_env('ESCRITORIO')
+    if config:
+        app.config.update(config)
+
+    # Caminhos derivados do diretório de dados
+    if not app.config['ARQUIVO_PROCESSOS']:
+        app.config['ARQUIVO_PROCESSOS'] = os.path.join(app.config['DADOS_DIR'], 'processos.xlsx')
+    if not app.config['CLIENTES_CAMINHO']:
+        app.config['CLIENTES_CAMINHO'] = os.path.join(app.config['DADOS_DIR'], 'clientes.db')
+    if not app.config['SESSAO_CAMINHO']:
+        nome = 'sessoes.db' if app.config['SESSAO_BACKEND'] == 'sqlite' else 'sessoes'
+        app.config['SESSAO_CAMINHO'] = os.path.join(app.config['DADOS_DIR'], nome)
+    if not app.config['ALERTAS_CAMINHO']:
+        app.config['ALERTAS_CAMINHO'] = os.path.join(app.config['DADOS_DIR'], 'alertas.db')
+
+    for diretorio in ('UPLOAD_FOLDER', 'DADOS_DIR', 'DOCUMENTOS_DIR'):
+        os.makedirs(app.config[diretorio], exist_ok=True)
+
+    saida_logs.configurar(app.config['LOG_NIVEL'], app.config['LOG_ARQUIVO'])
+
+    CORS(app, supports_credentials=True)  # Permitir cookies para sessão
+
+    escritorio = ServicosEscritorio(app)
+    app.extensions['escritorio'] = escritorio
+    app.session_interface = InterfaceSessaoServidor(escritorio.sessoes)
+    app.jinja_env.globals['asset'] = escritorio.assets.url
+
+    app.register_blueprint(bp)
+    app.after_request(escritorio.compressor.comprimir_resposta)
+
+    escritorio.iniciar_aquecimento(app.config['AQUECER_EM_SEGUNDO_PLANO'], app.config['INICIAR_SERVICOS'])
+    return app
+
+
+def _gevent_aplicado():
+    """
+    True se o processo foi iniciado pelo gevent.monkey (python -m gevent.monkey
+    app.py): o monkey-patching precisa anteceder a importação deste módulo, que
+    importa threading, socket, ssl e queue e cria locks, filas e a thread de
+    log no nível do módulo
+    """
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def servir(host='0.0.0.0', porta=5000, workers=None, threads=8, timeout=120, keepalive=5,
+           tempo_encerramento=60, pidfile=None, classe_worker=None, conexoes=1000):
+    """
+    Servidor de produção (gunicorn): a aplicação e os dados são carregados
+    uma vez no processo mestre e os workers são criados por fork, compartilhando
+    essa memória (copy-on-write). As gravações de cada worker chegam aos
+    demais pelo jornal de alterações (alteracoes.db, ao lado da planilha).
+
+    Cada dashboard aberto mantém o feed /api/eventos conectado. Só com
+    gevent (padrão de `classe_worker` quando o processo foi iniciado pelo
+    gevent.monkey, como faz `python app.py`) um feed não ocupa uma thread:
+    cada conexão é uma greenlet e cada worker atende até `conexoes` delas.
+    Com gthread (gevent não instalado, ou --worker gthread) cada feed ocupa
+    uma das `threads` do worker enquanto estiver aberto, como no werkzeug.
+    O limite não elimina esse custo, só o contém: no máximo metade das threads
+    serve feeds (EVENTOS_MAX_CONEXOES) e o restante fica para a API. Os
+    dashboards recusados (503) consultam /api/processos/changes periodicamente
+    e voltam a tentar o feed depois.
+
+    `timeout` cobre a gravação da planilha, que é lenta em bases grandes.
+    Recarga sem indisponibilidade:
+        kill -HUP <mestre>    substitui os workers; os antigos terminam as
+                              requisições em curso (até `tempo_encerramento` s)
+        kill -USR2 <mestre>   sobe um novo mestre com código novo; depois
+                              kill -QUIT no mestre antigo
+
+    Sem gunicorn instalado (ex.: Windows) usa o servidor do werkzeug com
+    threads, num único processo.
+    """
+    workers = workers or os.cpu_count() or 1
+    if classe_worker is None:
+        classe_worker = 'gevent' if _gevent_aplicado() else 'gthread'
+    if classe_worker == 'gevent' and not _gevent_aplicado():
+        raise RuntimeError('Workers gevent exigem o monkey-patching antes da importação: '
+                           'inicie com python -m gevent.monkey app.py')
+    # Os avisos abaixo antecedem create_app: mesma configuração de log que ele lerá
+    saida_logs.configurar(os.environ.get('ESCRITORIO_LOG_NIVEL', 'INFO'), os.environ.get('ESCRITORIO_LOG_ARQUIVO'))
+    config = {'AQUECER_EM_SEGUNDO_PLANO': False, 'INICIAR_SERVICOS': False}
+    if classe_worker == 'gthread':
+        if 'ESCRITORIO_EVENTOS_MAX_CONEXOES' not in os.environ:
+            config['EVENTOS_MAX_CONEXOES'] = max(1, threads // 2)
+        # Cada feed aberto prende uma thread do worker (ver docstring)
+        log.warning('feeds_ocupam_threads', extra={'campos': {'worker': classe_worker, 'threads': threads}})
+    backend = os.environ.get('ESCRITORIO_SESSAO_BACKEND') or os.environ.get('SESSAO_BACKEND', 'memoria')
+    if workers > 1 and backend == 'memoria':
+        # Sessões em memória não são vistas pelos demais workers
+        log.warning('sessoes_em_memoria_substituidas', extra={'campos': {'backend': 'sqlite', 'workers': workers}})
+        config['SESSAO_BACKEND'] = 'sqlite'
+    
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        log.warning('gunicorn_ausente', extra={'campos': {'servidor': 'werkzeug', 'processos': 1}})
+        from werkzeug.serving import run_simple
+        run_simple(host, porta, create_app(), threaded=True)
+        return
+    
+    def escritorio(servidor):
+        return servidor.app.wsgi().extensions['escritorio']
+    
+    opcoes = {
+        'bind': f'{host}:{porta}',
+        'workers': workers,
+        'worker_class': classe_worker,
+        'threads': threads,
+        'worker_connections': conexoes,
+        'preload_app': True,
+        'timeout': timeout,
+        'graceful_timeout': tempo_encerramento,
+        'keepalive': keepalive,
+        'pidfile': pidfile,
+        'pre_fork': lambda servidor, worker: escritorio(servidor).antes_fork(),
+        'post_fork': lambda servidor, worker: escritorio(servidor).apos_fork(),
+        'worker_exit': lambda servidor, worker: escritorio(servidor).encerrar()
+    }
+    
+    class ServidorProducao(BaseApplication):
+        def load_config(self):
+            for nome, valor in opcoes.items():
+                if valor is not None:
+                    self.cfg.set(nome, valor)
+        
+        def load(self):
+            return create_app(config)
+    
+    ServidorProducao().run()
+
+
+def __getattr__(nome):
+    """
+    Instância padrão `app` criada sob demanda (flask --app app run, gunicorn app:app)
+    """
+    if nome == 'app':
+        instancia = globals().get('_app_padrao')
+        if instancia is None:
+            instancia = globals()['_app_padrao'] = create_app()
+        return instancia
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Sistema Jurídico')
+    parser.add_argument('--dev', action='store_true',
+                        help='servidor de desenvolvimento do Flask (debug, processo único)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--porta', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None, help='processos (padrão: número de núcleos)')
+    parser.add_argument('--threads', type=int, default=8, help='threads por worker (gthread)')
+    parser.add_argument('--worker', choices=['gevent', 'gthread'], default=None,
+                        help='tipo de worker (padrão: gevent, se instalado)')
+    parser.add_argument('--conexoes', type=int, default=1000, help='conexões simultâneas por worker (gevent)')
+    parser.add_argument('--timeout', type=int, default=120, help='segundos até um worker travado ser reiniciado')
+    parser.add_argument('--keepalive', type=int, default=5, help='segundos de conexão ociosa mantida aberta')
+    parser.add_argument('--pidfile', help='arquivo com o pid do mestre (para HUP/USR2)')
+    args = parser.parse_args()
+    
+    if not args.dev and args.worker != 'gthread' and not _gevent_aplicado() and importlib.util.find_spec('gevent'):
+        # Relança o processo (mesmo pid) pelo gevent.monkey, que aplica o
+        # monkey-patching antes de importar este módulo
+        os.execv(sys.executable, [sys.executable, '-m', 'gevent.monkey', os.path.abspath(__file__), *sys.argv[1:]])
+    
     print("🚀 Iniciando Sistema Jurídico com Autenticação")
-    print("📊 Acesse: http://localhost:5000")
+    print(f"📊 Acesse: http://localhost:{args.porta}")
     print("\n👤 Contas de demonstração:")
     print("   📧 admin@sistema.com / admin123")
     print("   🏢 escritorio@juridico.com / juridico2025") 
@@ -1567,4 +6472,8 @@ if __name__ == '__main__':
     print("   ✅ Interface responsiva")
     print("   ✅ Comunicação completa com backend")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    if args.dev:
+        create_app().run(debug=True, host=args.host, port=args.porta)
+    else:
+        servir(args.host, args.porta, args.workers, args.threads, args.timeout, args.keepalive,
+               pidfile=args.pidfile, classe_worker=args.worker, conexoes=args.conexoes)
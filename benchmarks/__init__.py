@@ -0,0 +1,8 @@
+"""
+Benchmarks da AutomatizacaoEscritorio e das rotas da API
+
+Uso:
+    python -m benchmarks --tamanhos 1000 10000 --saida resultados.json
+    python -m benchmarks --tamanhos 1000 10000 --comparar baseline.json
+    python -m benchmarks.carga --sessoes 50 --duracao 30   (teste de carga)
+"""
@@ -0,0 +1,336 @@
+"""
+Teste de carga local: simula sessões do dashboard contra a aplicação
+
+Uso:
+    python -m benchmarks.carga --sessoes 50 --duracao 30 --linhas 10000
+    python -m benchmarks.carga --url http://127.0.0.1:5000 --sessoes 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit, quote
+from urllib.request import urlopen
+
+from benchmarks.gerador import gerar_processos
+
+# Peso de cada operação no tráfego simulado
+OPERACOES_PADRAO = {
+    'listar': 50,
+    'buscar': 25,
+    'adicionar': 10,
+    'dashboard': 15
+}
+
+TERMOS_BUSCA = ['Silva', 'Santos', 'Cível', 'Trabalhista', 'Maria', 'João', '2025']
+
+
+class ClienteHttp:
+    """
+    Cliente HTTP/1.1 mínimo sobre asyncio com keep-alive e cookies (sessão,
+    posição do jornal de alterações)
+    """
+    def __init__(self, host, porta, timeout=30):
+        self.host = host
+        self.porta = porta
+        self.timeout = timeout
+        self.cookies = {}
+        self._leitor = None
+        self._escritor = None
+
+    async def _conectar(self):
+        self._leitor, self._escritor = await asyncio.open_connection(self.host, self.porta)
+
+    async def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            try:
+                await self._escritor.wait_closed()
+            except OSError:
+                pass
+            self._escritor = None
+
+    async def requisitar(self, metodo, caminho, corpo=None):
+        """
+        Envia a requisição e retorna (status, corpo); reconecta se o servidor
+        tiver fechado a conexão
+        """
+        for tentativa in range(2):
+            if self._escritor is None:
+                await self._conectar()
+            try:
+                return await asyncio.wait_for(self._requisitar(metodo, caminho, corpo), self.timeout)
+            except asyncio.TimeoutError:
+                # A resposta ainda pode chegar: na mesma conexão seria lida
+                # como a da próxima requisição. Sem nova tentativa (pode não ser idempotente)
+                await self.fechar()
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.fechar()
+                if tentativa:
+                    raise
+
+    async def _requisitar(self, metodo, caminho, corpo):
+        dados = json.dumps(corpo).encode('utf-8') if corpo is not None else b''
+        cabecalhos = [
+            f"{metodo} {caminho} HTTP/1.1",
+            f"Host: {self.host}:{self.porta}",
+            "Accept-Encoding: identity",
+            "Connection: keep-alive",
+            f"Content-Length: {len(dados)}"
+        ]
+        if corpo is not None:
+            cabecalhos.append("Content-Type: application/json")
+        if self.cookies:
+            cabecalhos.append("Cookie: " + '; '.join(f"{nome}={valor}" for nome, valor in self.cookies.items()))
+        self._escritor.write(('\r\n'.join(cabecalhos) + '\r\n\r\n').encode('latin-1') + dados)
+        await self._escritor.drain()
+
+        linha_status = await self._leitor.readline()
+        if not linha_status:
+            raise ConnectionError('conexão encerrada pelo servidor')
+        versao, status = linha_status.decode('latin-1').split(' ', 2)[:2]
+
+        recebidos = {}
+        while True:
+            linha = (await self._leitor.readline()).decode('latin-1').rstrip('\r\n')
+            if not linha:
+                break
+            nome, _, valor = linha.partition(':')
+            nome = nome.strip().lower()
+            valor = valor.strip()
+            if nome == 'set-cookie':
+                cookie, _, conteudo = valor.split(';', 1)[0].partition('=')
+                if conteudo:
+                    self.cookies[cookie.strip()] = conteudo
+                else:
+                    self.cookies.pop(cookie.strip(), None)
+            recebidos[nome] = valor
+
+        if recebidos.get('transfer-encoding', '').lower() == 'chunked':
+            partes = []
+            while True:
+                tamanho = int((await self._leitor.readline()).split(b';')[0], 16)
+                if tamanho == 0:
+                    await self._leitor.readline()
+                    break
+                partes.append(await self._leitor.readexactly(tamanho))
+                await self._leitor.readline()
+            conteudo = b''.join(partes)
+        elif 'content-length' in recebidos:
+            conteudo = await self._leitor.readexactly(int(recebidos['content-length']))
+        else:
+            conteudo = await self._leitor.read()
+            await self.fechar()
+
+        if recebidos.get('connection', '').lower() == 'close' or versao == 'HTTP/1.0':
+            await self.fechar()
+        return int(status), conteudo
+
+
+class Estatisticas:
+    """
+    Acumula latências, erros e tempos esgotados (também contados como erros) por operação
+    """
+    def __init__(self):
+        self.latencias = {}
+        self.erros = {}
+        self.timeouts = {}
+
+    def registrar(self, operacao, segundos, sucesso, timeout=False):
+        self.latencias.setdefault(operacao, []).append(segundos)
+        if not sucesso:
+            self.erros[operacao] = self.erros.get(operacao, 0) + 1
+        if timeout:
+            self.timeouts[operacao] = self.timeouts.get(operacao, 0) + 1
+
+    @staticmethod
+    def percentil(valores, p):
+        if not valores:
+            return 0.0
+        ordenados = sorted(valores)
+        indice = min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))
+        return ordenados[indice]
+
+    def resumo(self, duracao):
+        resultado = {}
+        todas = []
+        for operacao, valores in sorted(self.latencias.items()):
+            todas.extend(valores)
+            resultado[operacao] = self._resumir(
+                valores, self.erros.get(operacao, 0), self.timeouts.get(operacao, 0), duracao
+            )
+        resultado['total'] = self._resumir(todas, sum(self.erros.values()), sum(self.timeouts.values()), duracao)
+        return resultado
+
+    def _resumir(self, valores, erros, timeouts, duracao):
+        return {
+            'requisicoes': len(valores),
+            'vazao_rps': len(valores) / duracao if duracao else 0.0,
+            'taxa_erros': erros / len(valores) if valores else 0.0,
+            'timeouts': timeouts,
+            'p50_ms': self.percentil(valores, 50) * 1000,
+            'p90_ms': self.percentil(valores, 90) * 1000,
+            'p99_ms': self.percentil(valores, 99) * 1000,
+            'max_ms': max(valores) * 1000 if valores else 0.0
+        }
+
+
+async def simular_sessao(indice, host, porta, fim, taxa, operacoes, estatisticas, semente):
+    """
+    Uma sessão de usuário: login e depois operações sorteadas pelos pesos,
+    com intervalos exponenciais (taxa média em requisições por segundo)
+    """
+    rng = random.Random(semente + indice)
+    cliente = ClienteHttp(host, porta)
+    nomes, pesos = zip(*operacoes.items())
+    contador = 0
+
+    async def executar(operacao, metodo, caminho, corpo=None, esperado=(200,)):
+        inicio = time.perf_counter()
+        timeout = False
+        try:
+            status, _ = await cliente.requisitar(metodo, caminho, corpo)
+            sucesso = status in esperado
+        except asyncio.TimeoutError:
+            sucesso = False
+            timeout = True
+        except (OSError, ValueError):
+            sucesso = False
+        estatisticas.registrar(operacao, time.perf_counter() - inicio, sucesso, timeout)
+        return sucesso
+
+    try:
+        await executar('login', 'POST', '/api/login', {'usuario': 'admin@sistema.com', 'senha': 'admin123'})
+        while time.monotonic() < fim:
+            operacao = rng.choices(nomes, pesos)[0]
+            if operacao == 'listar':
+                await executar(operacao, 'GET', '/api/processos')
+            elif operacao == 'buscar':
+                await executar(operacao, 'GET', f"/api/processos?busca={quote(rng.choice(TERMOS_BUSCA))}")
+            elif operacao == 'adicionar':
+                contador += 1
+                await executar(operacao, 'POST', '/api/processos', {
+                    'numero': f"CARGA-{indice}-{contador}-{rng.randrange(10 ** 9)}",
+                    'cliente': 'Cliente Carga',
+                    'advogado': 'Dr. Silva',
+                    'tipo': 'Cível'
+                })
+            elif operacao == 'dashboard':
+                await executar(operacao, 'GET', '/dashboard')
+            if taxa:
+                await asyncio.sleep(rng.expovariate(taxa))
+    finally:
+        await cliente.fechar()
+
+
+async def executar_carga(host, porta, sessoes, duracao, taxa, operacoes, semente=42):
+    estatisticas = Estatisticas()
+    inicio = time.monotonic()
+    fim = inicio + duracao
+    await asyncio.gather(*[
+        simular_sessao(i, host, porta, fim, taxa, operacoes, estatisticas, semente)
+        for i in range(sessoes)
+    ])
+    return estatisticas.resumo(time.monotonic() - inicio)
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(linhas, semente, porta):
+    """
+    Sobe a aplicação num processo separado, num diretório temporário com uma
+    base sintética de `linhas` processos
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    diretorio = tempfile.mkdtemp(prefix='carga_escritorio_')
+    os.makedirs(os.path.join(diretorio, 'dados'))
+    gerar_processos(linhas, semente).to_excel(os.path.join(diretorio, 'dados', 'processos.xlsx'), index=False)
+
+    codigo = (
+        "import app\n"
+        "from werkzeug.serving import run_simple\n"
+        f"run_simple('127.0.0.1', {porta}, app.create_app(), threaded=True)\n"
+    )
+    ambiente = dict(os.environ, PYTHONPATH=raiz + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    processo = subprocess.Popen(
+        [sys.executable, '-c', codigo], cwd=diretorio, env=ambiente,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    limite = time.monotonic() + 120
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError('o servidor encerrou durante a inicialização')
+        try:
+            # Aguarda o fim do aquecimento (dados carregados)
+            with urlopen(f"http://127.0.0.1:{porta}/readyz", timeout=1):
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError('o servidor não respondeu a tempo')
+
+
+def imprimir_resumo(resumo, saida=sys.stderr):
+    print(f"{'operação':<12} {'req':>7} {'req/s':>8} {'erros':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'máx ms':>9}",
+          file=saida)
+    for operacao, r in resumo.items():
+        print(
+            f"{operacao:<12} {r['requisicoes']:>7} {r['vazao_rps']:>8.1f} {r['taxa_erros']:>7.1%} "
+            f"{r['p50_ms']:>9.1f} {r['p90_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}",
+            file=saida
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Teste de carga do sistema jurídico')
+    parser.add_argument('--url', help='servidor já em execução (padrão: sobe um servidor local)')
+    parser.add_argument('--linhas', type=int, default=1000, help='tamanho da base sintética do servidor local')
+    parser.add_argument('--sessoes', type=int, default=20, help='sessões simultâneas')
+    parser.add_argument('--duracao', type=float, default=20, help='duração do teste em segundos')
+    parser.add_argument('--taxa', type=float, default=2.0,
+                        help='requisições por segundo por sessão (0 = sem pausa)')
+    parser.add_argument('--operacoes', type=json.loads, default=OPERACOES_PADRAO,
+                        help='pesos das operações em JSON, ex.: \'{"listar": 1, "adicionar": 1}\'')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='arquivo JSON para gravar o resumo')
+    args = parser.parse_args(argv)
+
+    servidor = None
+    if args.url:
+        partes = urlsplit(args.url)
+        host, porta = partes.hostname, partes.port or 80
+    else:
+        host, porta = '127.0.0.1', porta_livre()
+        print(f"Subindo servidor local com {args.linhas} processos na porta {porta}...", file=sys.stderr)
+        servidor = iniciar_servidor(args.linhas, args.semente, porta)
+
+    try:
+        resumo = asyncio.run(executar_carga(
+            host, porta, args.sessoes, args.duracao, args.taxa, args.operacoes, args.semente
+        ))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    imprimir_resumo(resumo)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resumo, f, indent=2, ensure_ascii=False)
+    return 1 if resumo['total']['taxa_erros'] > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
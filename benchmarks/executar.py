@@ -0,0 +1,229 @@
+"""
+Execução dos benchmarks com medição de tempo e memória
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.gerador import gerar_processos
+
+
+def medir(funcao, repeticoes=5, preparar=None, memoria=True):
+    """
+    Executa `funcao` `repeticoes` vezes e retorna estatísticas de tempo (s)
+    e o pico de memória alocada (bytes) numa execução extra com tracemalloc
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    pico_memoria = None
+    if memoria:
+        if preparar:
+            preparar()
+        tracemalloc.start()
+        try:
+            funcao()
+            _, pico_memoria = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'repeticoes': repeticoes,
+        'minimo': min(tempos),
+        'mediana': statistics.median(tempos),
+        'media': statistics.fmean(tempos),
+        'maximo': max(tempos),
+        'pico_memoria': pico_memoria
+    }
+
+
+def preparar_ambiente():
+    """
+    Isola os arquivos criados pela aplicação num diretório temporário e
+    importa o módulo da aplicação a partir dele
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if raiz not in sys.path:
+        sys.path.insert(0, raiz)
+    os.chdir(tempfile.mkdtemp(prefix='bench_escritorio_'))
+    import app
+    return app
+
+
+def casos_metodos(aplicacao, linhas, semente):
+    """
+    Benchmarks dos métodos públicos de AutomatizacaoEscritorio
+    """
+    arquivo = os.path.abspath(f"dados/bench_{linhas}.xlsx")
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    gerar_processos(linhas, semente).to_excel(arquivo, index=False)
+    automacao = aplicacao.AutomatizacaoEscritorio(arquivo)
+    contador = iter(range(10 ** 9))
+    numero_existente = automacao.df['Numero_Processo'].iloc[len(automacao.df) // 2]
+    termo_busca = automacao.df['Cliente'].iloc[0].split()[0]
+
+    def novo_processo():
+        return {
+            'numero': f"BENCH-{next(contador)}",
+            'cliente': 'Cliente Benchmark',
+            'advogado': 'Dr. Silva',
+            'tipo': 'Cível'
+        }
+
+    pendentes = []
+
+    def preparar_remocao():
+        dados = novo_processo()
+        automacao.adicionar_processo(dados)
+        pendentes.append(dados['numero'])
+
+    casos = {
+        'carregar_dados': (automacao.carregar_dados, None),
+        'salvar_dados': (automacao.salvar_dados, None),
+        'obter_todos_processos': (automacao.obter_todos_processos, None),
+        'calcular_prazos': (automacao.calcular_prazos, None),
+        'gerar_relatorio': (automacao.gerar_relatorio, None),
+        'buscar_processos': (lambda: automacao.buscar_processos(termo_busca), None),
+        'obter_alteracoes': (lambda: automacao.obter_alteracoes(0), None),
+        'gerar_contrato': (lambda: automacao.gerar_contrato({'nome': 'Cliente Benchmark'}), None),
+        'adicionar_processo': (lambda: automacao.adicionar_processo(novo_processo()), None),
+        'atualizar_processo': (lambda: automacao.atualizar_processo(numero_existente, {'diasPrazo': 20}), None),
+        'remover_processo': (lambda: automacao.remover_processo(pendentes.pop()), preparar_remocao)
+    }
+    return automacao, casos
+
+
+def casos_rotas(aplicacao, automacao):
+    """
+    Benchmarks das rotas Flask via test client
+    """
+    app = aplicacao.create_app({'AQUECER_EM_SEGUNDO_PLANO': False})
+    app.extensions['escritorio'].automacao = automacao
+    cliente = app.test_client()
+    cliente.post('/api/login', json={'usuario': 'admin@sistema.com', 'senha': 'admin123'})
+    contador = iter(range(10 ** 9))
+
+    def verificar(resposta):
+        if resposta.status_code >= 400:
+            raise RuntimeError(f"HTTP {resposta.status_code}: {resposta.get_data(as_text=True)[:200]}")
+
+    return {
+        'GET /api/processos': (lambda: verificar(cliente.get('/api/processos')), None),
+        'GET /api/processos (gzip)': (
+            lambda: verificar(cliente.get('/api/processos', headers={'Accept-Encoding': 'gzip'})), None
+        ),
+        'GET /api/processos/changes': (lambda: verificar(cliente.get('/api/processos/changes?since=0')), None),
+        'GET /api/relatorio': (lambda: verificar(cliente.get('/api/relatorio')), None),
+        'POST /api/processos': (lambda: verificar(cliente.post('/api/processos', json={
+            'numero': f"ROTA-{next(contador)}",
+            'cliente': 'Cliente Benchmark',
+            'advogado': 'Dr. Silva',
+            'tipo': 'Cível'
+        })), None)
+    }
+
+
+def executar(tamanhos, repeticoes=5, semente=42, memoria=True, filtro=None, saida_progresso=sys.stderr):
+    """
+    Executa todos os benchmarks para cada tamanho de base e retorna os resultados
+    """
+    aplicacao = preparar_ambiente()
+    import pandas as pd
+
+    resultados = []
+    for linhas in tamanhos:
+        automacao, casos = casos_metodos(aplicacao, linhas, semente)
+        casos.update(casos_rotas(aplicacao, automacao))
+        for nome, (funcao, preparar) in casos.items():
+            if filtro and filtro not in nome:
+                continue
+            print(f"[{linhas} linhas] {nome}...", file=saida_progresso, flush=True)
+            estatisticas = medir(funcao, repeticoes, preparar, memoria)
+            resultados.append({'nome': nome, 'linhas': linhas, **estatisticas})
+
+    return {
+        'meta': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plataforma': platform.platform(),
+            'semente': semente,
+            'repeticoes': repeticoes
+        },
+        'resultados': resultados
+    }
+
+
+def comparar(atual, baseline, tolerancia=0.10):
+    """
+    Compara medianas com um baseline salvo; retorna (linhas_relatorio, regressoes)
+    """
+    base = {(r['nome'], r['linhas']): r for r in baseline['resultados']}
+    relatorio = []
+    regressoes = 0
+    for resultado in atual['resultados']:
+        anterior = base.get((resultado['nome'], resultado['linhas']))
+        if anterior is None:
+            relatorio.append(f"{resultado['nome']:<32} {resultado['linhas']:>9}  (sem baseline)")
+            continue
+        razao = resultado['mediana'] / anterior['mediana'] if anterior['mediana'] else float('inf')
+        marcador = ''
+        if razao > 1 + tolerancia:
+            marcador = '  REGRESSÃO'
+            regressoes += 1
+        elif razao < 1 - tolerancia:
+            marcador = '  melhora'
+        relatorio.append(
+            f"{resultado['nome']:<32} {resultado['linhas']:>9}  "
+            f"{anterior['mediana'] * 1000:>10.2f}ms -> {resultado['mediana'] * 1000:>10.2f}ms  "
+            f"x{razao:.2f}{marcador}"
+        )
+    return relatorio, regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do sistema jurídico')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 10000],
+                        help='quantidades de processos a gerar (ex.: 1000 100000 1000000)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--filtro', help='executa apenas benchmarks cujo nome contém o texto')
+    parser.add_argument('--sem-memoria', action='store_true', help='não mede o pico de memória')
+    parser.add_argument('--saida', help='arquivo JSON para gravar os resultados')
+    parser.add_argument('--comparar', help='arquivo JSON de baseline para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help='variação relativa aceita antes de apontar regressão')
+    args = parser.parse_args(argv)
+
+    saida = os.path.abspath(args.saida) if args.saida else None
+    baseline = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    resultados = executar(args.tamanhos, args.repeticoes, args.semente, not args.sem_memoria, args.filtro)
+
+    if saida:
+        with open(saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(resultados, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+    if baseline is not None:
+        relatorio, regressoes = comparar(resultados, baseline, args.tolerancia)
+        print('\n'.join(relatorio), file=sys.stderr)
+        return 1 if regressoes else 0
+    return 0
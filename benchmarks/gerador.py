@@ -0,0 +1,66 @@
+"""
+Gerador determinístico de bases sintéticas de processos
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+ADVOGADOS = [
+    'Dr. Silva', 'Dra. Santos', 'Dr. Oliveira', 'Dra. Souza', 'Dr. Pereira',
+    'Dra. Costa', 'Dr. Rodrigues', 'Dra. Almeida', 'Dr. Nascimento', 'Dra. Lima',
+    'Dr. Araújo', 'Dra. Fernandes', 'Dr. Carvalho', 'Dra. Gomes', 'Dr. Martins'
+]
+
+TIPOS_ACAO = ['Cível', 'Trabalhista', 'Família', 'Tributário', 'Penal', 'Administrativo']
+PESOS_TIPOS = [0.38, 0.27, 0.15, 0.10, 0.06, 0.04]
+
+STATUS = ['Ativo', 'Suspenso', 'Arquivado', 'Concluído']
+PESOS_STATUS = [0.70, 0.05, 0.15, 0.10]
+
+DIAS_PRAZO = [5, 10, 15, 30, 60]
+PESOS_DIAS_PRAZO = [0.10, 0.20, 0.45, 0.20, 0.05]
+
+NOMES = ['João', 'Maria', 'José', 'Ana', 'Carlos', 'Paula', 'Pedro', 'Juliana', 'Lucas', 'Fernanda']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Ferreira', 'Costa', 'Ribeiro', 'Gomes']
+
+
+def pesos_zipf(n, s=1.1):
+    """
+    Distribuição assimétrica (poucos advogados concentram a maior parte dos casos)
+    """
+    pesos = 1.0 / np.arange(1, n + 1) ** s
+    return pesos / pesos.sum()
+
+
+def gerar_processos(quantidade, semente=42, data_referencia=None, anos=3):
+    """
+    Gera um DataFrame com `quantidade` processos no formato da planilha.
+    Para a mesma semente e data de referência o resultado é sempre o mesmo.
+    """
+    rng = np.random.default_rng(semente)
+    if data_referencia is None:
+        data_referencia = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Cadastros espalhados pelos últimos `anos`, com mais casos recentes
+    idade_dias = (rng.beta(1.2, 2.5, quantidade) * anos * 365).astype(int)
+    datas_cadastro = [data_referencia - timedelta(days=int(d)) for d in idade_dias]
+    # Intimação entre o cadastro e alguns dias depois
+    atraso_intimacao = rng.integers(0, 20, quantidade)
+    datas_intimacao = [c + timedelta(days=int(a)) for c, a in zip(datas_cadastro, atraso_intimacao)]
+
+    nomes = rng.choice(NOMES, quantidade)
+    sobrenomes = rng.choice(SOBRENOMES, quantidade)
+    # Alguns clientes se repetem em vários processos
+    sufixos = rng.integers(0, max(quantidade // 4, 1), quantidade)
+
+    return pd.DataFrame({
+        'Numero_Processo': [f"{i + 1:07d}/{datas_cadastro[i].year}" for i in range(quantidade)],
+        'Cliente': [f"{n} {s} {x}" for n, s, x in zip(nomes, sobrenomes, sufixos)],
+        'Advogado_Responsavel': rng.choice(ADVOGADOS, quantidade, p=pesos_zipf(len(ADVOGADOS))),
+        'Tipo_Acao': rng.choice(TIPOS_ACAO, quantidade, p=PESOS_TIPOS),
+        'Data_Cadastro': [d.strftime('%Y-%m-%d') for d in datas_cadastro],
+        'Data_Intimacao': [d.strftime('%Y-%m-%d') for d in datas_intimacao],
+        'Dias_Prazo': rng.choice(DIAS_PRAZO, quantidade, p=PESOS_DIAS_PRAZO),
+        'Status': rng.choice(STATUS, quantidade, p=PESOS_STATUS)
+    })
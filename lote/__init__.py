@@ -0,0 +1,12 @@
+"""
+Operações em lote sem o servidor web (tarefas noturnas via cron)
+
+Uso:
+    python -m lote importar processos.csv
+    python -m lote exportar processos --saida processos.xlsx --filtro status=Ativo
+    python -m lote prazos --saida prazos.json --trabalhadores 8
+    python -m lote relatorio --mes 9 --ano 2026 --saida relatorio.json
+    python -m lote contratos clientes.csv --saida contratos/ --trabalhadores 8
+    python -m lote compactar
+    python -m lote alertas --smtp-host smtp.escritorio.local --email-padrao prazos@escritorio.local
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from lote.comandos import main
+
+sys.exit(main())
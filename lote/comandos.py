@@ -0,0 +1,454 @@
+"""
+Comandos em lote: usam a AutomatizacaoEscritorio diretamente, sem criar a
+aplicação Flask nem passar por HTTP/sessão. O resumo de cada comando sai em
+JSON no stdout e o progresso no stderr (linhas periódicas quando não há terminal)
+"""
+import argparse
+import json
+import os
+import secrets
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+# Exemplos de erro incluídos no resumo (o total é sempre informado)
+LIMITE_ERROS_RESUMO = 100
+
+
+def importar_aplicacao():
+    """
+    Importa o módulo da aplicação (apenas as classes; create_app não é chamado)
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if raiz not in sys.path:
+        sys.path.insert(0, raiz)
+    import app
+    return app
+
+
+class Progresso:
+    """
+    Progresso no stderr: linha reescrita no terminal, linhas a cada
+    `intervalo` segundos em logs (cron)
+    """
+    def __init__(self, rotulo, total=None, ativo=True, saida=sys.stderr):
+        self.rotulo = rotulo
+        self.total = total
+        self.ativo = ativo
+        self.saida = saida
+        self.terminal = saida.isatty()
+        self.intervalo = 0.2 if self.terminal else 10
+        self.feitos = 0
+        self._escritos = None
+        self._inicio = time.monotonic()
+        self._ultimo = 0
+
+    def avancar(self, quantidade=1):
+        self.feitos += quantidade
+        agora = time.monotonic()
+        if agora - self._ultimo >= self.intervalo:
+            self._escrever(agora)
+
+    def concluir(self):
+        # No terminal a linha é finalizada; em logs evita repetir a última
+        if self.terminal or self._escritos != self.feitos:
+            self._escrever(time.monotonic(), final=True)
+
+    def _escrever(self, agora, final=False):
+        if not self.ativo:
+            return
+        self._ultimo = agora
+        self._escritos = self.feitos
+        texto = f"{self.rotulo}: {self.feitos}"
+        if self.total:
+            texto += f"/{self.total} ({self.feitos / self.total:.0%})"
+        texto += f" em {agora - self._inicio:.1f}s"
+        if self.terminal:
+            print('\r' + texto, end='\n' if final else '', file=self.saida, flush=True)
+        else:
+            print(texto, file=self.saida, flush=True)
+
+
+def informar(args, mensagem):
+    if not args.silencioso:
+        print(mensagem, file=sys.stderr, flush=True)
+
+
+def abrir_automacao(args):
+    app = importar_aplicacao()
+    informar(args, f"Carregando {args.arquivo}...")
+    return app, app.AutomatizacaoEscritorio(
+        args.arquivo,
+        app.ArmazemDocumentos(args.documentos_dir),
+        app.CadastroClientes(os.path.join(args.dados_dir, 'clientes.db'))
+    )
+
+
+def ler_tabela(pd, caminho):
+    """
+    CSV (separador detectado, como o da exportação) ou XLSX, tudo como texto
+    """
+    if os.path.splitext(caminho)[1].lower() in ('.xlsx', '.xls'):
+        return pd.read_excel(caminho, dtype=str)
+    return pd.read_csv(caminho, sep=None, engine='python', encoding='utf-8-sig', dtype=str)
+
+
+def gravar_atomicamente(caminho, partes):
+    """
+    Grava as partes (bytes) num temporário no mesmo diretório e o renomeia no
+    fim: um arquivo lido por outro processo nunca está pela metade
+    """
+    caminho = os.path.abspath(caminho)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # open() respeita o umask (mkstemp criaria o arquivo só para o dono)
+    temporario = f"{caminho}.{secrets.token_hex(4)}.tmp"
+    try:
+        with open(temporario, 'xb') as arquivo:
+            for parte in partes:
+                arquivo.write(parte)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.unlink(temporario)
+        raise
+
+
+def gravar_json(caminho, dados):
+    gravar_atomicamente(caminho, [json.dumps(dados, ensure_ascii=False, indent=2, default=str).encode('utf-8')])
+
+
+def comando_importar(args):
+    app, automacao = abrir_automacao(args)
+    informar(args, f"Lendo {args.entrada}...")
+    tabela = ler_tabela(app.pd, args.entrada)
+    informar(args, f"Importando {len(tabela)} linhas...")
+    adicionados, atualizados, erros = automacao.importar_processos(tabela, args.substituir)
+    return {
+        'linhas': len(tabela),
+        'adicionados': adicionados,
+        'atualizados': atualizados,
+        'totalProcessos': len(automacao.df),
+        'totalErros': len(erros),
+        'erros': [{'linha': linha, 'erro': erro} for linha, erro in erros[:LIMITE_ERROS_RESUMO]]
+    }, 1 if erros else 0
+
+
+def comando_exportar(args):
+    app = importar_aplicacao()
+    from werkzeug.datastructures import MultiDict
+
+    # Parâmetros validados antes de carregar a planilha
+    formato = args.formato or os.path.splitext(args.saida)[1].lstrip('.').lower()
+    if formato not in app.ExportadorPlanilha.TIPOS:
+        raise ValueError('Formato deve ser csv ou xlsx')
+    # Mesmos filtros da API: --filtro status=Ativo --filtro diasPrazo=gt:10
+    filtros = app.ler_filtros_processos(MultiDict(filtro.split('=', 1) for filtro in args.filtro))
+    app, automacao = abrir_automacao(args)
+    if args.tipo == 'processos':
+        cabecalho, linhas = automacao.exportar_processos(**filtros)
+    elif args.tipo == 'prazos':
+        cabecalho, linhas = automacao.exportar_prazos(args.status_prazo, **filtros)
+    else:
+        cabecalho, linhas = automacao.exportar_relatorio(args.mes, args.ano)
+
+    progresso = Progresso(f"exportar {args.tipo}", ativo=not args.silencioso)
+
+    def contar(linhas):
+        for linha in linhas:
+            progresso.avancar()
+            yield linha
+
+    gravar_atomicamente(args.saida, app.ExportadorPlanilha().gerar(
+        formato, cabecalho, contar(linhas), args.tipo.capitalize()
+    ))
+    progresso.concluir()
+    return {'arquivo': os.path.abspath(args.saida), 'formato': formato, 'linhas': progresso.feitos}, 0
+
+
+def calcular_prazos_bloco(bloco, hoje):
+    """
+    Executado nos processos de trabalho: prazos de um bloco de linhas
+    """
+    app = importar_aplicacao()
+    prazos, erros = [], []
+    for _, row in bloco.iterrows():
+        try:
+            prazos.append(app.AutomatizacaoEscritorio._calcular_prazo_linha(row, hoje))
+        except Exception as e:
+            erros.append({'numero': str(row['Numero_Processo']), 'erro': str(e)})
+    return prazos, erros
+
+
+def comando_prazos(args):
+    app, automacao = abrir_automacao(args)
+    df = automacao.df
+    hoje = datetime.now().date()
+    # Blocos menores que o número de trabalhadores permitem mostrar progresso
+    tamanho_bloco = max(1000, -(-len(df) // (args.trabalhadores * 8)))
+    inicios = range(0, len(df), tamanho_bloco)
+    progresso = Progresso('prazos', len(df), not args.silencioso)
+
+    resultados = {}
+    if args.trabalhadores > 1 and len(inicios) > 1:
+        with ProcessPoolExecutor(args.trabalhadores) as executor:
+            futuros = {
+                executor.submit(calcular_prazos_bloco, df.iloc[inicio:inicio + tamanho_bloco], hoje): inicio
+                for inicio in inicios
+            }
+            for futuro in as_completed(futuros):
+                resultados[futuros[futuro]] = futuro.result()
+                progresso.avancar(min(tamanho_bloco, len(df) - futuros[futuro]))
+    else:
+        for inicio in inicios:
+            resultados[inicio] = calcular_prazos_bloco(df.iloc[inicio:inicio + tamanho_bloco], hoje)
+            progresso.avancar(min(tamanho_bloco, len(df) - inicio))
+    progresso.concluir()
+
+    prazos = [prazo for inicio in inicios for prazo in resultados[inicio][0]]
+    erros = [erro for inicio in inicios for erro in resultados[inicio][1]]
+    por_status = {}
+    urgentes_por_advogado = {}
+    for prazo in prazos:
+        por_status[prazo['statusPrazo']] = por_status.get(prazo['statusPrazo'], 0) + 1
+        if prazo['statusPrazo'] in ('critico', 'vencido'):
+            advogado = str(prazo['advogado'])
+            urgentes_por_advogado[advogado] = urgentes_por_advogado.get(advogado, 0) + 1
+    if args.saida:
+        gravar_json(args.saida, prazos)
+    return {
+        'data': hoje.isoformat(),
+        'processos': len(df),
+        'statusPrazos': por_status,
+        'urgentesPorAdvogado': urgentes_por_advogado,
+        'arquivo': os.path.abspath(args.saida) if args.saida else None,
+        'totalErros': len(erros),
+        'erros': erros[:LIMITE_ERROS_RESUMO]
+    }, 1 if erros else 0
+
+
+def comando_relatorio(args):
+    app, automacao = abrir_automacao(args)
+    extensao = os.path.splitext(args.saida or '')[1].lstrip('.').lower()
+    if extensao in app.ExportadorPlanilha.TIPOS:
+        cabecalho, linhas = automacao.exportar_relatorio(args.mes, args.ano)
+        gravar_atomicamente(args.saida, app.ExportadorPlanilha().gerar(extensao, cabecalho, linhas, 'Relatório'))
+        return {'arquivo': os.path.abspath(args.saida)}, 0
+    relatorio = automacao.gerar_relatorio(args.mes, args.ano)
+    if args.saida:
+        gravar_json(args.saida, relatorio)
+        return {'arquivo': os.path.abspath(args.saida), 'periodo': relatorio['periodo']}, 0
+    return relatorio, 0
+
+
+def comando_contratos(args):
+    app, automacao = abrir_automacao(args)
+    if args.entrada.lower().endswith('.json'):
+        with open(args.entrada, 'r', encoding='utf-8') as f:
+            lista_dados = json.load(f)
+    else:
+        tabela = ler_tabela(app.pd, args.entrada)
+        lista_dados = [
+            {chave: valor for chave, valor in registro.items() if isinstance(valor, str) and valor.strip()}
+            for registro in tabela.to_dict('records')
+        ]
+    if args.cadastrar_clientes:
+        automacao.cadastrar_clientes(lista_dados)
+    os.makedirs(args.saida, exist_ok=True)
+    progresso = Progresso('contratos', len(lista_dados), not args.silencioso)
+
+    def gerar(indice, dados_cliente):
+        sucesso, caminho, nome = automacao.gerar_contrato(dados_cliente, args.template)
+        if not sucesso:
+            raise RuntimeError(caminho)
+        # Prefixo evita colisão entre clientes homônimos no mesmo segundo
+        destino = os.path.join(args.saida, f"{indice:05d}_{nome.replace(os.sep, '_')}")
+        shutil.copyfile(caminho, destino)
+        return destino
+
+    # Geração é E/S (SQLite e arquivos): threads bastam e compartilham o cadastro
+    gerados, erros = 0, []
+    with ThreadPoolExecutor(args.trabalhadores) as executor:
+        futuros = {executor.submit(gerar, indice, dados): indice for indice, dados in enumerate(lista_dados, 1)}
+        for futuro in as_completed(futuros):
+            try:
+                futuro.result()
+                gerados += 1
+            except Exception as e:
+                erros.append({'linha': futuros[futuro], 'erro': str(e)})
+            progresso.avancar()
+    progresso.concluir()
+    erros.sort(key=lambda erro: erro['linha'])
+    return {
+        'diretorio': os.path.abspath(args.saida),
+        'gerados': gerados,
+        'totalErros': len(erros),
+        'erros': erros[:LIMITE_ERROS_RESUMO]
+    }, 1 if erros else 0
+
+
+def comando_compactar(args):
+    app = importar_aplicacao()
+    resumo = {}
+
+    informar(args, 'Limpando documentos gerados...')
+    documentos = app.ArmazemDocumentos(args.documentos_dir)
+    antes = len(os.listdir(documentos.diretorio))
+    documentos.limpar()
+    resumo['documentosRemovidos'] = antes - len(os.listdir(documentos.diretorio))
+
+    informar(args, 'Compactando anexos...')
+    anexos = app.ArmazemAnexos(args.uploads_dir)
+    anexos.limpar_uploads_expirados()
+    resumo['anexosBytesLiberados'] = anexos.compactar()
+
+    informar(args, 'Compactando cadastro de clientes...')
+    resumo['clientesBytesLiberados'] = app.CadastroClientes(os.path.join(args.dados_dir, 'clientes.db')).compactar()
+
+    caminho_sessoes = os.path.join(args.dados_dir, 'sessoes.db')
+    if os.path.exists(caminho_sessoes):
+        informar(args, 'Compactando sessões...')
+        sessoes = app.ArmazenamentoSessaoSQLite(caminho_sessoes)
+        resumo['sessoesExpiradas'] = sessoes.limpar_expiradas()
+        resumo['sessoesBytesLiberados'] = sessoes.compactar()
+
+    caminho_alertas = os.path.join(args.dados_dir, 'alertas.db')
+    if os.path.exists(caminho_alertas):
+        informar(args, 'Compactando registro de alertas...')
+        resumo['alertasBytesLiberados'] = app.RegistroAlertas(caminho_alertas).compactar()
+
+    diretorio_planilha = os.path.dirname(os.path.abspath(args.arquivo))
+    caminho_jornal = os.path.join(diretorio_planilha, 'alteracoes.db')
+    if os.path.exists(caminho_jornal):
+        informar(args, 'Compactando jornal de alterações...')
+        jornal = app.JornalAlteracoes(caminho_jornal)
+        with jornal.transacao():
+            jornal.podar()
+        resumo['jornalBytesLiberados'] = jornal.compactar()
+
+    # Temporários de gravações da planilha interrompidas (mais de 1 hora)
+    removidos = 0
+    for entrada in os.scandir(diretorio_planilha):
+        if (entrada.name.startswith('.processos-') and entrada.name.endswith('.xlsx')
+                and time.time() - entrada.stat().st_mtime > 3600):
+            os.remove(entrada.path)
+            removidos += 1
+    resumo['temporariosRemovidos'] = removidos
+    return resumo, 0
+
+
+def comando_alertas(args):
+    if not args.smtp_host and not args.simular:
+        raise ValueError('informe --smtp-host (ou ESCRITORIO_ALERTAS_SMTP_HOST)')
+    app, automacao = abrir_automacao(args)
+    config = {
+        'ALERTAS_SMTP_HOST': args.smtp_host or ('localhost' if args.simular else None),
+        'ALERTAS_SMTP_PORTA': args.smtp_porta,
+        'ALERTAS_SMTP_USUARIO': args.smtp_usuario,
+        'ALERTAS_SMTP_SENHA': os.environ.get('ESCRITORIO_ALERTAS_SMTP_SENHA'),
+        'ALERTAS_SMTP_STARTTLS': args.starttls,
+        'ALERTAS_CONEXOES': args.conexoes,
+        'ALERTAS_REMETENTE': args.remetente,
+        'ALERTAS_DESTINATARIOS': args.destinatarios,
+        'ALERTAS_EMAIL_PADRAO': args.email_padrao,
+        'ALERTAS_CAMINHO': os.path.join(args.dados_dir, 'alertas.db')
+    }
+    alertas = app.criar_alertas(config, automacao)
+    informar(args, 'Simulando alertas...' if args.simular else 'Enviando alertas de prazo...')
+    try:
+        resumo = alertas.executar(simular=args.simular)
+    finally:
+        alertas.pool.fechar()
+    if args.simular:
+        resumo['mensagens'] = [
+            {'para': mensagem['To'], 'assunto': mensagem['Subject'], 'corpo': mensagem.get_content()}
+            for mensagem in resumo['mensagens']
+        ]
+    return resumo, 1 if resumo['falhas'] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Operações em lote do sistema jurídico (sem servidor web)')
+    parser.add_argument('--dados-dir', default=os.environ.get('ESCRITORIO_DADOS_DIR', 'dados'))
+    parser.add_argument('--arquivo', default=os.environ.get('ESCRITORIO_ARQUIVO_PROCESSOS'),
+                        help='planilha de processos (padrão: <dados-dir>/processos.xlsx)')
+    parser.add_argument('--documentos-dir', default=os.environ.get('ESCRITORIO_DOCUMENTOS_DIR', 'documentos_gerados'))
+    parser.add_argument('--uploads-dir', default=os.environ.get('ESCRITORIO_UPLOAD_FOLDER', 'uploads'))
+    parser.add_argument('--silencioso', action='store_true', help='sem progresso no stderr')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    importar = comandos.add_parser('importar', help='importa processos de um CSV/XLSX')
+    importar.add_argument('entrada')
+    importar.add_argument('--substituir', action='store_true',
+                          help='a base passa a ser exatamente a do arquivo (remove os ausentes)')
+    importar.set_defaults(funcao=comando_importar)
+
+    exportar = comandos.add_parser('exportar', help='exporta processos, prazos ou o relatório em CSV/XLSX')
+    exportar.add_argument('tipo', choices=['processos', 'prazos', 'relatorio'])
+    exportar.add_argument('--saida', required=True)
+    exportar.add_argument('--formato', choices=['csv', 'xlsx'], help='padrão: extensão da saída')
+    exportar.add_argument('--filtro', action='append', default=[],
+                          help='filtro como na API, ex.: status=Ativo, diasPrazo=gt:10 (repetível)')
+    exportar.add_argument('--status-prazo', help='apenas prazos com este status (tipo prazos)')
+    exportar.add_argument('--mes', type=int)
+    exportar.add_argument('--ano', type=int)
+    exportar.set_defaults(funcao=comando_exportar)
+
+    prazos = comandos.add_parser('prazos', help='recalcula os prazos de todos os processos')
+    prazos.add_argument('--saida', help='arquivo JSON com todos os prazos')
+    prazos.set_defaults(funcao=comando_prazos)
+
+    relatorio = comandos.add_parser('relatorio', help='relatório mensal (JSON, CSV ou XLSX)')
+    relatorio.add_argument('--mes', type=int)
+    relatorio.add_argument('--ano', type=int)
+    relatorio.add_argument('--saida', help='padrão: JSON no stdout')
+    relatorio.set_defaults(funcao=comando_relatorio)
+
+    contratos = comandos.add_parser('contratos', help='gera contratos para uma lista de clientes (CSV/XLSX/JSON)')
+    contratos.add_argument('entrada')
+    contratos.add_argument('--saida', required=True, help='diretório dos contratos gerados')
+    contratos.add_argument('--template', default='contrato_servicos', choices=['contrato_servicos', 'procuracao'])
+    contratos.add_argument('--cadastrar-clientes', action='store_true',
+                           help='grava no cadastro de clientes os dados com CPF/CNPJ')
+    contratos.set_defaults(funcao=comando_contratos)
+
+    compactar = comandos.add_parser('compactar', help='limpa caches e compacta os bancos SQLite')
+    compactar.set_defaults(funcao=comando_compactar)
+
+    alertas = comandos.add_parser('alertas', help='envia por e-mail os prazos críticos e vencidos ainda não alertados')
+    alertas.add_argument('--smtp-host', default=os.environ.get('ESCRITORIO_ALERTAS_SMTP_HOST'))
+    alertas.add_argument('--smtp-porta', type=int, default=int(os.environ.get('ESCRITORIO_ALERTAS_SMTP_PORTA', 25)))
+    alertas.add_argument('--smtp-usuario', default=os.environ.get('ESCRITORIO_ALERTAS_SMTP_USUARIO'),
+                         help='senha em ESCRITORIO_ALERTAS_SMTP_SENHA')
+    alertas.add_argument('--starttls', action='store_true')
+    alertas.add_argument('--conexoes', type=int, default=2, help='conexões SMTP simultâneas')
+    alertas.add_argument('--remetente', default=os.environ.get('ESCRITORIO_ALERTAS_REMETENTE', 'alertas@escritorio.local'))
+    alertas.add_argument('--destinatarios', type=json.loads,
+                         default=json.loads(os.environ.get('ESCRITORIO_ALERTAS_DESTINATARIOS', '{}')),
+                         help='e-mail de cada advogado em JSON, ex.: \'{"Dr. Silva": "silva@escritorio.com"}\'')
+    alertas.add_argument('--email-padrao', default=os.environ.get('ESCRITORIO_ALERTAS_EMAIL_PADRAO'),
+                         help='destino dos advogados sem e-mail em --destinatarios')
+    alertas.add_argument('--simular', action='store_true', help='mostra os resumos sem enviar nem registrar')
+    alertas.set_defaults(funcao=comando_alertas)
+
+    for subcomando in (prazos, contratos):
+        subcomando.add_argument('--trabalhadores', type=int, default=os.cpu_count() or 1)
+
+    args = parser.parse_args(argv)
+    if not args.arquivo:
+        args.arquivo = os.path.join(args.dados_dir, 'processos.xlsx')
+
+    # Eventos da aplicação (ex.: linhas com prazo inválido) em JSON no stderr
+    importar_aplicacao().saida_logs.configurar('ERROR' if args.silencioso else 'WARNING')
+
+    inicio = time.monotonic()
+    try:
+        resumo, codigo = args.funcao(args)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    informar(args, f"Concluído em {time.monotonic() - inicio:.1f}s")
+    json.dump(resumo, sys.stdout, indent=2, ensure_ascii=False, default=str)
+    print()
+    return codigo
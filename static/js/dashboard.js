@@ -0,0 +1,507 @@
+const API_BASE_URL = '';
+
+async function apiCall(endpoint, method = 'GET', data = null) {
+    try {
+        const options = {
+            method: method,
+            headers: { 'Content-Type': 'application/json' }
+        };
+        if (data) options.body = JSON.stringify(data);
+
+        const response = await fetch(`${API_BASE_URL}/api/${endpoint}`, options);
+        const result = await response.json();
+
+        if (!response.ok) throw new Error(result.error || 'Erro na requisição');
+        return result;
+    } catch (error) {
+        console.error('Erro na API:', error);
+        throw error;
+    }
+}
+
+// Navegação entre abas
+document.querySelectorAll('.nav-tab').forEach(tab => {
+    tab.addEventListener('click', function() {
+        document.querySelectorAll('.nav-tab').forEach(t => t.classList.remove('active'));
+        document.querySelectorAll('.content-panel').forEach(p => p.classList.remove('active'));
+
+        this.classList.add('active');
+        document.getElementById(this.dataset.tab).classList.add('active');
+
+        // A lista é mantida atualizada pelo feed de eventos; só carrega na primeira vez
+        if (this.dataset.tab === 'processos' && tabela.linhas.length === 0) carregarProcessos();
+    });
+});
+
+// Tabela de processos virtualizada: apenas as linhas visíveis ficam no DOM.
+// Cada processo é guardado como array compacto:
+// [numero, cliente, advogado, tipo, dataCadastro, status, chaveBusca]
+const ALTURA_LINHA_PADRAO = 49;
+const LINHAS_EXTRAS = 10;
+// Remoções deixam null em tabela.linhas (os índices das demais linhas não
+// mudam); acima desta fração de removidas a lista é compactada
+const FRACAO_MAXIMA_REMOVIDAS = 0.25;
+const MINIMO_REMOVIDAS = 100;
+const comparadorTexto = new Intl.Collator('pt-BR', { numeric: true, sensitivity: 'base' });
+
+const tabela = {
+    linhas: [],
+    porNumero: new Map(),
+    removidas: 0,
+    visiveis: [],
+    filtro: '',
+    colunaOrdenacao: null,
+    ordemAscendente: true,
+    alturaLinha: ALTURA_LINHA_PADRAO,
+    inicio: -1,
+    fim: -1
+};
+
+function escaparHtml(valor) {
+    return String(valor ?? '').replace(/[&<>"']/g, c => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[c]);
+}
+
+function paraLinha(processo) {
+    const linha = [
+        processo.numero, processo.cliente, processo.advogado, processo.tipo,
+        processo.dataCadastro, processo.status, ''
+    ];
+    linha[6] = linha.slice(0, 4).join('\u0000').toLowerCase();
+    return linha;
+}
+
+function htmlLinha(linha) {
+    const numero = escaparHtml(linha[0]);
+    const numeroJs = escaparHtml(JSON.stringify(String(linha[0])));
+    return `<tr class="linha-processo" data-numero="${numero}">
+        <td>${numero}</td>
+        <td>${escaparHtml(linha[1])}</td>
+        <td>${escaparHtml(linha[2])}</td>
+        <td>${escaparHtml(linha[3])}</td>
+        <td>${formatarData(linha[4])}</td>
+        <td><span style="padding: 4px 12px; background: #d4edda; color: #155724; border-radius: 20px; font-size: 12px; font-weight: 600;">${escaparHtml(linha[5])}</span></td>
+        <td>
+            <button class="btn" style="background: #17a2b8; color: white; padding: 5px 10px; margin-right: 5px;" onclick="editarProcesso(${numeroJs})">
+                <i class="fas fa-edit"></i>
+            </button>
+            <button class="btn" style="background: #dc3545; color: white; padding: 5px 10px;" onclick="excluirProcesso(${numeroJs})">
+                <i class="fas fa-trash"></i>
+            </button>
+        </td>
+    </tr>`;
+}
+
+function htmlEspacador(altura) {
+    return altura > 0 ? `<tr class="espacador"><td colspan="7" style="height: ${altura}px;"></td></tr>` : '';
+}
+
+function linhaVisivel(linha) {
+    return !tabela.filtro || linha[6].includes(tabela.filtro);
+}
+
+// Ordem de duas linhas (com seus índices) na tabela: coluna de ordenação e,
+// no empate ou sem ordenação, a ordem de chegada
+function compararLinhas(linhaA, indiceA, linhaB, indiceB) {
+    if (tabela.colunaOrdenacao !== null) {
+        const coluna = tabela.colunaOrdenacao;
+        const ordem = comparadorTexto.compare(String(linhaA[coluna] ?? ''), String(linhaB[coluna] ?? ''));
+        if (ordem !== 0) return tabela.ordemAscendente ? ordem : -ordem;
+    }
+    return indiceA - indiceB;
+}
+
+// Recalcula a lista de índices visíveis (filtro + ordenação) sem tocar no DOM
+function recalcularVisiveis() {
+    const visiveis = [];
+    for (let i = 0; i < tabela.linhas.length; i++) {
+        const linha = tabela.linhas[i];
+        if (linha && linhaVisivel(linha)) visiveis.push(i);
+    }
+    if (tabela.colunaOrdenacao !== null) {
+        visiveis.sort((a, b) => compararLinhas(tabela.linhas[a], a, tabela.linhas[b], b));
+    }
+
+    tabela.visiveis = visiveis;
+    tabela.inicio = tabela.fim = -1;
+}
+
+// Posição de uma linha em tabela.visiveis por busca binária
+function posicaoVisivel(linha, indice) {
+    const visiveis = tabela.visiveis;
+    let baixo = 0;
+    let alto = visiveis.length;
+    while (baixo < alto) {
+        const meio = (baixo + alto) >> 1;
+        if (compararLinhas(tabela.linhas[visiveis[meio]], visiveis[meio], linha, indice) < 0) baixo = meio + 1;
+        else alto = meio;
+    }
+    return baixo;
+}
+
+function inserirVisivel(linha, indice) {
+    if (linhaVisivel(linha)) tabela.visiveis.splice(posicaoVisivel(linha, indice), 0, indice);
+}
+
+// Chamada antes de a linha mudar em tabela.linhas (a busca usa o conteúdo atual)
+function retirarVisivel(linha, indice) {
+    if (!linhaVisivel(linha)) return;
+    const posicao = posicaoVisivel(linha, indice);
+    if (tabela.visiveis[posicao] === indice) tabela.visiveis.splice(posicao, 1);
+}
+
+// Descarta os null das remoções; os índices mudam, a ordem relativa não
+function compactarLinhas() {
+    const linhas = [];
+    tabela.porNumero = new Map();
+    for (const linha of tabela.linhas) {
+        if (!linha) continue;
+        tabela.porNumero.set(linha[0], linhas.length);
+        linhas.push(linha);
+    }
+    tabela.linhas = linhas;
+    tabela.removidas = 0;
+    recalcularVisiveis();
+}
+
+// Desenha somente a janela de linhas visível no container com rolagem
+function renderizarJanela(forcar = false) {
+    const container = document.querySelector('#processos .table-container');
+    const tbody = document.getElementById('bodyProcessos');
+    const total = tabela.visiveis.length;
+
+    if (total === 0) {
+        tbody.innerHTML = '<tr><td colspan="7" style="text-align:center;">Nenhum processo encontrado</td></tr>';
+        tabela.inicio = tabela.fim = -1;
+        return;
+    }
+
+    const altura = tabela.alturaLinha;
+    const inicio = Math.max(0, Math.floor(container.scrollTop / altura) - LINHAS_EXTRAS);
+    const fim = Math.min(total, Math.ceil((container.scrollTop + container.clientHeight) / altura) + LINHAS_EXTRAS);
+    if (!forcar && inicio === tabela.inicio && fim === tabela.fim) return;
+
+    const partes = [htmlEspacador(inicio * altura)];
+    for (let i = inicio; i < fim; i++) partes.push(htmlLinha(tabela.linhas[tabela.visiveis[i]]));
+    partes.push(htmlEspacador((total - fim) * altura));
+    tbody.innerHTML = partes.join('');
+
+    tabela.inicio = inicio;
+    tabela.fim = fim;
+
+    // Ajusta a altura real da linha na primeira renderização
+    const primeira = tbody.querySelector('tr.linha-processo');
+    if (primeira && primeira.offsetHeight && primeira.offsetHeight !== tabela.alturaLinha) {
+        tabela.alturaLinha = primeira.offsetHeight;
+        renderizarJanela(true);
+    }
+}
+
+function atualizarTabela() {
+    recalcularVisiveis();
+    renderizarJanela(true);
+}
+
+// Insere ou atualiza um processo sem reconstruir a tabela
+function aplicarProcesso(processo) {
+    const linha = paraLinha(processo);
+    const indice = tabela.porNumero.get(linha[0]);
+
+    if (indice === undefined) {
+        tabela.porNumero.set(linha[0], tabela.linhas.length);
+        tabela.linhas.push(linha);
+        inserirVisivel(linha, tabela.linhas.length - 1);
+        renderizarJanela(true);
+        return;
+    }
+
+    const anterior = tabela.linhas[indice];
+    const mudouPosicao = anterior[6] !== linha[6] ||
+        (tabela.colunaOrdenacao !== null && anterior[tabela.colunaOrdenacao] !== linha[tabela.colunaOrdenacao]);
+    if (mudouPosicao) {
+        retirarVisivel(anterior, indice);
+        tabela.linhas[indice] = linha;
+        inserirVisivel(linha, indice);
+        renderizarJanela(true);
+        return;
+    }
+    tabela.linhas[indice] = linha;
+
+    // Mesma posição: troca apenas a linha no DOM, se estiver visível
+    const tr = document.querySelector(`#bodyProcessos tr[data-numero="${CSS.escape(String(linha[0]))}"]`);
+    if (tr) tr.outerHTML = htmlLinha(linha);
+}
+
+function removerProcessoDaTabela(numero) {
+    const indice = tabela.porNumero.get(numero);
+    if (indice === undefined) return;
+    retirarVisivel(tabela.linhas[indice], indice);
+    tabela.linhas[indice] = null;
+    tabela.porNumero.delete(numero);
+    tabela.removidas++;
+    if (tabela.removidas > MINIMO_REMOVIDAS && tabela.removidas > tabela.linhas.length * FRACAO_MAXIMA_REMOVIDAS) {
+        compactarLinhas();
+    }
+    renderizarJanela(true);
+}
+
+// Lista × feed de eventos: a lista vem com a sequência (seq) do log de
+// alterações e o id de cada evento é a sequência da alteração. Enquanto uma
+// lista é carregada os eventos ficam retidos; quando ela chega, só os
+// posteriores à sua sequência são aplicados sobre ela.
+const sincronizacao = { seq: null, epoca: null, geracao: 0, carregando: false, pendentes: [] };
+
+function aplicarEvento(tipo, evento) {
+    const dados = JSON.parse(evento.data);
+    if (tipo === 'processo_removido') removerProcessoDaTabela(dados.numero);
+    else aplicarProcesso(dados);
+    sincronizacao.seq = Math.max(sincronizacao.seq ?? 0, Number(evento.lastEventId));
+}
+
+function receberEvento(tipo, evento) {
+    if (sincronizacao.carregando) sincronizacao.pendentes.push([tipo, evento]);
+    else aplicarEvento(tipo, evento);
+}
+
+function adotarLista(processos, seq, epoca) {
+    tabela.linhas = processos.map(paraLinha);
+    tabela.porNumero = new Map(tabela.linhas.map((linha, i) => [linha[0], i]));
+    tabela.removidas = 0;
+    atualizarTabela();
+    if (seq !== undefined) {
+        sincronizacao.seq = seq;
+        sincronizacao.epoca = epoca;
+    }
+}
+
+function liberarPendentes() {
+    const { pendentes, seq } = sincronizacao;
+    sincronizacao.carregando = false;
+    sincronizacao.pendentes = [];
+    for (const [tipo, evento] of pendentes) {
+        if (seq === null || Number(evento.lastEventId) > seq) {
+            aplicarEvento(tipo, evento);
+        }
+    }
+}
+
+// Carregar processos
+async function carregarProcessos() {
+    const tbody = document.getElementById('bodyProcessos');
+    if (tabela.linhas.length === 0) {
+        tbody.innerHTML = '<tr><td colspan="7" style="text-align:center;">Carregando...</td></tr>';
+    }
+
+    // Só a carga mais recente é adotada; as anteriores são descartadas ao chegar
+    const geracao = ++sincronizacao.geracao;
+    sincronizacao.carregando = true;
+    try {
+        const data = await apiCall('processos');
+        if (geracao !== sincronizacao.geracao) return;
+        adotarLista(data.processos, data.seq, data.epoca);
+    } catch (error) {
+        if (geracao !== sincronizacao.geracao) return;
+        tbody.innerHTML = '<tr><td colspan="7" style="text-align:center; color: red;">Erro ao carregar processos</td></tr>';
+    }
+    liberarPendentes();
+}
+
+document.querySelector('#processos .table-container').addEventListener('scroll', () => {
+    window.requestAnimationFrame(() => renderizarJanela());
+}, { passive: true });
+
+let temporizadorBusca = null;
+document.getElementById('searchProcessos').addEventListener('input', function() {
+    clearTimeout(temporizadorBusca);
+    temporizadorBusca = setTimeout(() => {
+        tabela.filtro = this.value.trim().toLowerCase();
+        document.querySelector('#processos .table-container').scrollTop = 0;
+        atualizarTabela();
+    }, 120);
+});
+
+document.querySelectorAll('#tabelaProcessos th[data-coluna]').forEach(th => {
+    th.addEventListener('click', function() {
+        const coluna = Number(this.dataset.coluna);
+        tabela.ordemAscendente = tabela.colunaOrdenacao === coluna ? !tabela.ordemAscendente : true;
+        tabela.colunaOrdenacao = coluna;
+        document.querySelectorAll('#tabelaProcessos th[data-coluna]').forEach(t => t.classList.remove('ordenado-asc', 'ordenado-desc'));
+        this.classList.add(tabela.ordemAscendente ? 'ordenado-asc' : 'ordenado-desc');
+        atualizarTabela();
+    });
+});
+
+document.getElementById('formNovoProcesso').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const processo = {
+        numero: document.getElementById('numeroProcesso').value.trim(),
+        cliente: document.getElementById('clienteProcesso').value.trim(),
+        advogado: document.getElementById('advogadoProcesso').value.trim(),
+        tipo: document.getElementById('tipoAcao').value,
+        diasPrazo: Number(document.getElementById('diasPrazo').value) || 15
+    };
+    const dataIntimacao = document.getElementById('dataIntimacao').value;
+    if (dataIntimacao) processo.dataIntimacao = dataIntimacao;
+
+    try {
+        await apiCall('processos', 'POST', processo);
+        aplicarProcesso({
+            ...processo,
+            dataCadastro: new Date().toISOString().slice(0, 10),
+            status: 'Ativo'
+        });
+        this.reset();
+        closeModal('modalNovoProcesso');
+    } catch (error) {
+        alert(error.message);
+    }
+});
+
+function formatarData(data) {
+    if (!data) return '-';
+    return new Date(data).toLocaleDateString('pt-BR');
+}
+
+function openModal(modalId) {
+    document.getElementById(modalId).style.display = 'block';
+}
+
+function closeModal(modalId) {
+    document.getElementById(modalId).style.display = 'none';
+}
+
+function editarProcesso(numero) {
+    // Implementar edição
+}
+
+async function excluirProcesso(numero) {
+    if (confirm('Tem certeza que deseja excluir este processo?')) {
+        try {
+            await apiCall(`processos/${encodeURIComponent(numero)}`, 'DELETE');
+            removerProcessoDaTabela(numero);
+        } catch (error) {
+            alert(error.message);
+        }
+    }
+}
+
+// Feed de alterações: aplica deltas em vez de recarregar a lista inteira.
+// Conecta a partir da sequência da lista carregada, para não perder as
+// alterações feitas entre a carga e a conexão; nas reconexões o navegador
+// envia o Last-Event-ID.
+const statusPrazos = new Map();
+
+function conectarEventos(desde) {
+    const url = desde === null || desde === undefined ? '/api/eventos' : `/api/eventos?desde=${desde}`;
+    const fonte = new EventSource(url);
+    fonte.addEventListener('error', () => {
+        // Conexão recusada (ex.: limite de feeds do servidor): o navegador não
+        // tenta de novo. Consulta as alterações periodicamente e volta a
+        // tentar o feed depois.
+        if (fonte.readyState !== EventSource.CLOSED) return;
+        const consulta = setInterval(consultarAlteracoes, 10000);
+        setTimeout(() => {
+            clearInterval(consulta);
+            conectarEventos(sincronizacao.seq);
+        }, 60000);
+    });
+    ['processo_adicionado', 'processo_atualizado', 'processo_removido'].forEach(tipo => {
+        fonte.addEventListener(tipo, e => receberEvento(tipo, e));
+    });
+    fonte.addEventListener('prazo_alterado', e => {
+        const prazo = JSON.parse(e.data);
+        statusPrazos.set(prazo.numero, prazo);
+    });
+    // Eventos perdidos (buffer do servidor excedido): recarrega uma única vez
+    fonte.addEventListener('resync', () => carregarProcessos());
+}
+
+// Alternativa ao feed: alterações posteriores à sequência já aplicada
+async function consultarAlteracoes() {
+    if (sincronizacao.carregando || sincronizacao.seq === null) return;
+    try {
+        let data;
+        do {
+            data = await apiCall(`processos/changes?since=${sincronizacao.seq}&epoca=${sincronizacao.epoca ?? ''}`);
+            // Uma lista nova foi pedida enquanto isso: ela já traz estas alterações
+            if (sincronizacao.carregando) return;
+            if (data.resync) {
+                carregarProcessos();
+                return;
+            }
+            for (const alteracao of data.alteracoes) {
+                if (alteracao.removido) removerProcessoDaTabela(alteracao.numero);
+                else aplicarProcesso(alteracao.processo);
+            }
+            sincronizacao.seq = data.seq;
+        } while (data.mais);
+    } catch (error) {
+        // Tenta de novo na próxima consulta
+    }
+}
+
+async function logout() {
+    try {
+        await fetch('/api/logout', { method: 'POST' });
+        window.location.href = '/';
+    } catch (error) {
+        console.error('Erro no logout:', error);
+    }
+}
+
+function exibirUsuario(usuario) {
+    document.getElementById('userName').textContent = usuario.nome;
+    document.getElementById('userType').textContent = usuario.tipo;
+    document.getElementById('userAvatar').textContent = usuario.nome.charAt(0).toUpperCase();
+}
+
+// Carregar dados do usuário
+async function carregarUsuario() {
+    try {
+        const response = await fetch('/api/usuario');
+        const data = await response.json();
+
+        if (data.success) exibirUsuario(data.usuario);
+    } catch (error) {
+        console.error('Erro ao carregar usuário:', error);
+    }
+}
+
+function exibirResumo(resumo) {
+    const cards = [
+        ['', resumo.totalProcessos, 'Processos'],
+        ['', resumo.processosPorStatus.Ativo || 0, 'Ativos'],
+        ['vencido', resumo.statusPrazos.vencido, 'Prazos vencidos'],
+        ['critico', resumo.statusPrazos.critico, 'Prazos críticos'],
+        ['atencao', resumo.statusPrazos.atencao, 'Prazos em atenção'],
+        ['', resumo.mesAtual.processosNovos, 'Novos no mês']
+    ];
+    document.getElementById('resumoCards').innerHTML = cards.map(([classe, valor, rotulo]) =>
+        `<div class="resumo-card ${classe}"><div class="valor">${escaparHtml(valor)}</div><div class="rotulo">${rotulo}</div></div>`
+    ).join('');
+}
+
+// Carga inicial numa única requisição: usuário, primeira página e resumo.
+// O restante da lista vem em seguida, sem bloquear a primeira renderização.
+async function carregarDashboard() {
+    try {
+        const data = await apiCall('dashboard/bootstrap');
+        exibirUsuario(data.usuario);
+        exibirResumo(data.resumo);
+        // A aba de processos pode já ter pedido a lista completa
+        if (sincronizacao.geracao === 0) {
+            adotarLista(data.processos, data.seq, data.epoca);
+            if (data.processos.length < data.totalProcessos) carregarProcessos();
+        }
+    } catch (error) {
+        carregarUsuario();
+        await carregarProcessos();
+    }
+    conectarEventos(sincronizacao.seq);
+}
+
+// Inicializar
+document.addEventListener('DOMContentLoaded', function() {
+    carregarDashboard();
+});
@@ -0,0 +1,77 @@
+// Toggle senha
+document.getElementById('togglePassword').addEventListener('click', function() {
+    const senha = document.getElementById('senha');
+    if (senha.type === 'password') {
+        senha.type = 'text';
+        this.classList.remove('fa-eye');
+        this.classList.add('fa-eye-slash');
+    } else {
+        senha.type = 'password';
+        this.classList.remove('fa-eye-slash');
+        this.classList.add('fa-eye');
+    }
+});
+
+// Preencher credenciais
+function preencherCredenciais(usuario, senha) {
+    document.getElementById('usuario').value = usuario;
+    document.getElementById('senha').value = senha;
+}
+
+// Mostrar alerta
+function mostrarAlerta(tipo, mensagem) {
+    const container = document.getElementById('alertContainer');
+    container.innerHTML = `
+        <div class="alert alert-${tipo}">
+            <i class="fas fa-${tipo === 'error' ? 'exclamation-triangle' : 'check-circle'}"></i>
+            ${mensagem}
+        </div>
+    `;
+    setTimeout(() => container.innerHTML = '', 5000);
+}
+
+// Form submit
+document.getElementById('loginForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const btn = document.getElementById('btnLogin');
+    const texto = document.getElementById('loginText');
+    const spinner = document.getElementById('loginSpinner');
+
+    const usuario = document.getElementById('usuario').value.trim();
+    const senha = document.getElementById('senha').value;
+
+    if (!usuario || !senha) {
+        mostrarAlerta('error', 'Preencha todos os campos');
+        return;
+    }
+
+    btn.disabled = true;
+    texto.style.display = 'none';
+    spinner.style.display = 'block';
+
+    try {
+        const response = await fetch('/api/login', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ usuario, senha })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            mostrarAlerta('success', 'Login realizado! Redirecionando...');
+            setTimeout(() => window.location.href = '/dashboard', 1500);
+        } else {
+            mostrarAlerta('error', data.error || 'Erro no login');
+        }
+    } catch (error) {
+        mostrarAlerta('error', 'Erro de conexão');
+    } finally {
+        btn.disabled = false;
+        texto.style.display = 'flex';
+        spinner.style.display = 'none';
+    }
+});
+
+document.getElementById('usuario').focus();
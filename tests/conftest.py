@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def diretorio_temporario(tmp_path, monkeypatch):
+    """
+    Cada teste roda num diretório próprio (planilhas, uploads e bancos
+    SQLite são criados relativos ao diretório atual)
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def nova_automacao(diretorio_temporario):
+    """
+    Cria instâncias de AutomatizacaoEscritorio sobre a mesma planilha e o
+    mesmo jornal, como os workers do servidor
+    """
+    import app
+
+    caminho = str(diretorio_temporario / 'dados' / 'processos.xlsx')
+    instancias = []
+
+    def criar():
+        automacao = app.AutomatizacaoEscritorio(caminho)
+        instancias.append(automacao)
+        return automacao
+
+    yield criar
+    for automacao in instancias:
+        automacao.jornal.fechar()
+        automacao.clientes.fechar()
+
@@ -0,0 +1,231 @@
+import smtplib
+import socket
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+import app
+
+
+class SMTPFalso:
+    """
+    Substituto de smtplib.SMTP: registra as mensagens e simula falhas
+    """
+    criadas = []
+    # Erros levantados, em ordem, pelos próximos send_message (de qualquer conexão)
+    falhas_envio = []
+
+    def __init__(self, host, porta, timeout=None):
+        self.enviadas = []
+        self.fechada = False
+        self.encerrada_pelo_servidor = False
+        SMTPFalso.criadas.append(self)
+
+    def noop(self):
+        if self.encerrada_pelo_servidor:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        return 250, b'OK'
+
+    def send_message(self, mensagem):
+        if self.encerrada_pelo_servidor:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        if SMTPFalso.falhas_envio:
+            raise SMTPFalso.falhas_envio.pop(0)
+        self.enviadas.append(mensagem)
+
+    def quit(self):
+        if self.encerrada_pelo_servidor:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        self.fechada = True
+
+    def close(self):
+        self.fechada = True
+
+
+@pytest.fixture
+def smtp_falso(monkeypatch):
+    SMTPFalso.criadas = []
+    SMTPFalso.falhas_envio = []
+    monkeypatch.setattr(smtplib, 'SMTP', SMTPFalso)
+    return SMTPFalso
+
+
+def mensagem(destino='a@escritorio.local'):
+    mensagem = EmailMessage()
+    mensagem['To'] = destino
+    mensagem['From'] = 'alertas@escritorio.local'
+    mensagem.set_content('teste')
+    return mensagem
+
+
+def prazo(numero, status='vencido', prazo_final='2026-01-10', advogado='Dra. Ana'):
+    return {'numero': numero, 'statusPrazo': status, 'prazoFinal': prazo_final,
+            'advogado': advogado, 'cliente': 'Cliente', 'diasRestantes': -1}
+
+
+def test_pool_reaproveita_conexao(smtp_falso):
+    pool = app.PoolSMTP('smtp.local', espera=0)
+    assert pool.enviar_lote([mensagem(), mensagem()]) == [None, None]
+    assert pool.enviar_lote([mensagem()]) == [None]
+    assert len(smtp_falso.criadas) == 1
+    assert len(smtp_falso.criadas[0].enviadas) == 3
+
+
+def test_pool_renova_conexao_apos_max_mensagens(smtp_falso):
+    pool = app.PoolSMTP('smtp.local', max_mensagens=2, espera=0)
+    assert pool.enviar_lote([mensagem() for _ in range(5)]) == [None] * 5
+    assert [len(smtp.enviadas) for smtp in smtp_falso.criadas] == [2, 2, 1]
+    assert smtp_falso.criadas[0].fechada and smtp_falso.criadas[1].fechada
+
+
+def test_pool_descarta_conexao_encerrada_pelo_servidor(smtp_falso):
+    # Sem repetição: o envio só funciona se a conexão morta não for usada
+    pool = app.PoolSMTP('smtp.local', espera=0, tentativas=1)
+    pool.enviar_lote([mensagem()])
+    # Entre execuções o servidor fecha a conexão ociosa
+    smtp_falso.criadas[0].encerrada_pelo_servidor = True
+
+    assert pool.enviar_lote([mensagem()]) == [None]
+    assert len(smtp_falso.criadas) == 2
+    assert smtp_falso.criadas[0].fechada
+    assert len(smtp_falso.criadas[1].enviadas) == 1
+
+
+def test_pool_descarta_conexao_ociosa_demais(smtp_falso, monkeypatch):
+    pool = app.PoolSMTP('smtp.local', espera=0, tentativas=1, max_ocioso=60)
+    pool.enviar_lote([mensagem()])
+    relogio = app.time.monotonic()
+    monkeypatch.setattr(app.time, 'monotonic', lambda: relogio + 3600)
+
+    assert pool.enviar_lote([mensagem()]) == [None]
+    assert len(smtp_falso.criadas) == 2
+    assert smtp_falso.criadas[0].fechada
+
+
+def test_pool_repete_falha_transitoria(smtp_falso):
+    pool = app.PoolSMTP('smtp.local', espera=0, tentativas=3)
+    smtp_falso.falhas_envio = [
+        smtplib.SMTPServerDisconnected('caiu'),
+        smtplib.SMTPResponseException(421, b'Servico indisponivel'),
+    ]
+    assert pool.enviar_lote([mensagem()]) == [None]
+    # Cada falha descarta a conexão usada; a terceira tentativa envia
+    assert len(smtp_falso.criadas) == 3
+    assert [len(smtp.enviadas) for smtp in smtp_falso.criadas] == [0, 0, 1]
+
+
+def test_pool_desiste_apos_tentativas(smtp_falso):
+    pool = app.PoolSMTP('smtp.local', espera=0, tentativas=2)
+    smtp_falso.falhas_envio = [smtplib.SMTPServerDisconnected('caiu')] * 3
+    erros = pool.enviar_lote([mensagem(), mensagem()])
+    assert isinstance(erros[0], smtplib.SMTPServerDisconnected)
+    assert erros[1] is None
+
+
+def test_pool_nao_repete_recusa_definitiva(smtp_falso):
+    pool = app.PoolSMTP('smtp.local', espera=0, tentativas=3)
+    smtp_falso.falhas_envio = [
+        smtplib.SMTPRecipientsRefused({'a@escritorio.local': (550, b'Mailbox unavailable')})
+    ]
+    erros = pool.enviar_lote([mensagem()])
+    assert isinstance(erros[0], smtplib.SMTPRecipientsRefused)
+    assert len(smtp_falso.criadas) == 1
+
+
+def test_registro_envia_cada_alerta_uma_vez(tmp_path):
+    registro = app.RegistroAlertas(str(tmp_path / 'alertas.db'))
+    prazos = [prazo('1'), prazo('2')]
+    assert registro.reservar(prazos) == prazos
+    # Reservados (envio em andamento em outro worker) não são reservados de novo
+    assert registro.reservar(prazos) == []
+    registro.confirmar(prazos[:1])
+    registro.liberar(prazos[1:])
+    assert registro.pendentes(prazos) == prazos[1:]
+    assert registro.reservar(prazos) == prazos[1:]
+    # Mudança de status é um alerta novo
+    assert registro.reservar([prazo('1', status='critico')]) == [prazo('1', status='critico')]
+
+
+def test_registro_reserva_entre_threads(tmp_path):
+    registro = app.RegistroAlertas(str(tmp_path / 'alertas.db'))
+    prazos = [prazo(str(i)) for i in range(50)]
+    reservas = []
+    threads = [threading.Thread(target=lambda: reservas.append(registro.reservar(prazos))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(p['numero'] for lote in reservas for p in lote) == sorted(p['numero'] for p in prazos)
+
+
+def test_registro_reserva_abandonada_expira(tmp_path, monkeypatch):
+    registro = app.RegistroAlertas(str(tmp_path / 'alertas.db'), validade_reserva=900)
+    assert registro.reservar([prazo('1')])
+    relogio = app.time.time()
+    monkeypatch.setattr(app.time, 'time', lambda: relogio + 901)
+    assert registro.reservar([prazo('1')]) == [prazo('1')]
+
+
+def alertas_com(registro, pool, prazos, **opcoes):
+    alertas = app.AlertasPrazos(None, registro, pool, 'alertas@escritorio.local', **opcoes)
+    alertas.coletar = lambda hoje=None: prazos
+    return alertas
+
+
+def test_alertas_nao_reenviam(tmp_path, smtp_falso):
+    registro = app.RegistroAlertas(str(tmp_path / 'alertas.db'))
+    pool = app.PoolSMTP('smtp.local', espera=0)
+    prazos = [prazo('1'), prazo('2', advogado='Dr. Bruno'), prazo('3', status='normal')]
+    alertas = alertas_com(registro, pool, prazos, destinatarios={'Dra. Ana': 'ana@escritorio.local'},
+                          email_padrao='geral@escritorio.local')
+
+    resultado = alertas.executar()
+    assert (resultado['alertas'], resultado['resumos'], resultado['enviados']) == (2, 2, 2)
+    assert alertas.executar()['alertas'] == 0
+    destinos = sorted(m['To'] for smtp in smtp_falso.criadas for m in smtp.enviadas)
+    assert destinos == ['ana@escritorio.local', 'geral@escritorio.local']
+
+
+def test_alertas_falha_volta_na_proxima_execucao(tmp_path, smtp_falso):
+    registro = app.RegistroAlertas(str(tmp_path / 'alertas.db'))
+    pool = app.PoolSMTP('smtp.local', espera=0, tentativas=1)
+    alertas = alertas_com(registro, pool, [prazo('1')], email_padrao='geral@escritorio.local')
+
+    smtp_falso.falhas_envio = [smtplib.SMTPServerDisconnected('caiu')]
+    resultado = alertas.executar()
+    assert resultado['enviados'] == 0 and len(resultado['falhas']) == 1
+    assert alertas.executar()['enviados'] == 1
+    assert alertas.executar()['alertas'] == 0
+
+
+def test_alertas_sem_destinatario_ficam_pendentes(tmp_path, smtp_falso):
+    registro = app.RegistroAlertas(str(tmp_path / 'alertas.db'))
+    alertas = alertas_com(registro, app.PoolSMTP('smtp.local', espera=0), [prazo('1')])
+    resultado = alertas.executar()
+    assert resultado['semDestinatario'] == ['Dra. Ana'] and resultado['enviados'] == 0
+    assert registro.pendentes([prazo('1')]) == [prazo('1')]
+
+
+def test_pool_com_servidor_smtp_local():
+    controller = pytest.importorskip('aiosmtpd.controller')
+    recebidas = []
+
+    class Manipulador:
+        async def handle_DATA(self, servidor, sessao, envelope):
+            recebidas.append(envelope.rcpt_tos)
+            return '250 Message accepted for delivery'
+
+    with socket.socket() as livre:
+        livre.bind(('127.0.0.1', 0))
+        porta = livre.getsockname()[1]
+    servidor = controller.Controller(Manipulador(), hostname='127.0.0.1', port=porta)
+    servidor.start()
+    try:
+        pool = app.PoolSMTP('127.0.0.1', porta, espera=0)
+        assert pool.enviar_lote([mensagem('a@x.local'), mensagem('b@x.local')]) == [None, None]
+        assert pool.enviar_lote([mensagem('c@x.local')]) == [None]
+        pool.fechar()
+    finally:
+        servidor.stop()
+    assert recebidas == [['a@x.local'], ['b@x.local'], ['c@x.local']]
@@ -0,0 +1,89 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import app
+
+CONTEUDO = bytes(range(256)) * 1000
+
+
+def test_upload_em_partes(diretorio_temporario):
+    armazem = app.ArmazemAnexos('anexos')
+    id_upload = armazem.iniciar_upload('001/2025', 'peticao.pdf', len(CONTEUDO), 'application/pdf', 'ana')
+
+    aceita, estado = armazem.receber_parte(id_upload, 0, io.BytesIO(CONTEUDO[:100000]), 'ana', fim=100000)
+    assert aceita and estado['recebido'] == 100000 and 'anexo' not in estado
+    aceita, estado = armazem.receber_parte(id_upload, 100000, io.BytesIO(CONTEUDO[100000:]), 'ana')
+    assert aceita
+
+    anexo = estado['anexo']
+    assert anexo['hash'] == hashlib.sha256(CONTEUDO).hexdigest()
+    assert anexo['tamanho'] == len(CONTEUDO)
+    with open(armazem.caminho_objeto(anexo['hash']), 'rb') as f:
+        assert f.read() == CONTEUDO
+    assert armazem.listar('001/2025') == [anexo]
+    assert armazem.estado_upload(id_upload) is None
+
+
+def test_parte_fora_de_ordem_e_recusada(diretorio_temporario):
+    armazem = app.ArmazemAnexos('anexos')
+    id_upload = armazem.iniciar_upload('001/2025', 'a.bin', len(CONTEUDO))
+    armazem.receber_parte(id_upload, 0, io.BytesIO(CONTEUDO[:1000]), fim=1000)
+
+    # Parte adiantada (a anterior se perdeu) e parte repetida: nada é gravado
+    for inicio in (5000, 0):
+        aceita, estado = armazem.receber_parte(id_upload, inicio, io.BytesIO(CONTEUDO[inicio:inicio + 1000]))
+        assert not aceita and estado['recebido'] == 1000
+
+    aceita, estado = armazem.receber_parte(id_upload, 1000, io.BytesIO(CONTEUDO[1000:]))
+    assert aceita and estado['anexo']['hash'] == hashlib.sha256(CONTEUDO).hexdigest()
+
+
+def test_upload_retomado_apos_reinicio(diretorio_temporario):
+    armazem = app.ArmazemAnexos('anexos')
+    id_upload = armazem.iniciar_upload('001/2025', 'a.bin', len(CONTEUDO), usuario='ana')
+    armazem.receber_parte(id_upload, 0, io.BytesIO(CONTEUDO[:70000]), 'ana', fim=70000)
+
+    # Outro processo (sem o hash incremental) retoma pelo estado gravado em disco
+    outro = app.ArmazemAnexos('anexos')
+    estado = outro.estado_upload(id_upload, 'ana')
+    assert estado['recebido'] == 70000 and estado['tamanho'] == len(CONTEUDO)
+    assert outro.estado_upload(id_upload, 'bruno') is None
+
+    aceita, estado = outro.receber_parte(id_upload, 70000, io.BytesIO(CONTEUDO[70000:]), 'ana')
+    assert aceita and estado['anexo']['hash'] == hashlib.sha256(CONTEUDO).hexdigest()
+
+
+def test_parte_maior_que_o_intervalo_e_descartada(diretorio_temporario):
+    armazem = app.ArmazemAnexos('anexos')
+    id_upload = armazem.iniciar_upload('001/2025', 'a.bin', len(CONTEUDO))
+    armazem.receber_parte(id_upload, 0, io.BytesIO(CONTEUDO[:1000]), fim=1000)
+
+    with pytest.raises(ValueError):
+        armazem.receber_parte(id_upload, 1000, io.BytesIO(CONTEUDO[1000:2000] + b'x' * 10), fim=2000)
+    assert armazem.estado_upload(id_upload)['recebido'] == 1000
+
+    aceita, estado = armazem.receber_parte(id_upload, 1000, io.BytesIO(CONTEUDO[1000:]))
+    assert aceita and estado['anexo']['hash'] == hashlib.sha256(CONTEUDO).hexdigest()
+
+
+def test_conteudo_repetido_guardado_uma_vez(diretorio_temporario):
+    armazem = app.ArmazemAnexos('anexos')
+    primeiro = armazem.guardar('001/2025', 'a.pdf', io.BytesIO(CONTEUDO))
+    id_upload = armazem.iniciar_upload('002/2025', 'b.pdf', len(CONTEUDO))
+    _, estado = armazem.receber_parte(id_upload, 0, io.BytesIO(CONTEUDO))
+    assert estado['anexo']['hash'] == primeiro['hash']
+
+    assert armazem.remover(primeiro['id'])
+    assert os.path.exists(armazem.caminho_objeto(primeiro['hash']))
+    assert armazem.remover(estado['anexo']['id'])
+    assert not os.path.exists(armazem.caminho_objeto(primeiro['hash']))
+
+
+def test_upload_desconhecido(diretorio_temporario):
+    armazem = app.ArmazemAnexos('anexos')
+    assert armazem.estado_upload('../../etc/passwd') is None
+    with pytest.raises(KeyError):
+        armazem.receber_parte('inexistente', 0, io.BytesIO(b'x'))
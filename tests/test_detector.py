@@ -0,0 +1,71 @@
+import random
+
+import pandas as pd
+
+import app
+
+NOMES = [
+    'João da Silva', 'Joao Silva', 'JOÃO DA SILVA', 'Maria Aparecida Souza', 'Maria Aparecida de Souza',
+    'Construtora Alfa Ltda', 'Construtora Alfa LTDA.', 'Transportes Beta 2', 'Transportes Beta 3',
+    'Pedro Henrique Lima', 'Ana Paula Ferreira', 'Ana Paula Ferreira dos Santos', 'Carlos Eduardo Rocha',
+]
+
+
+def referencia(nomes):
+    return app.DetectorClientesDuplicados.construir(list(nomes)).grupos()
+
+
+def test_ajustar_equivale_a_construir_de_novo():
+    aleatorio = random.Random(7)
+    atuais = [aleatorio.choice(NOMES) for _ in range(40)]
+    detector = app.DetectorClientesDuplicados.construir(atuais)
+    for _ in range(30):
+        novos = [aleatorio.choice(NOMES) for _ in range(aleatorio.randint(0, 40))]
+        detector.ajustar(novos)
+        assert detector.grupos() == referencia(novos)
+
+
+def test_detector_grupos_de_grafias():
+    detector = app.DetectorClientesDuplicados.construir(NOMES)
+    nomes = [{nome['nome'] for nome in grupo['nomes']} for grupo in detector.grupos()]
+    assert {'João da Silva', 'Joao Silva', 'JOÃO DA SILVA'} in nomes
+    # Números diferentes nunca são o mesmo cliente
+    assert not any({'Transportes Beta 2', 'Transportes Beta 3'} <= grupo for grupo in nomes)
+
+
+def processo(numero, cliente):
+    return {'numero': numero, 'cliente': cliente, 'advogado': 'Dr. Silva', 'tipo': 'Cível'}
+
+
+def test_detector_acompanha_o_jornal_e_recargas(nova_automacao):
+    a, b = nova_automacao(), nova_automacao()
+    a.obter_detector_clientes()
+
+    # Alterações de outro worker, aplicadas linha a linha pelo jornal
+    b.adicionar_processo(processo('100/2026', 'João da Silva'))
+    b.adicionar_processo(processo('101/2026', 'Joao Silva'))
+    b.atualizar_processo('001/2025', {'cliente': 'Cliente Exemplo Um'})
+    b.remover_processo('002/2025')
+    a.sincronizar()
+    assert a.obter_detector_clientes().grupos() == referencia(a.df['Cliente'].dropna())
+
+    # Importação: os outros workers recarregam a planilha
+    novos = pd.DataFrame({
+        'Numero_Processo': ['200/2026', '201/2026', '101/2026'],
+        'Cliente': ['Maria Aparecida Souza', 'Maria Aparecida de Souza', 'Construtora Alfa Ltda'],
+        'Advogado_Responsavel': ['Dr. Silva'] * 3,
+        'Tipo_Acao': ['Cível'] * 3,
+    })
+    b.importar_processos(novos)
+    a.sincronizar()
+    assert a.obter_detector_clientes().grupos() == referencia(a.df['Cliente'].dropna())
+    assert a.obter_detector_clientes().grupos() == referencia(b.df['Cliente'].dropna())
+
+    # Edição externa da planilha
+    a.ESPERA_JORNAL = 0
+    df = a.df.copy()
+    df.loc[df['Numero_Processo'] == '200/2026', 'Cliente'] = 'Carlos Eduardo Rocha'
+    df.to_excel(a.arquivo_excel, index=False)
+    a.sincronizar()
+    assert a.sincronizar()
+    assert a.obter_detector_clientes().grupos() == referencia(a.df['Cliente'].dropna())
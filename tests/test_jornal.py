@@ -0,0 +1,141 @@
+import pandas as pd
+import pytest
+
+import app
+
+
+def processo(numero, cliente='Cliente Teste', **campos):
+    return dict({'numero': numero, 'cliente': cliente, 'advogado': 'Dr. Silva', 'tipo': 'Cível',
+                 'dataIntimacao': '2026-01-05', 'diasPrazo': 15}, **campos)
+
+
+def processos(automacao):
+    return sorted(automacao.obter_todos_processos(), key=lambda p: p['numero'])
+
+
+def test_alteracoes_aplicadas_na_outra_instancia(nova_automacao):
+    a, b = nova_automacao(), nova_automacao()
+
+    assert a.adicionar_processo(processo('100/2026'))[0]
+    assert b.sincronizar()
+    assert b.obter_processo('100/2026')['cliente'] == 'Cliente Teste'
+
+    assert a.atualizar_processo('100/2026', {'cliente': 'Outro Cliente', 'status': 'Arquivado'})[0]
+    assert b.sincronizar()
+    assert b.obter_processo('100/2026')['cliente'] == 'Outro Cliente'
+    assert b.obter_processo('100/2026')['status'] == 'Arquivado'
+
+    assert a.remover_processo('001/2025')[0]
+    assert b.sincronizar()
+    assert b.obter_processo('001/2025') is None
+    assert processos(a) == processos(b)
+    assert a.posicao_jornal() == b.posicao_jornal()
+    # Nada novo: não reaplica
+    assert not b.sincronizar()
+
+
+def test_gravacao_parte_das_alteracoes_pendentes(nova_automacao):
+    a, b = nova_automacao(), nova_automacao()
+    assert a.adicionar_processo(processo('100/2026'))[0]
+    # b grava sem ter sincronizado: aplica antes a linha de a
+    assert not b.adicionar_processo(processo('100/2026'))[0]
+    assert b.adicionar_processo(processo('101/2026'))[0]
+    assert b.obter_processo('100/2026') is not None
+
+    assert a.sincronizar()
+    assert processos(a) == processos(b)
+    # A planilha gravada por b contém as duas alterações
+    assert processos(nova_automacao()) == processos(a)
+
+
+def test_alteracoes_publicadas_em_ordem(nova_automacao):
+    a, b = nova_automacao(), nova_automacao()
+    recebidas = []
+    b.registrar_ouvinte(lambda tipo, dados, seq: recebidas.append((tipo, seq)))
+
+    a.adicionar_processo(processo('100/2026'))
+    a.atualizar_processo('001/2025', {'diasPrazo': 30})
+    a.remover_processo('002/2025')
+    # Várias alterações do mesmo processo chegam como a última delas
+    a.adicionar_processo(processo('101/2026'))
+    a.remover_processo('101/2026')
+    b.sincronizar()
+
+    assert [tipo for tipo, _ in recebidas] == [
+        'processo_adicionado', 'processo_atualizado', 'processo_removido', 'processo_removido'
+    ]
+    seqs = [seq for _, seq in recebidas]
+    assert seqs == sorted(seqs) and seqs[-1] == a.posicao_jornal()[1]
+
+
+def test_importacao_recarrega_a_outra_instancia(nova_automacao):
+    a, b = nova_automacao(), nova_automacao()
+    novos = pd.DataFrame({
+        'Numero_Processo': ['200/2026', '201/2026'],
+        'Cliente': ['Cliente A', 'Cliente B'],
+        'Advogado_Responsavel': ['Dr. Silva', 'Dra. Santos'],
+        'Tipo_Acao': ['Cível', 'Trabalhista'],
+    })
+    assert a.importar_processos(novos) == (2, 0, [])
+    assert b.sincronizar()
+    assert processos(a) == processos(b)
+    assert len(processos(b)) == 4
+
+
+def test_sincronizar_ate_a_posicao_gravada(nova_automacao):
+    a, b = nova_automacao(), nova_automacao()
+    antes = b.posicao_jornal()
+    assert not b.sincronizar_ate(antes)
+
+    a.adicionar_processo(processo('100/2026'))
+    assert b.sincronizar_ate(a.posicao_jornal())
+    assert b.obter_processo('100/2026') is not None
+    # Posição de outro jornal (planilha recriada) é ignorada
+    assert not b.sincronizar_ate(('outra', 10 ** 6))
+
+
+def test_edicao_externa_recarrega(nova_automacao):
+    a = nova_automacao()
+    a.ESPERA_JORNAL = 0
+    df = a.df.copy()
+    df.loc[len(df)] = ['300/2026', 'Cliente Externo', 'Dr. Silva', 'Cível', '2026-01-01', '2026-01-01', 10, 'Ativo', None]
+    df.to_excel(a.arquivo_excel, index=False)
+
+    # A primeira divergência pode ser uma gravação cuja linha ainda não chegou ao jornal
+    assert not a.sincronizar()
+    assert a.sincronizar()
+    assert a.obter_processo('300/2026')['cliente'] == 'Cliente Externo'
+
+
+@pytest.mark.parametrize('operacao', ['adicionar', 'atualizar', 'remover'])
+def test_gravacao_falha_desfaz_alteracao(nova_automacao, monkeypatch, operacao):
+    a, b = nova_automacao(), nova_automacao()
+    antes, posicao, versao_jornal = processos(a), a.posicao_jornal(), a.jornal.ultimo_seq()
+    monkeypatch.setattr(a, 'salvar_dados', lambda: False)
+
+    if operacao == 'adicionar':
+        ok, mensagem = a.adicionar_processo(processo('100/2026'))
+    elif operacao == 'atualizar':
+        ok, mensagem = a.atualizar_processo('001/2025', {'cliente': 'Outro Cliente'})
+    else:
+        ok, mensagem = a.remover_processo('001/2025')
+
+    assert not ok and 'Não foi possível gravar' in mensagem
+    assert processos(a) == antes
+    assert a.posicao_jornal() == posicao
+    assert a.jornal.ultimo_seq() == versao_jornal
+    assert not b.sincronizar()
+    assert processos(b) == antes
+
+
+def test_importacao_com_falha_na_gravacao_e_desfeita(nova_automacao, monkeypatch):
+    a = nova_automacao()
+    antes, versao_jornal = processos(a), a.jornal.ultimo_seq()
+    monkeypatch.setattr(a, 'salvar_dados', lambda: False)
+    novos = pd.DataFrame({'Numero_Processo': ['200/2026'], 'Cliente': ['Cliente A'],
+                          'Advogado_Responsavel': ['Dr. Silva'], 'Tipo_Acao': ['Cível']})
+
+    with pytest.raises(app.FalhaGravacao):
+        a.importar_processos(novos, substituir=True)
+    assert processos(a) == antes
+    assert a.jornal.ultimo_seq() == versao_jornal
@@ -0,0 +1,66 @@
+import pytest
+
+import app
+
+
+@pytest.fixture(params=['memoria', 'sqlite', 'arquivo'])
+def backend(request, diretorio_temporario):
+    caminho = 'sessoes.db' if request.param == 'sqlite' else 'sessoes'
+    return request.param, caminho
+
+
+def test_sessao_ida_e_volta(backend):
+    gerenciador = app.criar_gerenciador_sessoes(*backend)
+    sid = gerenciador.novo_id()
+    assert gerenciador.obter(sid) is None
+    gerenciador.salvar(sid, {'usuario': 'ana@escritorio.local', 'perfil': 'advogado'})
+    assert gerenciador.obter(sid) == {'usuario': 'ana@escritorio.local', 'perfil': 'advogado'}
+
+
+def test_sessao_expira(backend, monkeypatch):
+    gerenciador = app.criar_gerenciador_sessoes(*backend)
+    sid = gerenciador.novo_id()
+    gerenciador.salvar(sid, {'usuario': 'ana@escritorio.local'})
+
+    agora = app.time.time()
+    monkeypatch.setattr(app.time, 'time', lambda: agora + gerenciador.ttl + 1)
+    assert gerenciador.obter(sid) is None
+
+
+def test_revogar_sessao_e_usuario(backend):
+    gerenciador = app.criar_gerenciador_sessoes(*backend)
+    ana1, ana2, bruno = (gerenciador.novo_id() for _ in range(3))
+    gerenciador.salvar(ana1, {'usuario': 'ana'})
+    gerenciador.salvar(ana2, {'usuario': 'ana'})
+    gerenciador.salvar(bruno, {'usuario': 'bruno'})
+
+    gerenciador.revogar(ana1)
+    assert gerenciador.obter(ana1) is None
+    assert gerenciador.revogar_usuario('ana') == 1
+    assert gerenciador.obter(ana2) is None
+    assert gerenciador.obter(bruno) == {'usuario': 'bruno'}
+
+
+@pytest.mark.parametrize('armazenamento', [
+    lambda: app.ArmazenamentoSessaoSQLite('sessoes.db'),
+    lambda: app.ArmazenamentoSessaoArquivo('sessoes'),
+], ids=['sqlite', 'arquivo'])
+def test_sessao_compartilhada_entre_workers(armazenamento, diretorio_temporario, monkeypatch):
+    worker1 = app.GerenciadorSessoes(armazenamento(), ttl_cache=30)
+    worker2 = app.GerenciadorSessoes(armazenamento(), ttl_cache=30)
+    sid = worker1.novo_id()
+    worker1.salvar(sid, {'usuario': 'ana'})
+    assert worker2.obter(sid) == {'usuario': 'ana'}
+
+    # A revogação chega ao outro worker quando a leitura em cache expira
+    worker1.revogar_usuario('ana')
+    assert worker1.obter(sid) is None
+    agora = app.time.time()
+    monkeypatch.setattr(app.time, 'time', lambda: agora + 31)
+    assert worker2.obter(sid) is None
+
+
+@pytest.mark.parametrize('sid', [None, '', '../sessoes', 'a/b', 'a.json'])
+def test_identificador_invalido(backend, sid):
+    gerenciador = app.criar_gerenciador_sessoes(*backend)
+    assert gerenciador.obter(sid) is None